@@ -0,0 +1,470 @@
+"""
+    This program holds the array-backed (struct-of-arrays) form of the asts.
+
+    The dict form of an ast (see pycparser.c_json) takes a dictionary per node with
+    a string key per attribute. The array form keeps the whole ast in a few flat
+    arrays indexed by node id (i.e., the preorder position of the node, as in
+    CAstMutator.build_index), i.e.,
+
+        types: node type of each node, as a reference into the pool
+        parents: parent node id of each node (-1 for the root)
+        ends: node id after the last node of each node's subtree
+        entries: offset of each node's first entry, followed by the number of entries
+        entry_keys, entry_kinds, entry_refs: key, kind, and reference of each entry,
+            where a value entry refers to the pool, a node entry to the child node id,
+            and a node list entry to the offset of the list in list_items
+        list_items: length of each node list, followed by the child node ids
+        coord_files, coord_lines, coord_columns: file (as a reference into the pool),
+            line, and column of each coord entry, which is unique to its node
+
+    with every key, node type, and attribute value interned once in the pool. The
+    traversals of the array form are loops over the arrays, and the dict form of any
+    subtree is materialized on demand (see to_dict).
+
+    Running this program directly compares the memory and the conversion time of
+    the two forms for the given C files.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from array import array
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import C.pycparser.c_json as c_json
+
+# Entry kinds.
+VALUE = 0
+NODE = 1
+NODES = 2
+COORD = 3
+
+def is_node(value):
+    """This function checks whether the value is an ast node.
+
+    args:
+        value (depends): value to check.
+
+    returns:
+        (bool) true if the value is an ast node. Otherwise, false.
+    """
+
+    return isinstance(value, dict) and "_nodetype" in value
+
+def is_node_list(value):
+    """This function checks whether the value is a non-empty list of ast nodes.
+
+    args:
+        value (depends): value to check.
+
+    returns:
+        (bool) true if the value is a list of ast nodes. Otherwise, false.
+    """
+
+    return isinstance(value, list) and len(value) > 0 and all(is_node(item) for item in value)
+
+def intern(value, pool: list, pool_ids: dict):
+    """This function adds the value to the pool, if not already in it.
+
+    args:
+        value (depends): json value to add.
+        pool (list): interned values.
+        pool_ids (dict): string, or json text of any other value (in a tuple, so it
+        cannot be taken for a string), to its reference in the pool.
+
+    returns:
+        (int) reference of the value in the pool.
+    """
+
+    key = value if isinstance(value, str) else (json.dumps(value),)
+    if key not in pool_ids:
+        pool_ids[key] = len(pool)
+        pool.append(value)
+
+    return pool_ids[key]
+
+def split_coord(value):
+    """This function splits the coord of a node (i.e., "<file>:<line>:<column>").
+
+    args:
+        value (depends): value of the coord key.
+
+    returns:
+        (tuple) file, line, and column, or None if the value is not such a coord.
+    """
+
+    if not isinstance(value, str):
+        return None
+
+    parts = value.rsplit(":", 2)
+    if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    if str(int(parts[1])) != parts[1] or str(int(parts[2])) != parts[2]:
+        return None
+
+    return parts[0], int(parts[1]), int(parts[2])
+
+def from_dict(ast: dict):
+    """This function converts the dict form of the ast into the array form, in a
+    single preorder pass with an explicit stack.
+
+    args:
+        ast (dict): abstract syntax tree in the dict form.
+
+    returns:
+        (dict) abstract syntax tree in the array form.
+    """
+
+    pool = []
+    pool_ids = {}
+
+    types = array("I")
+    parents = array("i")
+    entries = array("I")
+    entry_keys = array("I")
+    entry_kinds = array("B")
+    entry_refs = array("i")
+    list_items = array("i")
+    coord_files = array("I")
+    coord_lines = array("I")
+    coord_columns = array("I")
+
+    # Each child is patched into the reference of its parent's entry once visited.
+    stack = [(ast, -1, None, -1)]
+    while stack:
+        node, parent_id, patch, offset = stack.pop()
+
+        node_id = len(types)
+        if patch != None:
+            patch[offset] = node_id
+
+        types.append(intern(node["_nodetype"], pool, pool_ids))
+        parents.append(parent_id)
+        entries.append(len(entry_keys))
+
+        children = []
+        for key, value in node.items():
+            if key == "_nodetype":
+                continue
+            entry_keys.append(intern(key, pool, pool_ids))
+            if is_node(value):
+                entry_kinds.append(NODE)
+                entry_refs.append(-1)
+                children.append((value, node_id, entry_refs, len(entry_refs) - 1))
+            elif is_node_list(value):
+                entry_kinds.append(NODES)
+                entry_refs.append(len(list_items))
+                list_items.append(len(value))
+                for item in value:
+                    list_items.append(-1)
+                    children.append((item, node_id, list_items, len(list_items) - 1))
+            elif key == "coord" and split_coord(value) != None:
+                file_name, line, column = split_coord(value)
+                entry_kinds.append(COORD)
+                entry_refs.append(len(coord_files))
+                coord_files.append(intern(file_name, pool, pool_ids))
+                coord_lines.append(line)
+                coord_columns.append(column)
+            else:
+                entry_kinds.append(VALUE)
+                entry_refs.append(intern(value, pool, pool_ids))
+
+        # Pushed in reverse, so the children are visited in order.
+        stack.extend(reversed(children))
+
+    entries.append(len(entry_keys))
+
+    size = len(types)
+    ends = array("I", range(1, size + 1))
+    for node_id in range(size - 1, 0, -1):
+        parent_id = parents[node_id]
+        if ends[node_id] > ends[parent_id]:
+            ends[parent_id] = ends[node_id]
+
+    return {
+        "pool": pool,
+        "types": types,
+        "parents": parents,
+        "ends": ends,
+        "entries": entries,
+        "entry_keys": entry_keys,
+        "entry_kinds": entry_kinds,
+        "entry_refs": entry_refs,
+        "list_items": list_items,
+        "coord_files": coord_files,
+        "coord_lines": coord_lines,
+        "coord_columns": coord_columns
+    }
+
+def copy_value(value):
+    """This function copies the pooled value, so the materialized node does not share
+    its lists with the pool.
+
+    args:
+        value (depends): pooled value.
+
+    returns:
+        (depends) copied value.
+    """
+
+    if isinstance(value, list):
+        return [copy_value(item) for item in value]
+    elif isinstance(value, dict):
+        return {key: copy_value(item) for key, item in value.items()}
+
+    return value
+
+def to_dict(aast: dict, node_id=0, overlay=None, built=None):
+    """This function materializes the dict form of the node's subtree. The nodes are
+    built from the last one of the subtree, so the children are built before their
+    parents without a recursion.
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+        node_id (int, optional): node id of the subtree's root.
+        overlay (dict, optional): node id to the {key: value} that replace the node's
+        values (see get_edits).
+        built (dict, optional): dictionary to add the node id to materialized node of
+        every node in the subtree to.
+
+    returns:
+        (dict) materialized node.
+    """
+
+    pool = aast["pool"]
+    types = aast["types"]
+    entries = aast["entries"]
+    entry_keys = aast["entry_keys"]
+    entry_kinds = aast["entry_kinds"]
+    entry_refs = aast["entry_refs"]
+    list_items = aast["list_items"]
+    coord_files = aast["coord_files"]
+    coord_lines = aast["coord_lines"]
+    coord_columns = aast["coord_columns"]
+
+    if built == None:
+        built = {}
+
+    for current_id in range(aast["ends"][node_id] - 1, node_id - 1, -1):
+        node = {"_nodetype": pool[types[current_id]]}
+        for entry in range(entries[current_id], entries[current_id + 1]):
+            key = pool[entry_keys[entry]]
+            kind = entry_kinds[entry]
+            ref = entry_refs[entry]
+            if kind == NODE:
+                node[key] = built[ref]
+            elif kind == NODES:
+                node[key] = [built[item] for item in list_items[ref + 1:ref + 1 + list_items[ref]]]
+            elif kind == COORD:
+                node[key] = f"{pool[coord_files[ref]]}:{coord_lines[ref]}:{coord_columns[ref]}"
+            else:
+                node[key] = copy_value(pool[ref])
+        if overlay != None and current_id in overlay:
+            for key, value in overlay[current_id].items():
+                node[key] = copy_value(value)
+        built[current_id] = node
+
+    return built[node_id]
+
+def to_shallow_dict(aast: dict, node_id: int, depth: int, overlay=None):
+    """This function materializes the node with its values and its child nodes down
+    to the depth, e.g., the node's own values only for the depth 0. The node lists are
+    left out at any depth, so the materialized nodes are bounded by the depth, not by
+    the size of the subtree.
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+        node_id (int): node id.
+        depth (int): depth of the child nodes to materialize.
+        overlay (dict, optional): node id to the {key: value} that replace the node's
+        values (see get_edits).
+
+    returns:
+        (dict) materialized node.
+    """
+
+    pool = aast["pool"]
+    entry_kinds = aast["entry_kinds"]
+    entry_refs = aast["entry_refs"]
+
+    node = {"_nodetype": get_type(aast, node_id)}
+    for entry in range(aast["entries"][node_id], aast["entries"][node_id + 1]):
+        key = pool[aast["entry_keys"][entry]]
+        kind = entry_kinds[entry]
+        ref = entry_refs[entry]
+        if kind == NODE:
+            if depth > 0:
+                node[key] = to_shallow_dict(aast, ref, depth - 1, overlay)
+        elif kind == COORD:
+            node[key] = f"{pool[aast['coord_files'][ref]]}:{aast['coord_lines'][ref]}:{aast['coord_columns'][ref]}"
+        elif kind == VALUE:
+            node[key] = copy_value(pool[ref])
+    if overlay != None and node_id in overlay:
+        for key, value in overlay[node_id].items():
+            node[key] = copy_value(value)
+
+    return node
+
+def get_size(aast: dict):
+    """This function counts the nodes of the ast.
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+
+    returns:
+        (int) number of nodes.
+    """
+
+    return len(aast["types"])
+
+def get_type(aast: dict, node_id: int):
+    """This function gets the node type of the node.
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+        node_id (int): node id.
+
+    returns:
+        (str) node type.
+    """
+
+    return aast["pool"][aast["types"][node_id]]
+
+def get_value(aast: dict, node_id: int, key: str):
+    """This function gets the value of the node's key, which is not a node.
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+        node_id (int): node id.
+        key (str): key of the value.
+
+    returns:
+        (depends) copy of the value, or None if the node has no such value.
+    """
+
+    pool = aast["pool"]
+    for entry in range(aast["entries"][node_id], aast["entries"][node_id + 1]):
+        if pool[aast["entry_keys"][entry]] != key:
+            continue
+        kind = aast["entry_kinds"][entry]
+        ref = aast["entry_refs"][entry]
+        if kind == VALUE:
+            return copy_value(pool[ref])
+        elif kind == COORD:
+            return f"{pool[aast['coord_files'][ref]]}:{aast['coord_lines'][ref]}:{aast['coord_columns'][ref]}"
+
+    return None
+
+def get_children(aast: dict, node_id: int):
+    """This function lists the child node ids of the node in preorder.
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+        node_id (int): node id.
+
+    returns:
+        (list) child node ids.
+    """
+
+    entry_kinds = aast["entry_kinds"]
+    entry_refs = aast["entry_refs"]
+    list_items = aast["list_items"]
+
+    children = []
+    for entry in range(aast["entries"][node_id], aast["entries"][node_id + 1]):
+        ref = entry_refs[entry]
+        if entry_kinds[entry] == NODE:
+            children.append(ref)
+        elif entry_kinds[entry] == NODES:
+            children.extend(list_items[ref + 1:ref + 1 + list_items[ref]])
+
+    return children
+
+def get_edits(aast: dict, overlay: dict):
+    """This function lists the edits of the overlay in the mutation log format (see
+    CMutationLog.get_edits).
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+        overlay (dict): node id to the {key: value} that replace the node's values.
+
+    returns:
+        (list) list of [node id, attribute, old value, new value].
+    """
+
+    return [
+        [node_id, key, get_value(aast, node_id, key), copy_value(value)]
+        for node_id in sorted(overlay) for key, value in overlay[node_id].items()
+    ]
+
+def measure(ast: dict, is_array: bool):
+    """This function measures the memory taken by a fresh copy of the ast in either form.
+
+    args:
+        ast (dict): abstract syntax tree in the dict form.
+        is_array (bool): measure the array form. Otherwise, the dict form.
+
+    returns:
+        (int) size in bytes.
+    """
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copied = json.loads(json.dumps(ast))
+    if is_array:
+        copied = from_dict(copied)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return size
+
+def argument_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+            "-f",
+            "--file",
+            type=str,
+            nargs="+",
+            required=True,
+            help="Requires the C files to convert."
+    )
+    args = parser.parse_args()
+
+    return args.file
+
+def main():
+    file_paths = argument_parser()
+
+    for file_path in file_paths:
+        ast = c_json.file_to_dict(file_path)
+
+        start = time.perf_counter()
+        aast = from_dict(ast)
+        from_dict_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        converted = to_dict(aast)
+        to_dict_time = time.perf_counter() - start
+
+        assert converted == ast, f"ERROR: {file_path} does not convert back to the same ast."
+
+        dict_size = measure(ast, False)
+        array_size = measure(ast, True)
+
+        print (
+            f"{file_path}: {get_size(aast)} nodes, dict {dict_size} bytes, array {array_size} bytes "
+            f"({dict_size / array_size:.1f}x), from_dict {from_dict_time * 1000:.2f} ms, "
+            f"to_dict {to_dict_time * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ sys.path.append(parentdir)
 import C.ConstantMutator as ConstantMutator
 import C.OperatorMutator as OperatorMutator
 import C.OtherMutator as OtherMutator
+import C.CArrayAst as ArrayAst
 
 def tree_traverser(ast: dict):
     """This function calls a helper function traverser() to traverse
@@ -29,57 +30,203 @@ def tree_traverser(ast: dict):
         (dict) node id to node type dictionary.
         (dict) traversed abstract syntax tree.
         (int) number of nodes in the traversed ast.
+        (set) set of goto labels.
+        (dict) node index, i.e., node id to the node's location (see add_to_index).
+        (dict) node metadata side tables (see new_metadata).
     """
 
     id_to_type = {}
     node_id = [0]
     goto_labels = set()
+    index = {}
 
-    traverser(ast, id_to_type, node_id, goto_labels)
+    traverser(ast, id_to_type, node_id, goto_labels, index)
 
-    ast["processed"] = True
+    metadata = new_metadata(len(index))
 
-    return id_to_type, ast, node_id[0]+1, goto_labels
+    return id_to_type, ast, node_id[0]+1, goto_labels, index, metadata
 
-def traverser(node: dict, id_to_type: dict, node_id: list, goto_labels: set):
+def traverser(
+        node: dict, id_to_type: dict, node_id: list, goto_labels: set, index: dict,
+        parent=None, parent_id=None, key=None, position=None, depth=0):
     """This function recursively traverses each node the syntax tree
     and does the following operations:
         (1) collects encountered node types in a set,
-        (2) assigns id to each node,
-        (3) collect labels where goto can jump to.
+        (2) assigns id to each node in preorder,
+        (3) collect labels where goto can jump to,
+        (4) indexes the node.
+    The node ids are not written into the nodes, so the ast stays as pycparser
+    generated it. The id of a node is its preorder position, so the index of any
+    ast of the same shape (see build_index) has the same ids.
 
     args:
         node (dict): current node.
         id_to_type (dict): node id to type dictionary.
         node_id (list): data structure to track node id.
         goto_labels (set): set of goto labels.
+        index (dict): node index to fill.
+        parent (dict, optional): parent node of the current node.
+        parent_id (int, optional): node id of the parent node.
+        key (str, optional): key of the current node in the parent node.
+        position (int, optional): position of the current node in the parent's list.
+        depth (int, optional): depth of the current node.
 
     returns:
         None.
     """
 
     if isinstance(node, dict):
-        node["nodeid"] = node_id[0]
-        id_to_type[node["nodeid"]] = node["_nodetype"]
+        current_id = node_id[0]
+        id_to_type[current_id] = node["_nodetype"]
         node_id[0] += 1
 
-        node["is_mutable"] = True
-        node["is_mutated"] = False
+        add_to_index(index, current_id, node, parent, parent_id, key, position, depth)
 
         if node["_nodetype"] == "Label":
             goto_labels.add(node["name"])
 
-        for key, value in node.items():
-            if key != "nodeid":
-                traverser(value, id_to_type, node_id, goto_labels)
+        for child_key, value in node.items():
+            traverser(
+                    value, id_to_type, node_id, goto_labels, index, node, current_id, child_key, None,
+                    depth+1)
     elif isinstance(node, list):
-        for item in node:
-            traverser(item, id_to_type, node_id, goto_labels)
+        for child_position, item in enumerate(node):
+            traverser(
+                    item, id_to_type, node_id, goto_labels, index, parent, parent_id, key,
+                    child_position, depth)
+
+def new_metadata(size: int):
+    """This function creates the node metadata side tables of an ast, which are kept
+    out of the ast nodes. Each table is a bytearray indexed by node id, i.e.,
+        "mutable": 1 if the node can be mutated (see mark_mutable_nodes). Otherwise, 0.
+
+    args:
+        size (int): number of nodes in the ast.
+
+    returns:
+        (dict) node metadata.
+    """
+
+    return {
+        "mutable": bytearray(b"\x01") * size
+    }
+
+def get_mutable_ids(metadata: dict):
+    """This function lists the ids of the mutable nodes.
+
+    args:
+        metadata (dict): node metadata (see new_metadata).
+
+    returns:
+        (list) mutable node ids in increasing order.
+    """
+
+    mutable = metadata["mutable"]
+
+    return [node_id for node_id in range(len(mutable)) if mutable[node_id]]
+
+def get_node_ids(index: dict):
+    """This function maps the nodes of the indexed ast to their node ids, as the
+    nodes do not hold their ids.
+
+    args:
+        index (dict): node index.
+
+    returns:
+        (dict) python object id of the node to its node id.
+    """
+
+    return {id(entry["node"]): node_id for node_id, entry in index.items()}
+
+def add_to_index(
+        index: dict, node_id: int, node: dict, parent: dict, parent_id: int, key: str,
+        position: int, depth: int):
+    """This function adds the node to the node index, so the node and its location in the
+    tree are accessed in O(1), instead of searching the tree.
+
+    args:
+        index (dict): node index, i.e., node id to the node, its parent, parent's id,
+        key in the parent, position in the parent's list (None, if not in a list), and depth.
+        node_id (int): node id of the node.
+        node (dict): node to add.
+        parent (dict): parent node of the node (None for the root).
+        parent_id (int): node id of the parent node (None for the root).
+        key (str): key of the node in the parent node.
+        position (int): position of the node in the parent's list.
+        depth (int): depth of the node.
+
+    returns:
+        None.
+    """
+
+    index[node_id] = {
+        "node": node,
+        "parent": parent,
+        "parent_id": parent_id,
+        "key": key,
+        "position": position,
+        "depth": depth
+    }
+
+def build_index(
+        node: dict, index=None, parent=None, parent_id=None, key=None, position=None, depth=0):
+    """This function builds the node index of an ast, e.g., an ast loaded from the disk,
+    in a single traversal. The node ids are assigned in preorder, as in tree_traverser().
+
+    args:
+        node (dict): current node.
+        index (dict, optional): node index to fill.
+        parent (dict, optional): parent node of the current node.
+        parent_id (int, optional): node id of the parent node.
+        key (str, optional): key of the current node in the parent node.
+        position (int, optional): position of the current node in the parent's list.
+        depth (int, optional): depth of the current node.
+
+    returns:
+        (dict) node index.
+    """
+
+    if index == None:
+        index = {}
+
+    if isinstance(node, dict) and "_nodetype" in node:
+        node_id = len(index)
+        add_to_index(index, node_id, node, parent, parent_id, key, position, depth)
+
+        for child_key, value in node.items():
+            build_index(value, index, node, node_id, child_key, None, depth+1)
+    elif isinstance(node, list):
+        for child_position, item in enumerate(node):
+            build_index(item, index, parent, parent_id, key, child_position, depth)
+
+    return index
+
+def get_path(index: dict, node_id: int):
+    """This function returns the path from the root to the node.
+
+    args:
+        index (dict): node index.
+        node_id (int): node id.
+
+    returns:
+        (list) node ids from the root to the node.
+    """
+
+    path = []
+
+    while node_id != None:
+        path.append(node_id)
+        node_id = index[node_id]["parent_id"]
+
+    path.reverse()
+
+    return path
 
 def clean_ast(node: dict):
     """This function removes all the key-item added post ast construction
     using pycparser as they are not recognized by pycparser and lead to
-    error during code generation.
+    error during code generation. Only the asts written before the node metadata
+    was moved to side tables (see new_metadata) have such key-items.
 
     args:
         node (dict): current node.
@@ -106,7 +253,8 @@ def clean_ast(node: dict):
 
 def mark(
         node: dict, parent: dict, mutable_node_ids: set, language_info: dict, builtins: set, 
-        shared_dict: dict, is_loop: dict, is_print: list, goto_labels: set):
+        shared_dict: dict, is_loop: dict, is_print: list, goto_labels: set, metadata: dict,
+        node_ids: dict):
     """This function checks the node type and other details to determine whether the node should be
     marked as mutable or not.
 
@@ -118,11 +266,15 @@ def mark(
         builtins (set): set of built-in functions/methods of JavaScript language
         shared_dict (dict): dictionary that holds shared information about the AST.
         goto_labels (set): set of label names where goto can jump to.
+        metadata (dict): node metadata, where the mutability is updated (see new_metadata).
+        node_ids (dict): python object id of the node to its node id (see get_node_ids).
 
     returns:
         None.
     """
 
+    node_id = node_ids[id(node)]
+    mutable = metadata["mutable"]
     
     op_names = ["UnaryOp", "BinaryOp", "Assignment"]
 
@@ -131,36 +283,37 @@ def mark(
         operators = operators + value
 
     if node["_nodetype"] not in shared_dict["handled-types"]:
-        node["is_mutable"] = False
+        mutable[node_id] = 0
         if node["_nodetype"] == "For" and node["next"] != None:
-            node["next"]["is_mutable"] = False
+            mutable[node_ids[id(node["next"])]] = 0
     elif node["_nodetype"] in shared_dict["handled-types"]:
         if node["_nodetype"] == "Decl" and len(node["quals"]) < 1:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif node["_nodetype"] == "Typename" and len(node["quals"]) < 1:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif node["_nodetype"] == "IdentifierType" and len(node["names"]) < 2:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif node["_nodetype"] == "Goto" and len(goto_labels) < 2:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif node["_nodetype"] in op_names and node["op"] not in operators:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif is_loop["is_loop_enter"] and is_loop["is_loop_next"]:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif is_print[0]:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif parent["_nodetype"] == "Return" and node["_nodetype"] == "Constant":
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif node["_nodetype"] == "ID" and node["name"] not in builtins:
-            node["is_mutable"] = False
+            mutable[node_id] = 0
         elif node["_nodetype"] == "Assignment" and node["op"] == "=":
-            node["is_mutable"] = False
-        elif node["is_mutable"]:
-            mutable_node_ids.add(node["nodeid"])
+            mutable[node_id] = 0
+        elif mutable[node_id]:
+            mutable_node_ids.add(node_id)
             
 def mark_mutable_nodes(
         node: dict, parent: dict, mutable_node_ids: set, language_info: dict, builtins: set, 
-        shared_dict: dict, is_loop: dict, is_print: list, goto_labels: set):
+        shared_dict: dict, is_loop: dict, is_print: list, goto_labels: set, metadata: dict,
+        index: dict, node_ids=None):
     """This function trecursively traversed each node in the pre-processed syntax tree
     and update mutability of nodes appropriately.
 
@@ -172,13 +325,22 @@ def mark_mutable_nodes(
         builtins (set): set of built-in functions/methods of JavaScript language
         shared_dict (dict): dictionary that holds shared information about the AST.
         goto_labels (set): set of label names where goto can jump to.
+        metadata (dict): node metadata, where the mutability is updated (see new_metadata).
+        index (dict): node index of the ast.
+        node_ids (dict, optional): python object id of the node to its node id. It is
+        built from the index if not given.
 
     returns:
         None.
     """
 
+    if node_ids == None:
+        node_ids = get_node_ids(index)
+
     if isinstance(node, dict):
-        mark(node, parent, mutable_node_ids, language_info, builtins, shared_dict, is_loop, is_print, goto_labels)
+        mark(
+                node, parent, mutable_node_ids, language_info, builtins, shared_dict, is_loop,
+                is_print, goto_labels, metadata, node_ids)
 
         parent = node
         for key, value in node.items():
@@ -189,7 +351,9 @@ def mark_mutable_nodes(
             if node["_nodetype"] == "FuncCall" and node["name"]["name"] == "printf":
                 is_print[0] = True
 
-            mark_mutable_nodes(value, parent, mutable_node_ids, language_info, builtins, shared_dict, is_loop, is_print, goto_labels)
+            mark_mutable_nodes(
+                    value, parent, mutable_node_ids, language_info, builtins, shared_dict, is_loop,
+                    is_print, goto_labels, metadata, index, node_ids)
 
             if node["_nodetype"] == "For":
                 is_loop["is_loop_enter"] = False
@@ -199,7 +363,9 @@ def mark_mutable_nodes(
                 is_print[0] = False
     elif isinstance(node, list):
         for item in node:
-            mark_mutable_nodes(item, parent, mutable_node_ids, language_info, builtins, shared_dict, is_loop, is_print, goto_labels)
+            mark_mutable_nodes(
+                    item, parent, mutable_node_ids, language_info, builtins, shared_dict, is_loop,
+                    is_print, goto_labels, metadata, index, node_ids)
 
     return
 
@@ -214,47 +380,9 @@ def map_id_to_node(node: dict, id_to_node: dict):
         None.
     """
 
-    # check if the current node is a dictionary and has the 'type' key.
-    if isinstance(node, dict) and "_nodetype" in node:
-
-        id_to_node[node["nodeid"]] = node
-
-        # recursively traverse each key-value in the dictionary.
-        for key, value in node.items():
-            map_id_to_node(value, id_to_node)
-    elif isinstance(node, list):
-        # if the node is a list, apply traversal to each element.
-        for item in node:
-            map_id_to_node(item, id_to_node)
+    for node_id, entry in build_index(node).items():
+        id_to_node[node_id] = entry["node"]
  
-def get_node(node: dict, node_id: list):
-    """This function recursively traverses the ast until it finds the node with the target
-    node id.
-
-    args:
-        node (dict): abstract syntax tree node.
-        node_id (int): target node id.
-
-    returns:
-        None.
-    """
-
-    if isinstance(node, dict):
-        if node["nodeid"] == node_id:
-            return node
-
-        for key, value in node.items():
-            ret = get_node(value, node_id)
-            if ret:
-                return ret
-    elif isinstance(node, list):
-        for item in node:
-            ret = get_node(item, node_id)
-            if ret:
-                return ret
-
-    return None
-
 def get_builtins(language_info: dict):
     """This function collects the builtin method names into a single set.
 
@@ -325,55 +453,129 @@ def select_mutator(
 
     return
 
+def detach(node: dict):
+    """This function shallow-copies the node along with its lists of plain values
+    (e.g., quals or names), which the mutators modify in place.
+
+    args:
+        node (dict): abstract syntax tree node.
+
+    returns:
+        (dict) copied node that shares its child nodes with the original node.
+    """
+
+    node = dict(node)
+
+    for key, value in node.items():
+        if isinstance(value, list) and not any(isinstance(item, dict) for item in value):
+            node[key] = list(value)
+
+    return node
+
 def node_mutator(
-        node: dict, parent: dict, language_info: dict, target_ids: set, shared_dict: dict, 
-        goto_labels: set
+        node: dict, node_id: int, parent: dict, language_info: dict, target_ids: set,
+        shared_dict: dict, goto_labels: set, path_children: dict, metadata: dict
 ):
-    """This function recursively traverses each node in the syntax tree
+    """This function recursively traverses the paths from the node to the target nodes
     and does following two operations:
         (1) seeks for the node with the target node id.
         (2) mutates the found target node id.
+    Only the nodes on the paths are copied (path copying), so the returned node shares
+    every other subtree with the passed node, which is left unmodified. The children on
+    the paths are taken from path_children (see get_path_children).
 
     args:
         nodes (dict): a node in the abstract syntax tree.
+        node_id (int): node id of the node.
         parent (dict): parent node of the current node.
         language_info (dict): c language information.
-        target_id (list): target node id to mutate.
+        target_ids (set): target node ids to mutate.
         shared_dict (dict): dictionary that holds shared information about the AST.
         goto_labels (set): set of label names where goto can jump to.
+        path_children (dict): node id to its children on the paths to the target nodes
+        (see get_path_children).
+        metadata (dict): node metadata of the ast (see new_metadata).
 
     returns:
-        (bool) false if the node was mutated; true, otherwise.
+        (dict) copied (and mutated) node.
     """
 
-    # Check if the current node is a dictionary and has the 'type' key
-    if isinstance(node, dict) and "_nodetype" in node:
-        assert "is_mutable" in node, f"ERROR: is_mutable not in {node}"
-        if (
-                node["nodeid"] in target_ids and 
-                node["_nodetype"] in shared_dict["handled-types"] and 
-                node["is_mutable"]
-        ):
-            node_copy = copy.deepcopy(node)
-            # Pass an empty set.
-            avoid_values = set()
-            select_mutator(node, parent, language_info, shared_dict, None, goto_labels, avoid_values)
-            if node == node_copy:
-                return False
-        parent = node
-        # Recursively traverse each key-value in the dictionary
-        for key, value in node.items():
-            _ = node_mutator(value, parent, language_info, target_ids, shared_dict, goto_labels)
-    elif isinstance(node, list):
-        # If the node is a list, apply traversal to each element
-        for item in node:
-            _ = node_mutator(item, parent, language_info, target_ids, shared_dict, goto_labels)
+    original = node
+    node = detach(node)
+
+    if (
+            node_id in target_ids and 
+            node["_nodetype"] in shared_dict["handled-types"] and 
+            metadata["mutable"][node_id]
+    ):
+        # The qualifier mutator also rewrites the quals of the node's type.type.
+        if node["_nodetype"] in ["Decl", "Typename"] and isinstance(node.get("type"), dict):
+            node["type"] = detach(node["type"])
+            if isinstance(node["type"].get("type"), dict):
+                node["type"]["type"] = detach(node["type"]["type"])
+        node_copy = detach(node)
+        # Pass an empty set.
+        avoid_values = set()
+        select_mutator(node, parent, language_info, shared_dict, None, goto_labels, avoid_values)
+        # An unchanged node's subtree is not mutated further.
+        if node == node_copy:
+            return node
 
-    return True
+    # Visit the children in preorder, so the mutations happen in the same order.
+    for child_id, key, position in path_children.get(node_id, []):
+        child = node[key] if position == None else node[key][position]
+        child = node_mutator(
+                child, child_id, node, language_info, target_ids, shared_dict, goto_labels,
+                path_children, metadata)
+        if position == None:
+            node[key] = child
+        else:
+            if node[key] is original[key]:
+                node[key] = list(node[key])
+            node[key][position] = child
+
+    return node
+
+def get_path_children(index: dict, target_ids: set):
+    """This function collects, from the node index, the children on the paths from
+    the root to the target nodes of each node on the paths.
+
+    args:
+        index (dict): node index.
+        target_ids (set): target node ids.
 
-def ast_mutator(ast: dict, language_info: dict, target_ids: set, shared_dict: dict, goto_labels: set):
+    returns:
+        (dict) node id to the list of (child id, key, position) of its children on the
+        paths, sorted in preorder.
+    """
+
+    path_children = {}
+
+    for target_id in target_ids:
+        node_id = target_id
+        while node_id in index and index[node_id]["parent_id"] != None:
+            entry = index[node_id]
+            child = (node_id, entry["key"], entry["position"])
+            children = path_children.setdefault(entry["parent_id"], [])
+            # The rest of the path was already collected from another target.
+            if child in children:
+                break
+            children.append(child)
+            node_id = entry["parent_id"]
+
+    for children in path_children.values():
+        children.sort(key=lambda child: child[0])
+
+    return path_children
+
+def ast_mutator(
+        ast: dict, language_info: dict, target_ids: set, shared_dict: dict, goto_labels: set,
+        index=None, metadata=None):
     """This function is the main function to mutate the passed AST.
-    The passed AST must be the processed AST returned from the tree_traverser() function.
+    The passed AST must be processed by the tree_traverser() function, which returns
+    its node metadata. The passed AST is not modified. Only the target nodes and their
+    ancestors are copied (see node_mutator), and the mutated AST shares all the other
+    subtrees with it, so the mutated AST must not be modified in place afterward.
 
     args:
         ast (dict): processed abstract syntax tree.
@@ -381,6 +583,8 @@ def ast_mutator(ast: dict, language_info: dict, target_ids: set, shared_dict: di
         target_id (list): target node id to mutate.
         shared_dict (dict): dictionary that holds shared information about the AST.
         goto_labels (set): set of label names where goto can jump to.
+        index (dict, optional): node index of the ast. It is built if not given.
+        metadata (dict): node metadata of the ast (see new_metadata).
 
     return:
         (dict): mutated abstract syntax tree.
@@ -388,9 +592,98 @@ def ast_mutator(ast: dict, language_info: dict, target_ids: set, shared_dict: di
     """
 
     assert (
-        "processed" in ast and ast["processed"]
+        metadata != None
     ), f"ERROR: Unprocessed abstract syntax tree was passed."
 
-    is_mutated = node_mutator(ast, ast, language_info, target_ids, shared_dict, goto_labels)
-    
-    return ast, is_mutated
+    if index == None:
+        index = build_index(ast)
+
+    path_children = get_path_children(index, target_ids)
+
+    mutated_ast = node_mutator(
+            ast, 0, ast, language_info, set(target_ids), shared_dict, goto_labels, path_children,
+            metadata)
+
+    return mutated_ast, True
+
+# Depth of the parent's child nodes that the mutators read, i.e., the type names of a
+# Decl parent (parent["type"]["type"]["names"], see ConstantMutator.constant_mutator).
+PARENT_DEPTH = 2
+
+def array_ast_mutator(
+        aast: dict, language_info: dict, target_ids: set, shared_dict: dict, goto_labels: set,
+        metadata: dict):
+    """This function mutates the AST in the array form (see CArrayAst). The target
+    nodes are visited in preorder as in ast_mutator(), with the same random draws, but
+    only the subtree of each target node and the fields of its parent are materialized,
+    and the changes are found against the seed values of the materialized nodes. The
+    mutations are returned as an overlay of the changed values instead of an AST.
+
+    args:
+        aast (dict): processed abstract syntax tree in the array form.
+        language_info (dict): c language information.
+        target_ids (set): target node ids to mutate.
+        shared_dict (dict): dictionary that holds shared information about the AST.
+        goto_labels (set): set of label names where goto can jump to.
+        metadata (dict): node metadata of the ast (see new_metadata).
+
+    return:
+        (dict): node id to the {key: value} changed by the mutations, which
+        ArrayAst.to_dict() applies.
+    """
+
+    assert (
+        metadata != None
+    ), f"ERROR: Unprocessed abstract syntax tree was passed."
+
+    parents = aast["parents"]
+    ends = aast["ends"]
+    size = ArrayAst.get_size(aast)
+
+    overlay = {}
+    # Targets under an unchanged target are not mutated (see node_mutator).
+    skip_end = 0
+
+    for node_id in sorted(target_ids):
+        if node_id < 0 or node_id >= size or node_id < skip_end:
+            continue
+        if (
+                ArrayAst.get_type(aast, node_id) not in shared_dict["handled-types"] or
+                not metadata["mutable"][node_id]
+        ):
+            continue
+
+        built = {}
+        node = ArrayAst.to_dict(aast, node_id, overlay, built)
+        parent = node
+        if parents[node_id] >= 0:
+            parent = ArrayAst.to_shallow_dict(aast, parents[node_id], PARENT_DEPTH, overlay)
+
+        # Pass an empty set.
+        avoid_values = set()
+        select_mutator(node, parent, language_info, shared_dict, None, goto_labels, avoid_values)
+
+        # The mutators only rewrite values, so the subtree keeps its node ids.
+        changes = {}
+        for current_id, current in built.items():
+            for key, value in current.items():
+                if ArrayAst.is_node(value) or ArrayAst.is_node_list(value):
+                    continue
+                if current_id in overlay and key in overlay[current_id]:
+                    seed_value = overlay[current_id][key]
+                elif key == "_nodetype":
+                    seed_value = ArrayAst.get_type(aast, current_id)
+                else:
+                    seed_value = ArrayAst.get_value(aast, current_id, key)
+                if value != seed_value:
+                    changes.setdefault(current_id, {})[key] = value
+
+        if len(changes) == 0:
+            skip_end = max(skip_end, ends[node_id])
+            continue
+
+        for current_id, values in changes.items():
+            overlay.setdefault(current_id, {}).update(values)
+
+    return overlay
+
@@ -0,0 +1,409 @@
+"""
+    This program reads and writes the asts in a compact binary format.
+
+    The format interns every string (node types, keys, names, coords, ...) into a
+    string table and encodes each ast node as a record of (key, value) entries,
+    where a child node is referenced by its record number. As the records are in
+    preorder, the record number of a node is its node id (see CAstMutator.build_index).
+    A node table maps the node ids to the record offsets, so a single node (with its
+    subtree) can be read without decoding the whole file. The file is laid out as:
+
+        header: magic, string count, record count, node table offset
+        string table: (length, utf-8 bytes) of each string
+        records: node records in preorder
+        node table: record offset of each record, i.e., of each node id
+
+    Running this program directly converts a binary ast file to json, or a json
+    ast file to the binary format.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import json
+import mmap
+import struct
+import argparse
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+MAGIC = b"NCCATAST"
+
+# File extension of the binary ast files.
+EXTENSION = ".ast"
+
+HEADER = struct.Struct("<8sIII")
+UINT = struct.Struct("<I")
+INT = struct.Struct("<q")
+FLOAT = struct.Struct("<d")
+
+# Value tags.
+NONE = 0
+TRUE = 1
+FALSE = 2
+INTEGER = 3
+REAL = 4
+STRING = 5
+LIST = 6
+NODE = 7
+DICT = 8
+
+def encode_value(value, strings: dict, records: list):
+    """This function encodes a value of an ast node.
+
+    args:
+        value (depends): value to encode.
+        strings (dict): string to its number in the string table.
+        records (list): encoded node records.
+
+    returns:
+        (bytes) encoded value.
+    """
+
+    if value == None:
+        return bytes([NONE])
+    elif value is True:
+        return bytes([TRUE])
+    elif value is False:
+        return bytes([FALSE])
+    elif isinstance(value, int):
+        return bytes([INTEGER]) + INT.pack(value)
+    elif isinstance(value, float):
+        return bytes([REAL]) + FLOAT.pack(value)
+    elif isinstance(value, str):
+        return bytes([STRING]) + UINT.pack(intern(value, strings))
+    elif isinstance(value, list):
+        encoded = bytearray([LIST])
+        encoded += UINT.pack(len(value))
+        for item in value:
+            encoded += encode_value(item, strings, records)
+        return bytes(encoded)
+    elif isinstance(value, dict) and "_nodetype" in value:
+        return bytes([NODE]) + UINT.pack(encode_node(value, strings, records))
+    elif isinstance(value, dict):
+        return bytes([DICT]) + encode_entries(value, strings, records)
+
+    assert False, f"ERROR: Unsupported ast value type: {type(value)}."
+
+def encode_entries(node: dict, strings: dict, records: list):
+    """This function encodes the (key, value) entries of a dictionary.
+
+    args:
+        node (dict): dictionary to encode.
+        strings (dict): string to its number in the string table.
+        records (list): encoded node records.
+
+    returns:
+        (bytes) encoded entries.
+    """
+
+    encoded = bytearray(UINT.pack(len(node)))
+    for key, value in node.items():
+        encoded += UINT.pack(intern(key, strings))
+        encoded += encode_value(value, strings, records)
+
+    return bytes(encoded)
+
+def encode_node(node: dict, strings: dict, records: list):
+    """This function encodes the node and its subtree into records in preorder.
+
+    args:
+        node (dict): ast node.
+        strings (dict): string to its number in the string table.
+        records (list): encoded node records, where the record number is the node id.
+
+    returns:
+        (int) record number of the node.
+    """
+
+    number = len(records)
+    # Reserve the slot, so the node precedes its children.
+    records.append(None)
+    records[number] = encode_entries(node, strings, records)
+
+    return number
+
+def intern(string: str, strings: dict):
+    """This function adds the string to the string table, if not already in it.
+
+    args:
+        string (str): string to add.
+        strings (dict): string to its number in the string table.
+
+    returns:
+        (int) number of the string.
+    """
+
+    if string not in strings:
+        strings[string] = len(strings)
+
+    return strings[string]
+
+def dumps(ast: dict):
+    """This function encodes the ast in the binary format.
+
+    args:
+        ast (dict): ast to encode.
+
+    returns:
+        (bytes) encoded ast.
+    """
+
+    strings = {}
+    records = []
+    encode_node(ast, strings, records)
+
+    string_table = bytearray()
+    for string in strings:
+        encoded = string.encode()
+        string_table += UINT.pack(len(encoded))
+        string_table += encoded
+
+    offset = HEADER.size + len(string_table)
+    record_data = bytearray()
+    node_table = bytearray()
+    for record in records:
+        node_table += UINT.pack(offset + len(record_data))
+        record_data += record
+
+    table_offset = offset + len(record_data)
+
+    return (
+        HEADER.pack(MAGIC, len(strings), len(records), table_offset) +
+        bytes(string_table) + bytes(record_data) + bytes(node_table))
+
+def dump(ast: dict, file_path: str):
+    """This function writes the ast to disk in the binary format.
+
+    args:
+        ast (dict): ast to write.
+        file_path (str): path to the binary ast file.
+
+    returns:
+        None.
+    """
+
+    with open(file_path, "wb") as f:
+        f.write(dumps(ast))
+
+def is_binary_ast(file_path: str):
+    """This function checks whether the file is a binary ast file.
+
+    args:
+        file_path (str): path to the file.
+
+    returns:
+        (bool) true if the file starts with the binary ast magic. Otherwise, false.
+    """
+
+    with open(file_path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def open_reader(buffer):
+    """This function reads the header and string table of a binary ast. The records
+    are decoded only when requested (see decode_record).
+
+    args:
+        buffer (bytes or mmap.mmap): content of the binary ast file.
+
+    returns:
+        (dict) reader, i.e., the buffer, the strings, the number of records, and the
+        offset of the node table.
+    """
+
+    magic, string_count, record_count, table_offset = HEADER.unpack_from(buffer, 0)
+
+    assert magic == MAGIC, f"ERROR: Not a binary ast file."
+
+    strings = []
+    position = HEADER.size
+    for _ in range(string_count):
+        (length,) = UINT.unpack_from(buffer, position)
+        position += UINT.size
+        strings.append(bytes(buffer[position:position + length]).decode())
+        position += length
+
+    return {
+        "buffer": buffer,
+        "strings": strings,
+        "record_count": record_count,
+        "table_offset": table_offset
+    }
+
+def decode_value(reader: dict, position: int):
+    """This function decodes a value at the position.
+
+    args:
+        reader (dict): binary ast reader (see open_reader).
+        position (int): position of the value in the buffer.
+
+    returns:
+        (depends) decoded value.
+        (int) position after the value.
+    """
+
+    buffer = reader["buffer"]
+    tag = buffer[position]
+    position += 1
+
+    if tag == NONE:
+        return None, position
+    elif tag == TRUE:
+        return True, position
+    elif tag == FALSE:
+        return False, position
+    elif tag == INTEGER:
+        return INT.unpack_from(buffer, position)[0], position + INT.size
+    elif tag == REAL:
+        return FLOAT.unpack_from(buffer, position)[0], position + FLOAT.size
+    elif tag == STRING:
+        return reader["strings"][UINT.unpack_from(buffer, position)[0]], position + UINT.size
+    elif tag == LIST:
+        (count,) = UINT.unpack_from(buffer, position)
+        position += UINT.size
+        items = []
+        for _ in range(count):
+            item, position = decode_value(reader, position)
+            items.append(item)
+        return items, position
+    elif tag == NODE:
+        return decode_record(reader, UINT.unpack_from(buffer, position)[0]), position + UINT.size
+    elif tag == DICT:
+        return decode_entries(reader, position)
+
+    assert False, f"ERROR: Unknown binary ast value tag: {tag}."
+
+def decode_entries(reader: dict, position: int):
+    """This function decodes the (key, value) entries of a dictionary.
+
+    args:
+        reader (dict): binary ast reader (see open_reader).
+        position (int): position of the entries in the buffer.
+
+    returns:
+        (dict) decoded dictionary.
+        (int) position after the entries.
+    """
+
+    buffer = reader["buffer"]
+    (count,) = UINT.unpack_from(buffer, position)
+    position += UINT.size
+
+    node = {}
+    for _ in range(count):
+        key = reader["strings"][UINT.unpack_from(buffer, position)[0]]
+        node[key], position = decode_value(reader, position + UINT.size)
+
+    return node, position
+
+def decode_record(reader: dict, number: int):
+    """This function decodes the node record and the records of its subtree.
+
+    args:
+        reader (dict): binary ast reader (see open_reader).
+        number (int): record number.
+
+    returns:
+        (dict) decoded node.
+    """
+
+    (offset,) = UINT.unpack_from(reader["buffer"], reader["table_offset"] + number * UINT.size)
+    node, _ = decode_entries(reader, offset)
+
+    return node
+
+def load(file_path: str):
+    """This function loads the whole ast from a binary ast file.
+
+    args:
+        file_path (str): path to the binary ast file.
+
+    returns:
+        (dict) loaded ast.
+    """
+
+    with open(file_path, "rb") as f:
+        reader = open_reader(f.read())
+
+    return decode_record(reader, 0)
+
+def load_nodes(file_path: str, node_ids: list):
+    """This function loads only the nodes with the node ids (and their subtrees) from
+    a binary ast file, without decoding the rest of the file.
+
+    args:
+        file_path (str): path to the binary ast file.
+        node_ids (list): node ids to load.
+
+    returns:
+        (dict) node id to loaded node, or None if the ast has no such node.
+    """
+
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            reader = open_reader(buffer)
+            nodes = {}
+            for node_id in node_ids:
+                if 0 <= node_id < reader["record_count"]:
+                    nodes[node_id] = decode_record(reader, node_id)
+                else:
+                    nodes[node_id] = None
+
+    return nodes
+
+def load_node(file_path: str, node_id: int):
+    """This function loads only the node with the node id (and its subtree) from
+    a binary ast file.
+
+    args:
+        file_path (str): path to the binary ast file.
+        node_id (int): node id to load.
+
+    returns:
+        (dict) loaded node, or None if the ast has no such node.
+    """
+
+    return load_nodes(file_path, [node_id])[node_id]
+
+def argument_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+            "-f",
+            "--file",
+            type=str,
+            required=True,
+            help="Requires the ast file to convert (binary to json, or json to binary)."
+    )
+    parser.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            default=None,
+            help="Path to the converted file (default: the ast file with the other extension)."
+    )
+    args = parser.parse_args()
+
+    return args.file, args.output
+
+def main():
+    file_path, output_path = argument_parser()
+
+    if is_binary_ast(file_path):
+        if output_path == None:
+            output_path = os.path.splitext(file_path)[0] + ".json"
+        with open(output_path, "w") as f:
+            json.dump(load(file_path), f, indent=4)
+    else:
+        if output_path == None:
+            output_path = os.path.splitext(file_path)[0] + EXTENSION
+        with open(file_path) as f:
+            dump(json.load(f), output_path)
+
+    print (f"{file_path} -> {output_path}")
+
+if __name__ == "__main__":
+    main()
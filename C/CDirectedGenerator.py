@@ -26,7 +26,7 @@ import C.CInitGenerator as CInit
 def directed_generator(
         arguments: dict, code_path: str, asts_path: str, ast_0: dict, goto_labels: set,
         language_info: dict, shared_dict: dict, ids_set_to_mutations: dict, mutable_node_ids: set,
-        root: str):
+        root: str, metadata=None):
     """This function mutates and generate c code from the input original poc code ast using
     the collected information during the learning phase.
 
@@ -39,6 +39,7 @@ def directed_generator(
         language_info (dict): language information.
         shared_dict (dict): dictionary that holds shared information about the AST.
         ids_set_to_mutations (dict): node id to mutation information.
+        metadata (dict, optional): node metadata of ast_0 (see CMutator.new_metadata).
 
     returns:
 
@@ -59,7 +60,7 @@ def directed_generator(
 
     CInit.test_generator(
             ast_0, language_info, witness_node_ids, shared_dict, passing_asts_path, 
-            passing_code_path, arguments, goto_labels, [])
+            passing_code_path, arguments, goto_labels, [], metadata=metadata, is_learning=False)
 
     failing_asts_path = f"{asts_path}/failings"
     failing_code_path = f"{code_path}/failings"
@@ -71,7 +72,7 @@ def directed_generator(
 
     CInit.test_generator(
             ast_0, language_info, node_ids_to_avoid, shared_dict, failing_asts_path,
-            failing_code_path, arguments, goto_labels, [])
+            failing_code_path, arguments, goto_labels, [], metadata=metadata, is_learning=False)
 
     return
 
@@ -0,0 +1,656 @@
+"""
+    This program searches the mutable nodes for the node sets whose mutation flips
+    the failing poc to a passing program by adaptive group testing (i.e., delta
+    debugging), instead of testing every nCr combination (see CInitGenerator).
+
+    Phase-1: Initial random variant code generation phase ("phase1-search": "ddmin",
+    "hierarchical", or "covering").
+
+    The "ddmin" search starts by mutating all the mutable nodes at once.
+        - A passing set is minimized by ddmin, i.e., by mutating its subsets and
+          complements, and the found minimal set is removed from it to search the rest.
+          The other subsets and complements that flipped are searched on their own as
+          well, as the rest may keep the program failing as a whole.
+        - An invalid set cannot tell, so it is split into halves.
+        - A failing set is dropped.
+    So, k flip-inducing node sets are found in about O(k log n) oracle calls.
+
+    The "hierarchical" search follows the scopes of the ast instead (i.e., the file,
+    functions, loops, and compound statements). It mutates all the mutable nodes of a
+    scope together, descends only into the scopes whose mutation does not keep the
+    program failing, and tests the nodes one by one only right under such scopes. A
+    passing scope none of whose inner scopes and nodes flips alone is minimized by
+    ddmin. So, the oracle calls grow with the number of relevant scopes.
+
+    The "covering" search tests the rows of a binary covering array of strength t
+    ("covering-strength") first, i.e., a few node sets such that every t nodes are
+    mutated together, and in every other way, in at least one of them (with the seed
+    for none of them mutated). Then, each row that does not keep the program failing
+    is searched as by "ddmin", without the nodes of the sets found in the earlier rows.
+
+    The sets of all the searches in progress are generated and tested together in one round,
+    under the search/ directory of the phase.
+
+    The found minimal sets (passings) and every tested failing set (failings) are then
+    collected into the asts/1 and code/1 directories of the phase, with the same
+    id_to_combination.json and grouped_files.json as the exhaustive search writes, so
+    the learning phase reads them unchanged (see CLearning_A.learning).
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import math
+import bisect
+import random
+import shutil
+import itertools
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import C.CAstMutator as CMutator
+import C.CArrayAst as ArrayAst
+import C.CInitGenerator as CInit
+import C.CSpliceEmitter as Splice
+import C.CMutationLog as MutationLog
+import C.SharedEditor as Shared
+
+# Outcomes of a tested node set, i.e., the group of its program.
+PASSING = "passings"
+FAILING = "failings"
+INVALID = "invalids"
+
+# Node types of the scopes of the "hierarchical" search.
+SCOPE_TYPES = {"FileAST", "FuncDef", "For", "While", "DoWhile", "Compound"}
+
+def test_generator(
+        ast: dict, language_info: dict, mutable_node_ids: list, shared_dict: dict,
+        asts_path: str, code_path: str, arguments: dict, goto_labels: list,
+        index=None, metadata=None, is_learning=True, mode="ddmin"):
+    """This function searches the flip-inducing node sets of the mutable nodes and
+    writes the programs of the found sets and the failing sets as the first (and only)
+    round of the phase.
+
+    args:
+        ast (dict): abstract syntax tree.
+        language_info (dict): language information.
+        mutable_node_ids (list): list of mutable node ids.
+        shared_dict (dict): dictionary that holds shared information about the AST.
+        asts_path (str): path to directory where created ast files should be stored.
+        code_path (str): path to directory where created code files should be stored.
+        arguments (dict): command-line arguments.
+        goto_labels (set): set of label names where goto can jump to.
+        index (dict, optional): node index of the ast. It is built if not given.
+        metadata (dict, optional): node metadata of the ast (see CMutator.new_metadata).
+        is_learning (bool, optional): true if the asts are read back by the learning
+        phases, which decides whether they are written (see Shared.retains_asts).
+        mode (str, optional): "ddmin", "hierarchical", or "covering" search.
+
+    returns:
+        (list) found flip-inducing node id sets.
+    """
+
+    if index == None:
+        index = CMutator.build_index(ast)
+    if metadata == None:
+        metadata = CMutator.new_metadata(len(index))
+
+    template = None
+    if arguments.get("splice-emission", True):
+        template = Splice.build_template(ast, index, metadata)
+
+    search_path = f"{os.path.dirname(asts_path)}/search"
+    for path in (search_path, f"{search_path}/asts", f"{search_path}/code"):
+        if not os.path.exists(path):
+            os.mkdir(path)
+
+    generation = {
+        "ast": ast,
+        "aast": ArrayAst.from_dict(ast),
+        "language_info": language_info,
+        "shared_dict": shared_dict,
+        "goto_labels": goto_labels,
+        "arguments": arguments,
+        "metadata": metadata,
+        "template": template,
+        "retain_asts": Shared.retains_asts(arguments, is_learning),
+        "asts_path": f"{search_path}/asts",
+        "code_path": f"{search_path}/code"
+    }
+
+    tasks = []
+    if len(mutable_node_ids) > 0 and mode == "hierarchical":
+        scopes = build_scopes(generation["aast"], mutable_node_ids)
+        tasks.append(descend(scopes[0], scopes))
+    elif len(mutable_node_ids) > 0 and mode == "covering":
+        rows = build_covering_array(mutable_node_ids, arguments.get("covering-strength", 2))
+        print (f"Covering array of strength {arguments.get('covering-strength', 2)}: {len(rows)} rows")
+        tasks.append(cover(rows))
+    elif len(mutable_node_ids) > 0:
+        tasks.append(explore(frozenset(mutable_node_ids)))
+
+    found, tested = search(generation, tasks)
+
+    found = collect_results(found, tested, generation, asts_path, code_path, mutable_node_ids)
+
+    print (f"GROUP SEARCH: {len(tested)} node sets tested, flip-inducing node sets: {[sorted(s) for s in found]}")
+
+    return [set(node_set) for node_set in found]
+
+def search(generation: dict, tasks: list):
+    """This function runs the searches in rounds. Every search in progress requests the
+    node sets it needs the outcomes of, and the node sets not tested yet are tested
+    together in a new round.
+
+    args:
+        generation (dict): generation inputs (see test_generator).
+        tasks (list): search tasks to start with (see explore, descend, and cover).
+
+    returns:
+        (list) found flip-inducing node sets.
+        (dict) tested node set to its outcome and its (round, ast id).
+    """
+
+    found = []
+    tested = {}
+
+    searches = [start(task) for task in tasks]
+
+    r = 0
+    while searches:
+        untested = []
+        for _, node_sets in searches:
+            for node_set in node_sets:
+                if node_set not in tested and node_set not in untested:
+                    untested.append(node_set)
+
+        if untested:
+            r += 1
+            print (f"Handling search round {r}...{[sorted(s) for s in untested]}")
+            tested.update(test_round(generation, untested, r))
+
+        next_searches = []
+        for task, node_sets in searches:
+            try:
+                next_searches.append((task, task.send([tested[s][0] for s in node_sets])))
+            except StopIteration as stop:
+                minimal_sets, subproblems = stop.value
+                found.extend(node_set for node_set in minimal_sets if node_set not in found)
+                for subproblem in subproblems:
+                    next_searches.append(start(explore(subproblem)))
+        searches = next_searches
+
+    return found, tested
+
+def start(task):
+    """This function starts the search task up to its first request.
+
+    args:
+        task (generator): search task (see explore).
+
+    returns:
+        (tuple) search task and the node sets it requests.
+    """
+
+    return task, next(task)
+
+def explore(node_set: frozenset):
+    """This function is the search task of a node set. It yields the lists of node sets
+    to test and receives their outcomes.
+
+    args:
+        node_set (frozenset): node ids to search.
+
+    returns:
+        (list) found minimal flip-inducing node sets.
+        (list) node sets left to search.
+    """
+
+    (outcome,) = yield [node_set]
+
+    if outcome == PASSING:
+        minimal_set, spares = yield from ddmin(node_set)
+        return [minimal_set], get_subproblems(node_set, minimal_set, spares)
+    elif outcome == INVALID and len(node_set) > 1:
+        return [], split(node_set, 2)
+
+    return [], []
+
+def descend(scope: dict, scopes: dict):
+    """This function is the search task of a scope (see build_scopes). The inner scopes
+    and the nodes right under the scope are searched in parallel, only if mutating the
+    whole scope does not keep the program failing.
+
+    args:
+        scope (dict): scope to search.
+        scopes (dict): scope node id to scope.
+
+    returns:
+        (list) found minimal flip-inducing node sets.
+        (list) node sets left to search, i.e., the other flip-inducing node sets met
+        by ddmin (see get_subproblems).
+    """
+
+    (outcome,) = yield [scope["node_ids"]]
+
+    if outcome == FAILING:
+        return [], []
+
+    tasks = [descend(scopes[scope_id], scopes) for scope_id in scope["scopes"]]
+    tasks += [explore(frozenset([node_id])) for node_id in scope["direct_node_ids"]]
+
+    found = []
+    subproblems = []
+    for minimal_sets, rest in (yield from parallel(tasks)):
+        found.extend(minimal_sets)
+        subproblems.extend(rest)
+
+    # The flip needs the nodes of more than one inner scope.
+    if outcome == PASSING and len(found) == 0:
+        minimal_set, spares = yield from ddmin(scope["node_ids"])
+        found.append(minimal_set)
+        subproblems.extend(spare - minimal_set for spare in spares if spare - minimal_set)
+
+    return found, subproblems
+
+def cover(rows: list):
+    """This function is the search task of the covering array rows. The rows are tested
+    together, and the rows that do not keep the program failing are then searched one by
+    one, apart from the nodes of the already found sets.
+
+    args:
+        rows (list): node sets of the rows (see build_covering_array).
+
+    returns:
+        (list) found minimal flip-inducing node sets.
+        (list) node sets left to search, i.e., none.
+    """
+
+    outcomes = yield rows
+
+    found = []
+    for row, outcome in zip(rows, outcomes):
+        if outcome == FAILING:
+            continue
+        node_sets = [row.difference(*found)]
+        while node_sets:
+            subproblems = []
+            for minimal_sets, rest in (yield from parallel([explore(node_set) for node_set in node_sets if node_set])):
+                found.extend(node_set for node_set in minimal_sets if node_set not in found)
+                subproblems.extend(rest)
+            node_sets = subproblems
+
+    return found, []
+
+def build_covering_array(mutable_node_ids: list, t: int, seed=0):
+    """This function builds the rows of a binary covering array of strength t over the
+    mutable nodes, i.e., for every t nodes, each of their mutated or not combinations
+    but the none mutated one (i.e., the seed) is in a row.
+
+    For t = 1, a single row mutates all the nodes. For t = 2, the rows are built
+    directly: each node is mutated in a distinct set of ceil((m + 1) / 2) of the m
+    rows, and any two such sets overlap without either containing the other, so n
+    nodes take the smallest m with C(m, ceil((m + 1) / 2)) >= n. Otherwise, random
+    rows, each mutating every node with a half chance, are added until all are covered.
+
+    args:
+        mutable_node_ids (list): list of mutable node ids.
+        t (int): strength of the covering array.
+        seed (int, optional): rng seed of the random rows.
+
+    returns:
+        (list) node sets (frozenset) of the rows.
+    """
+
+    node_ids = sorted(mutable_node_ids)
+    t = max(1, min(t, len(node_ids)))
+
+    if t == 1:
+        return [frozenset(node_ids)]
+    elif t == 2:
+        m = 1
+        while math.comb(m, (m + 2) // 2) < len(node_ids):
+            m += 1
+        columns = itertools.combinations(range(m), (m + 2) // 2)
+        rows = [set() for _ in range(m)]
+        for node_id, column in zip(node_ids, columns):
+            for row in column:
+                rows[row].add(node_id)
+        return [frozenset(row) for row in rows if row]
+
+    rng = random.Random(seed)
+
+    def random_row():
+        return frozenset(node_id for node_id in node_ids if rng.random() < 0.5)
+
+    # Half as many random rows as to leave about one combination uncovered, as the rest
+    # are covered by the rows added one by one.
+    patterns = [pattern for pattern in itertools.product((0, 1), repeat=t) if any(pattern)]
+    combinations_size = math.comb(len(node_ids), t) * len(patterns)
+    rows = [random_row() for _ in range(math.ceil(math.log(combinations_size) * 2 ** t / 2))]
+
+    # Node id to the bits of the rows that mutate it.
+    masks = {node_id: 0 for node_id in node_ids}
+    for i, row in enumerate(rows):
+        for node_id in row:
+            masks[node_id] |= 1 << i
+    full = (1 << len(rows)) - 1
+
+    uncovered = []
+    for columns in itertools.combinations(node_ids, t):
+        for pattern in patterns:
+            bits = full
+            for node_id, value in zip(columns, pattern):
+                bits &= masks[node_id] if value else full & ~masks[node_id]
+            if bits == 0:
+                uncovered.append((columns, pattern))
+
+    while uncovered:
+        row = random_row()
+        remaining = [
+            (columns, pattern) for columns, pattern in uncovered
+            if any((node_id in row) != bool(value) for node_id, value in zip(columns, pattern))
+        ]
+        if len(remaining) < len(uncovered):
+            rows.append(row)
+        uncovered = remaining
+
+    return [row for row in rows if row]
+
+def parallel(tasks: list):
+    """This function runs the search tasks side by side as a single task, i.e., it
+    requests the node sets of all the tasks at once.
+
+    args:
+        tasks (list): search tasks.
+
+    returns:
+        (list) return values of the tasks.
+    """
+
+    values = [None] * len(tasks)
+    pending = []
+    for i, task in enumerate(tasks):
+        pending.append((i, task, next(task)))
+
+    while pending:
+        outcomes = yield [node_set for _, _, node_sets in pending for node_set in node_sets]
+
+        next_pending = []
+        for i, task, node_sets in pending:
+            task_outcomes, outcomes = outcomes[:len(node_sets)], outcomes[len(node_sets):]
+            try:
+                next_pending.append((i, task, task.send(task_outcomes)))
+            except StopIteration as stop:
+                values[i] = stop.value
+        pending = next_pending
+
+    return values
+
+def build_scopes(aast: dict, mutable_node_ids: list):
+    """This function builds the scope tree of the mutable nodes. As the node ids are
+    in preorder, the mutable nodes of a scope are the ones in its subtree range, i.e.,
+    between the scope's node id and the end of its subtree (see CArrayAst).
+
+    args:
+        aast (dict): abstract syntax tree in the array form.
+        mutable_node_ids (list): list of mutable node ids.
+
+    returns:
+        (dict) scope node id to scope, i.e., its mutable node ids, inner scope node ids,
+        and the mutable node ids right under it (i.e., not in any inner scope).
+    """
+
+    node_ids = sorted(mutable_node_ids)
+    ends = aast["ends"]
+    parents = aast["parents"]
+
+    def get_scope_id(node_id: int):
+        # The innermost scope strictly above the node.
+        scope_id = parents[node_id]
+        while ArrayAst.get_type(aast, scope_id) not in SCOPE_TYPES:
+            scope_id = parents[scope_id]
+        return scope_id
+
+    scopes = {}
+    for scope_id in range(ArrayAst.get_size(aast)):
+        if scope_id > 0 and ArrayAst.get_type(aast, scope_id) not in SCOPE_TYPES:
+            continue
+        first = bisect.bisect_right(node_ids, scope_id)
+        last = bisect.bisect_left(node_ids, ends[scope_id])
+        if scope_id == 0 or first < last:
+            scopes[scope_id] = {
+                "node_ids": frozenset(node_ids[first:last]),
+                "scopes": [],
+                "direct_node_ids": []
+            }
+            if scope_id > 0:
+                scopes[get_scope_id(scope_id)]["scopes"].append(scope_id)
+
+    for node_id in node_ids:
+        scopes[get_scope_id(node_id)]["direct_node_ids"].append(node_id)
+
+    return scopes
+
+def ddmin(node_set: frozenset):
+    """This function minimizes the flip-inducing node set by delta debugging, i.e.,
+    it tests the n subsets and their complements at once, and continues with the first
+    one that flips, or with twice as many subsets if none does. The other ones that
+    flip are returned to be searched on their own.
+
+    args:
+        node_set (frozenset): flip-inducing node ids.
+
+    returns:
+        (frozenset) 1-minimal flip-inducing node set.
+        (list) other flipped candidates.
+    """
+
+    spares = []
+
+    n = 2
+    while len(node_set) > 1:
+        subsets = split(node_set, n)
+        # With two subsets, each is the other's complement.
+        complements = [node_set - subset for subset in subsets] if n > 2 else []
+
+        outcomes = yield subsets + complements
+
+        flipped = [
+            candidate for candidate, outcome in zip(subsets + complements, outcomes) if outcome == PASSING
+        ]
+        # The other flipped candidates may hold other flip-inducing node sets.
+        spares.extend(flipped[1:])
+        if flipped and flipped[0] in subsets:
+            node_set, n = flipped[0], 2
+        elif flipped:
+            node_set, n = flipped[0], max(n - 1, 2)
+        elif n < len(node_set):
+            n = min(2 * n, len(node_set))
+        else:
+            break
+
+    return node_set, spares
+
+def get_subproblems(node_set: frozenset, minimal_set: frozenset, spares: list):
+    """This function gets the node sets left to search after ddmin found the minimal
+    set of the node set, i.e., the rest of the node set and, as the rest may keep the
+    program failing as a whole, each flipped candidate ddmin did not continue with
+    (without the minimal set).
+
+    args:
+        node_set (frozenset): minimized node ids.
+        minimal_set (frozenset): found minimal flip-inducing node set.
+        spares (list): other flipped candidates (see ddmin).
+
+    returns:
+        (list) node sets left to search.
+    """
+
+    subproblems = []
+    for subproblem in [node_set - minimal_set] + [spare - minimal_set for spare in spares]:
+        if subproblem and subproblem not in subproblems:
+            subproblems.append(subproblem)
+
+    return subproblems
+
+def split(node_set: frozenset, n: int):
+    """This function splits the node set into n subsets of consecutive node ids.
+
+    args:
+        node_set (frozenset): node ids to split.
+        n (int): number of subsets.
+
+    returns:
+        (list) subsets.
+    """
+
+    node_ids = sorted(node_set)
+
+    return [
+        frozenset(node_ids[len(node_ids) * i // n:len(node_ids) * (i + 1) // n]) for i in range(n)
+    ]
+
+def test_round(generation: dict, node_sets: list, r: int):
+    """This function generates and tests the programs of the node sets in the search
+    round directories.
+
+    args:
+        generation (dict): generation inputs (see test_generator).
+        node_sets (list): node sets to test.
+        r (int): round number.
+
+    returns:
+        (dict) node set to its outcome and its (round, ast id).
+    """
+
+    asts_path = f"{generation['asts_path']}/{r}"
+    code_path = f"{generation['code_path']}/{r}"
+    os.mkdir(asts_path)
+    os.mkdir(code_path)
+
+    arguments = generation["arguments"]
+
+    CInit.test_generator_parallelized(
+            generation["ast"], generation["language_info"],
+            [sorted(node_set) for node_set in node_sets], generation["shared_dict"],
+            asts_path, code_path, generation["goto_labels"], arguments=arguments,
+            metadata=generation["metadata"], template=generation["template"],
+            retain_asts=generation["retain_asts"],
+            mutation_log=f"{generation['asts_path']}/{MutationLog.LOG_NAME}",
+            aast=generation["aast"])
+
+    if os.path.exists(f"{code_path}/grouped_files.json"):
+        grouped_files = Shared.load_json(f"{code_path}/grouped_files.json")
+    else:
+        grouped_files = Shared.group_all_programs(arguments, code_path)
+
+    outcomes = {}
+    for ast_id, node_set in enumerate(node_sets, start=1):
+        # A program that failed to generate is taken as invalid.
+        outcome = INVALID
+        for group in (PASSING, FAILING):
+            if ast_id in grouped_files[group]:
+                outcome = group
+        outcomes[node_set] = (outcome, (r, ast_id))
+
+    return outcomes
+
+def collect_results(
+        found: list, tested: dict, generation: dict, asts_path: str, code_path: str, mutable_node_ids: list):
+    """This function collects the programs of the found node sets and the failing node
+    sets from the search rounds into the first round directory of the phase, with their
+    mutation records. The found node sets the learning phase would identify twice are
+    not collected (see drop_subsumed_sets).
+
+    args:
+        found (list): found flip-inducing node sets.
+        tested (dict): tested node set to its outcome and its (round, ast id).
+        generation (dict): generation inputs (see test_generator).
+        asts_path (str): path to directory where the collected ast files are stored.
+        code_path (str): path to directory where the collected code files are stored.
+        mutable_node_ids (list): list of mutable node ids.
+
+    returns:
+        (list) collected flip-inducing node sets.
+    """
+
+    os.mkdir(f"{asts_path}/1")
+    os.mkdir(f"{code_path}/1")
+
+    failing_sets = [node_set for node_set, (outcome, _) in tested.items() if outcome == FAILING]
+    found = drop_subsumed_sets(found, failing_sets, mutable_node_ids)
+
+    node_sets = found + failing_sets
+
+    search_log = f"{generation['asts_path']}/{MutationLog.LOG_NAME}"
+    logs = MutationLog.load(search_log) if os.path.exists(search_log) else {}
+
+    id_to_combination = {}
+    test_results = []
+    records = []
+    for ast_id, node_set in enumerate(node_sets, start=1):
+        outcome, (r, search_id) = tested[node_set]
+
+        shutil.copy(
+                f"{generation['code_path']}/{r}/code__{search_id}.c", f"{code_path}/1/code__{ast_id}.c")
+
+        ast_file_path = Shared.find_ast_file(f"{generation['asts_path']}/{r}", search_id)
+        if ast_file_path != None:
+            shutil.copy(
+                    ast_file_path,
+                    f"{asts_path}/1/ast__{ast_id}{os.path.splitext(ast_file_path)[1]}")
+
+        record = logs.get(f"{r}/{search_id}")
+        if record != None:
+            records.append(MutationLog.make_record(
+                    f"1/{ast_id}", record["combination"], record["seed"], record["edits"]))
+
+        id_to_combination[ast_id] = sorted(node_set)
+        test_results.append((ast_id, outcome == PASSING, True, None))
+
+    MutationLog.append(f"{asts_path}/{MutationLog.LOG_NAME}", records)
+
+    Shared.group_writer(f"{code_path}/1", test_results)
+    Shared.json_writer(id_to_combination, f"{asts_path}/1/id_to_combination.json")
+
+    return found
+
+def drop_subsumed_sets(found: list, failing_sets: list, mutable_node_ids: list):
+    """This function drops the found node sets that are found again or hold another found
+    set (e.g., of another search), and the sets of more than one node that hold a node
+    identified on its own, i.e., a found single node or a node in none of the failing
+    sets (see CLearning_A.get_always_existing_nodes). So, the learning phase identifies
+    no node both on its own and in a set. For example, given the following,
+
+    found = [{17}, {38, 41}, {39}, {17}], failing_sets = [{1, 38}]
+
+    and the mutable nodes 1, 17, 38, 39, and 41, {38, 41} is dropped, as 41 is in none
+    of the failing sets.
+
+    args:
+        found (list): found flip-inducing node sets.
+        failing_sets (list): tested failing node sets.
+        mutable_node_ids (list): list of mutable node ids.
+
+    returns:
+        (list) found node sets without the subsumed ones.
+    """
+
+    single_nodes = {node_id for node_set in found if len(node_set) == 1 for node_id in node_set}
+    if failing_sets:
+        single_nodes.update(set(mutable_node_ids).difference(*failing_sets))
+
+    refined = []
+    for node_set in found:
+        if node_set in refined or any(other < node_set for other in found):
+            continue
+        if len(node_set) > 1 and node_set & single_nodes:
+            continue
+        refined.append(node_set)
+
+    return refined
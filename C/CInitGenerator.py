@@ -8,8 +8,10 @@
 
 import json
 import copy
+import math
 import os, sys
 import random
+import shutil
 
 from multiprocessing import Pool
 
@@ -20,12 +22,15 @@ parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
 import C.CAstMutator as CMutator
+import C.CArrayAst as ArrayAst
+import C.CSpliceEmitter as Splice
+import C.CMutationLog as MutationLog
 import C.SharedEditor as Shared
 
 def test_generator(
         ast: dict, language_info: dict, mutable_node_ids: set, shared_dict: dict,
         asts_path: str, code_path: str, arguments: dict, goto_labels: list,
-        combinations: set):
+        combinations: set, index=None, metadata=None, is_learning=True):
     """This function randomly mutates and generates c code from the input original poc code ast.
 
     args:
@@ -38,73 +43,226 @@ def test_generator(
         arguments (dict): command-line arguments.
         goto_labels (set): set of label names where goto can jump to.
         combinations (list): list of pre-populated, if any, node id combinations.
+        index (dict, optional): node index of the ast. It is built if not given.
+        metadata (dict, optional): node metadata of the ast (see CMutator.new_metadata).
+        Without it, every node is taken as mutable.
+        is_learning (bool, optional): true if the asts are read back by the learning
+        phases, which decides whether they are written (see Shared.retains_asts).
 
     returns:
         None.
     """
  
+    if index == None:
+        index = CMutator.build_index(ast)
+    if metadata == None:
+        metadata = CMutator.new_metadata(len(index))
+
+    # The seed is rendered once, and the code of every variant is spliced from it.
+    template = None
+    if arguments.get("splice-emission", True):
+        template = Splice.build_template(ast, index, metadata)
+
+    retain_asts = Shared.retains_asts(arguments, is_learning)
+
+    # Every variant of the phase is recorded in a single mutation log.
+    mutation_log = f"{asts_path}/{MutationLog.LOG_NAME}"
+
+    # The workers mutate the compact array form of the ast (see CArrayAst).
+    aast = ArrayAst.from_dict(ast)
+
     combinations_size = len(combinations)
 
+    # With "superset-pruning", a superset of a combination that already flipped the output
+    # is taken to flip it as well, so it is not generated at the next r (see
+    # CLearning_A.collect_combinations).
+    is_pruning = combinations_size == 0 and arguments.get("superset-pruning", False)
+    flipped_combinations = []
+
+    # With "oracle-budget", the levels share a total number of programs to test, and a
+    # level larger than its share is sampled (see Shared.sample_combinations).
+    budget = arguments.get("oracle-budget", 0) if combinations_size == 0 else 0
+    spent = 0
+
+    def is_pruned(combination):
+        return any(flipped.issubset(combination) for flipped in flipped_combinations)
+
     i = 1
     for r in range(1, len(mutable_node_ids) + 1):
 
+        if budget > 0 and spent >= budget:
+            break
+
         if not os.path.exists(f"{code_path}/{r}") and not os.path.exists(f"{asts_path}/{r}"):
             if r > 1:
-                # Check all the generated code in r-1 directory. 
-                grouped_files = Shared.group_all_programs(arguments, f"{code_path}/{r-1}")
+                # Check all the generated code in r-1 directory, unless it was already
+                # tested during the generation (see "oracle-stdin").
+                if os.path.exists(f"{code_path}/{r-1}/grouped_files.json"):
+                    grouped_files = Shared.load_json(f"{code_path}/{r-1}/grouped_files.json")
+                else:
+                    grouped_files = Shared.group_all_programs(arguments, f"{code_path}/{r-1}")
+                pruned = []
+                if os.path.exists(f"{asts_path}/{r-1}/pruned.json"):
+                    pruned = Shared.load_json(f"{asts_path}/{r-1}/pruned.json")
                 # If no newly generated files are grouped as failing programs, it indicates that
                 # all modifications flipped the failing beahviour to passing.
-                if len(grouped_files["failings"]) == 0 and len(grouped_files["passings"]) > 0:
+                if len(grouped_files["failings"]) == 0 and (len(grouped_files["passings"]) > 0 or len(pruned) > 0):
                     break
+                if is_pruning:
+                    id_to_combination = Shared.load_json(f"{asts_path}/{r-1}/id_to_combination.json")
+                    for ast_id, combination in id_to_combination.items():
+                        if int(ast_id) in grouped_files["passings"]:
+                            flipped_combinations.append(set(combination))
             os.mkdir(f"{asts_path}/{r}")
             os.mkdir(f"{code_path}/{r}")
 
-        if combinations_size == 0:
+        # Each level takes up to half of the rest of the budget (the last level all of it),
+        # so the smaller combinations, which the learning phase relies on most, are tested
+        # the most.
+        quota = None
+        if budget > 0:
+            quota = budget - spent if r == len(mutable_node_ids) else math.ceil((budget - spent) / 2)
+
+        pruned = []
+        if combinations_size == 0 and quota != None and math.comb(len(mutable_node_ids), r) > quota:
+            combinations, pruned = Shared.sample_combinations(
+                    mutable_node_ids, r, quota, is_pruned if is_pruning else None)
+            print (f"Sampled {len(combinations)} out of {math.comb(len(mutable_node_ids), r)} combinations at r = {r}")
+        elif combinations_size == 0:
             combinations = Shared.generate_combinations(mutable_node_ids, r)
+            if is_pruning:
+                pruned = [combination for combination in combinations if is_pruned(combination)]
+                combinations = [combination for combination in combinations if not is_pruned(combination)]
+
+        if is_pruning and len(flipped_combinations) > 0:
+            print (f"Pruned {len(pruned)} supersets of the flipped combinations at r = {r}")
+            Shared.json_writer([list(combination) for combination in pruned], f"{asts_path}/{r}/pruned.json")
+
+        i = r
+        spent += len(combinations)
+
+        if len(combinations) == 0:
+            # Every combination was pruned.
+            Shared.json_writer({}, f"{asts_path}/{r}/id_to_combination.json")
+            Shared.group_writer(f"{code_path}/{r}", [])
+            continue
 
         print (f"Handling r = {r}...{combinations}")
 
         test_generator_parallelized(
                 ast, language_info, combinations, shared_dict, 
-                f"{asts_path}/{r}", f"{code_path}/{r}", goto_labels)
-
-        i = r
+                f"{asts_path}/{r}", f"{code_path}/{r}", goto_labels, arguments=arguments,
+                metadata=metadata, template=template, retain_asts=retain_asts,
+                mutation_log=mutation_log, aast=aast)
 
     if os.path.exists(f"{code_path}/{i}") and not os.path.exists(f"{code_path}/{i}/grouped_files.json"):
         grouped_files = Shared.group_all_programs(arguments, f"{code_path}/{i}")
 
+# Seed ast (in the array form) and the other read-only inputs shared by all the tasks
+# of a worker process.
+# They are set once per worker by init_worker, so the tasks only carry the ast id
+# and the combination.
+GENERATION = {}
+
+def init_worker(
+        aast: dict, language_info: dict, shared_dict: dict, asts_path: str, code_path: str,
+        goto_labels: set, arguments: dict, metadata: dict, template=None, retain_asts=True,
+        workspaces_root=None):
+    """This function initializes a generation worker process with the inputs shared by
+    all of its tasks.
+
+    args:
+        aast (dict): abstract syntax tree in the array form (see CArrayAst).
+        language_info (dict): language information.
+        shared_dict (dict): dictionary that holds shared information about the AST.
+        asts_path (str): path to directory where created ast files should be stored.
+        code_path (str): path to directory where created code files should be stored.
+        goto_labels (set): set of label names where goto can jump to.
+        arguments (dict): arguments dictionary.
+        metadata (dict): node metadata of the ast (see CMutator.new_metadata).
+        template (dict, optional): template of the ast to splice the code of the
+        mutated asts from (see Splice.build_template).
+        retain_asts (bool, optional): write the mutated asts to disk.
+        workspaces_root (str, optional): directory under which the oracle workspace of
+        the worker is created, if the worker tests the code.
+
+    returns:
+        None.
+    """
+
+    GENERATION["aast"] = aast
+    GENERATION["language_info"] = language_info
+    GENERATION["shared_dict"] = shared_dict
+    GENERATION["asts_path"] = asts_path
+    GENERATION["code_path"] = code_path
+    GENERATION["goto_labels"] = goto_labels
+    GENERATION["arguments"] = arguments
+    GENERATION["metadata"] = metadata
+    GENERATION["template"] = template
+    GENERATION["retain_asts"] = retain_asts
+
+    if workspaces_root != None:
+        Shared.init_grouping_worker(workspaces_root)
+
 def worker(args: list):
     """this function mutates ast and writes code to the designated path.
+    With "oracle-stdin", the code is tested in memory right away, and it is written
+    to disk only if it is a valid (i.e., passing or failing) code.
 
     args:
-        args (list): list of arguments.
+        args (list): ast id, combination set, and rng seed of the mutation.
 
     returns:
         (int) ast id.
         (set) a combination set.
+        (tuple) test result of the code (see Shared.group_writer), or None if not tested.
+        (list) edits of the mutation (see ArrayAst.get_edits).
     """
 
-    ast_id, combination, ast, language_info, shared_dict, asts_path, code_path, goto_labels = args
+    ast_id, combination, seed = args
 
-    # Copy the ast before passing to ast_mutator to prevent modifying the original.
-    ast_copy = copy.deepcopy(ast)
+    aast = GENERATION["aast"]
+    language_info = GENERATION["language_info"]
+    shared_dict = GENERATION["shared_dict"]
+    asts_path = GENERATION["asts_path"]
+    code_path = GENERATION["code_path"]
+    goto_labels = GENERATION["goto_labels"]
+    arguments = GENERATION["arguments"]
+    metadata = GENERATION["metadata"]
+    template = GENERATION["template"]
+    retain_asts = GENERATION["retain_asts"]
 
-    try:
-        (
-            mutated_ast, 
-            is_mutated 
-        ) = CMutator.ast_mutator(ast_copy, language_info, combination, shared_dict, goto_labels)
-
-        if is_mutated:
-            # Write ast to disk.
-            ast_file_path = f"{asts_path}/ast__{ast_id}.json"
-            Shared.ast_writer(mutated_ast, ast_file_path)
+    # The mutation of a variant can be replayed from its seed.
+    random.seed(seed)
 
+    try:
+        # Only the values changed by the mutation are kept, apart from the seed ast.
+        overlay = CMutator.array_ast_mutator(
+                aast, language_info, combination, shared_dict, goto_labels, metadata)
+
+        # Write ast to disk in the background, while the code is emitted (and tested).
+        ast_writing = None
+        if retain_asts:
+            ast_file_path = f"{asts_path}/ast__{ast_id}{Shared.get_ast_extension(arguments)}"
+            ast_writing = Shared.ast_writer_async(ArrayAst.to_dict(aast, 0, overlay), ast_file_path)
+
+        code_file_path = f"{code_path}/code__{ast_id}.c"
+        code = Splice.emit_overlay(template, aast, overlay, combination)
+
+        test_result = None
+        if arguments != None and arguments.get("oracle-stdin"):
+            is_pass, is_executed, reason = Shared.test_code(arguments, code_file_path, code)
+            if is_executed:
+                Shared.text_writer(code, code_file_path)
+            test_result = (ast_id, is_pass, is_executed, reason)
+        else:
             # Write code to disk.
-            code_file_path = f"{code_path}/code__{ast_id}.c"
-            Shared.code_writer(ast_file_path, code_file_path)
+            Shared.text_writer(code, code_file_path)
 
-            return ast_id, combination
+        if ast_writing != None:
+            ast_writing.result()
+
+        return ast_id, combination, test_result, ArrayAst.get_edits(aast, overlay)
     except Exception as e:
         print(f"ERROR (BUT CONTINUE): {e}")
 
@@ -112,7 +270,8 @@ def worker(args: list):
 
 def test_generator_parallelized(
         ast: dict, language_info: dict, all_combinations: list, shared_dict: dict,
-        asts_path: str, code_path: str, goto_labels: set, num_processors=None):
+        asts_path: str, code_path: str, goto_labels: set, num_processors=None, arguments=None,
+        metadata=None, template=None, retain_asts=True, mutation_log=None, aast=None):
     """This function randomly mutates and generates js code from the input original poc code ast.
 
     args:
@@ -124,24 +283,65 @@ def test_generator_parallelized(
         code_path (str): path to directory where created code files should be stored.
         goto_labels (set): set of label names where goto can jump to.
         num_processors (int, optional): number of processors to use for parallel processing.
+        arguments (dict, optional): arguments dictionary. With "oracle-stdin", the code
+        is tested during the generation, and grouped_files.json is written here.
+        metadata (dict, optional): node metadata of the ast (see CMutator.new_metadata).
+        template (dict, optional): template of the ast to splice the code of the
+        mutated asts from (see Splice.build_template). The code is fully generated
+        without it.
+        retain_asts (bool, optional): write the mutated asts to disk.
+        mutation_log (str, optional): path to the mutation log to append the mutation
+        records of the generated asts to (see CMutationLog).
+        aast (dict, optional): the ast in the array form (see CArrayAst). It is
+        converted from the ast if not given.
 
     returns:
         None.
     """
 
-    tasks = [(i, combination, ast, language_info, shared_dict, asts_path, code_path, goto_labels)
-             for i, combination in enumerate(all_combinations, start=1)]
+    if aast == None:
+        aast = ArrayAst.from_dict(ast)
+
+    # The seed ast is handed to each worker once (see init_worker), not with every task.
+    tasks = [
+        (i, combination, random.getrandbits(32)) for i, combination in enumerate(all_combinations, start=1)
+    ]
+    initargs = (aast, language_info, shared_dict, asts_path, code_path, goto_labels, arguments, metadata,
+            template, retain_asts)
 
     id_to_combination = {}
 
-    with Pool(processes=num_processors) as pool:
-        results = pool.map(worker, tasks)
+    if arguments != None and arguments.get("oracle-stdin"):
+        # Each worker tests its code in its own RAM-backed workspace.
+        workspaces_root = Shared.get_workspaces_root(arguments)
+        try:
+            with Pool(
+                    processes=num_processors, initializer=init_worker,
+                    initargs=initargs + (workspaces_root,)) as pool:
+                results = pool.map(worker, tasks)
+        finally:
+            shutil.rmtree(workspaces_root, ignore_errors=True)
+    else:
+        with Pool(processes=num_processors, initializer=init_worker, initargs=initargs) as pool:
+            results = pool.map(worker, tasks)
 
     # Collect results and write summary
-    for result in results:
+    test_results = []
+    records = []
+    for (_, _, seed), result in zip(tasks, results):
         if result is not None:
-            ast_id, combination = result
+            ast_id, combination, test_result, edits = result
             id_to_combination[ast_id] = list(combination)
+            test_results.append(test_result)
+            if mutation_log != None:
+                ast_path = os.path.relpath(f"{asts_path}/{ast_id}", os.path.dirname(mutation_log))
+                records.append(MutationLog.make_record(ast_path, combination, seed, edits))
+
+    if mutation_log != None:
+        MutationLog.append(mutation_log, records)
+
+    if arguments != None and arguments.get("oracle-stdin"):
+        Shared.group_writer(code_path, test_results)
 
     # Write generated asts' mutated summary to a json file.
     with open(f"{asts_path}/id_to_combination.json", "w") as f:
@@ -0,0 +1,103 @@
+"""
+    This program measures the dict <-> pycparser ast conversion (see c_json) and the
+    code generation from the converted ast, i.e., the from_dict plus CGenerator.visit
+    that runs once per generated variant whose code is not spliced.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import glob
+import time
+import argparse
+
+from pycparser import c_generator
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import C.pycparser.c_json as c_json
+
+def measure(function, repeat: int):
+    """This function measures the average time of the function call.
+
+    args:
+        function (function): function to call without arguments.
+        repeat (int): number of calls.
+
+    returns:
+        (float) average time of a call in milliseconds.
+    """
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+
+    return (time.perf_counter() - start) / repeat * 1000
+
+def benchmark(file_path: str, repeat: int):
+    """This function measures the conversions and the code generation of a C file.
+
+    args:
+        file_path (str): path to the C file.
+        repeat (int): number of calls to average each measurement over.
+
+    returns:
+        (dict) measurement name to the average time in milliseconds.
+    """
+
+    ast = c_json.parse_file(file_path, use_cpp=True)
+    ast_dict = c_json.to_dict(ast)
+    generator = c_generator.CGenerator()
+
+    return {
+        "to_dict": measure(lambda: c_json.to_dict(ast), repeat),
+        "from_dict": measure(lambda: c_json.from_dict(ast_dict), repeat),
+        "visit": measure(lambda: generator.visit(ast), repeat),
+        "from_dict+visit": measure(lambda: generator.visit(c_json.from_dict(ast_dict)), repeat)
+    }
+
+def argument_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+            "-f",
+            "--file",
+            type=str,
+            nargs="+",
+            default=sorted(glob.glob(f"{parentdir}/Benchmark/*/poc.c")),
+            help="C files to measure (default: Benchmark/*/poc.c)."
+    )
+    parser.add_argument(
+            "-n",
+            "--number",
+            type=int,
+            default=200,
+            help="Number of calls to average each measurement over."
+    )
+    args = parser.parse_args()
+
+    return args.file, args.number
+
+def main():
+    file_paths, repeat = argument_parser()
+
+    assert len(file_paths) > 0, f"ERROR: No C file to measure."
+
+    totals = {}
+    for file_path in file_paths:
+        results = benchmark(file_path, repeat)
+        print (
+            f"{file_path}: " +
+            ", ".join(f"{name} {value:.3f} ms" for name, value in results.items()))
+        for name, value in results.items():
+            totals[name] = totals.get(name, 0) + value
+
+    print (
+        f"Average of {len(file_paths)} files: " +
+        ", ".join(f"{name} {value / len(file_paths):.3f} ms" for name, value in totals.items()))
+
+if __name__ == "__main__":
+    main()
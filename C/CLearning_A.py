@@ -81,7 +81,12 @@ def collect_combinations(code_path: str, asts_path: str):
         (list) list of failing combination sets.
     """
 
-    asts_subdirs = os.listdir(asts_path)
+    # The asts directory also holds the mutation log of the phase (see CMutationLog).
+    # The combinations are collected in the order of r, as the smaller combinations are
+    # taken first (see identify_from_larger_r).
+    asts_subdirs = sorted(
+        (subdir for subdir in os.listdir(asts_path) if os.path.isdir(f"{asts_path}/{subdir}")),
+        key=lambda subdir: int(subdir) if subdir.isdigit() else subdir)
     code_subdirs = os.listdir(code_path)
 
     passing_combination_to_ast_path = {}
@@ -98,8 +103,22 @@ def collect_combinations(code_path: str, asts_path: str):
 
         ast_id_to_combination = Shared.load_json(f"{asts_path}/{asts_subdir}/id_to_combination.json")
 
-        for ast_id, combination in ast_id_to_combination.items():
-            if int(ast_id) in group_info["passings"] and set(combination) not in passings:
+        # The supersets of the flipped combinations were not generated, but are taken as
+        # passings (see CInit.test_generator). They have no ast.
+        pruned = []
+        if os.path.exists(f"{asts_path}/{asts_subdir}/pruned.json"):
+            pruned = Shared.load_json(f"{asts_path}/{asts_subdir}/pruned.json")
+
+        # In the order of the combinations, as they were generated without the pruning.
+        entries = sorted(
+            list(ast_id_to_combination.items()) + [(None, combination) for combination in pruned],
+            key=lambda entry: sorted(entry[1]))
+
+        for ast_id, combination in entries:
+            if ast_id == None:
+                if set(combination) not in passings:
+                    passings.append(set(combination))
+            elif int(ast_id) in group_info["passings"] and set(combination) not in passings:
                 passings.append(set(combination))
                 passing_combination_to_ast_path[str(sorted(combination))] = [f"{asts_path}/{asts_subdir}/{ast_id}"]
             elif int(ast_id) in group_info["failings"] and set(combination) not in failings: 
@@ -278,8 +297,11 @@ def retry(arguments: dict, mutable_node_ids: list, identified_nodes: list, goto_
     language_info = Shared.load_json(f"{currentdir}/CLanguage.json")
     shared_dict = Shared.load_json(f"{currentdir}/SharedDictionary.json")
     ast_0 = Shared.load_json(f"{root}/phase_2a/ast__0.json")
+    metadata = Shared.load_metadata(f"{root}/phase_2a/metadata__0.json")
     
-    CInit.test_generator(ast_0, language_info, [1], shared_dict, asts_path, code_path, arguments, goto_labels, mutable_node_ids)
+    CInit.test_generator(
+            ast_0, language_info, [1], shared_dict, asts_path, code_path, arguments, goto_labels,
+            mutable_node_ids, metadata=metadata)
 
     identified_nodes, re_pc2ap, re_fc2ap = check_nodes(asts_path, code_path, mutable_node_ids, identified_nodes)
 
@@ -9,6 +9,7 @@
 
 import os, sys
 import json
+import random
 import copy
 import subprocess
 
@@ -21,6 +22,8 @@ sys.path.append(parentdir)
 from pycparser import c_generator
 import C.pycparser.c_json as c_json
 import C.CAstMutator as CMutator
+import C.CSpliceEmitter as Splice
+import C.CMutationLog as MutationLog
 import C.SharedEditor as Shared
 import C.CLearning_A as Learning_A
 import C.NodeAnalyzer as Analyzer
@@ -28,7 +31,7 @@ import C.NodeAnalyzer as Analyzer
 def learning(
         arguments: dict, code_path: str, asts_path: str, identified_node_ids: list, 
         id_to_type: dict, ast_0: dict, pc2ap: dict, fc2ap: dict, language_info: dict,
-        shared_dict: dict, goto_labels: set):
+        shared_dict: dict, goto_labels: set, index=None, metadata=None):
     """This function calls other functions to identify the important ast nodes.
     Important nodes meaning that mutating the identified nodes will alter the execution
     behavior of a compiler resulting to a flipped ouput, i.e. fail to pass and vice versa.
@@ -45,17 +48,34 @@ def learning(
         language_info (dict): javascript language information.
         shared_dict (dict): dictionary that holds shared information about the AST.
         goto_labels (set): set of goto labels.
+        index (dict, optional): node index of ast_0. It is built if not given.
+        metadata (dict, optional): node metadata of ast_0 (see CMutator.new_metadata).
+        Without it, every node is taken as mutable.
 
     return:
         (dict) node id to object.
         (dict) node id to mutation information.
     """
     
+    if index == None:
+        index = CMutator.build_index(ast_0)
+    if metadata == None:
+        metadata = CMutator.new_metadata(len(index))
+
     # Temporary default n = 5.
     n = 5
+
+    template = None
+    if arguments.get("splice-emission", True):
+        template = Splice.build_template(ast_0, index, metadata)
  
-    id_to_combination = generate_samples(
-            ast_0, code_path, asts_path, identified_node_ids, n, language_info, shared_dict, goto_labels)
+    (
+        id_to_combination,
+        path_to_ast
+    ) = generate_samples(
+            ast_0, code_path, asts_path, identified_node_ids, n, language_info, shared_dict, goto_labels,
+            index, metadata, template, Shared.retains_asts(arguments, True),
+            Shared.get_ast_extension(arguments))
 
     # DEBUG
     id_to_combination = Shared.load_json(f"{asts_path}/id_to_combination.json")
@@ -68,15 +88,16 @@ def learning(
     Shared.json_writer(pc2ap, "./pc2ap.json")
     Shared.json_writer(fc2ap, "./fc2ap.json")
     
-    ids_set_to_nodes = get_mutated_nodes(identified_node_ids, pc2ap, fc2ap)
+    ids_set_to_nodes = get_mutated_nodes(identified_node_ids, pc2ap, fc2ap, path_to_ast, ast_0, index)
 
-    ids_set_to_mutations = analyze_mutated_nodes(ast_0, ids_set_to_nodes)
+    ids_set_to_mutations = analyze_mutated_nodes(ast_0, ids_set_to_nodes, index)
 
     return ids_set_to_nodes, ids_set_to_mutations
 
 def generate_samples(
         ast_0: dict, code_path: str, asts_path: str, identified_node_ids: list, n: int, 
-        language_info: dict, shared_dict: dict, goto_labels: set):
+        language_info: dict, shared_dict: dict, goto_labels: set, index=None, metadata=None,
+        template=None, retain_asts=True, ast_extension=".json"):
     """This function generates additional n number of samples for each identified
     node id, i.e., ids of nodes known to alter the behavior of program when modified.
 
@@ -89,69 +110,121 @@ def generate_samples(
         language_info (dict): javascript language information.
         shared_dict (dict): dictionary that holds shared information about the AST.
         goto_labels (set): set of goto labels.
+        index (dict, optional): node index of ast_0.
+        metadata (dict, optional): node metadata of ast_0 (see CMutator.new_metadata).
+        template (dict, optional): template of ast_0 to splice the code of the mutated
+        asts from (see Splice.build_template). The code is fully generated without it.
+        retain_asts (bool, optional): write the mutated asts to disk.
+        ast_extension (str, optional): extension of the ast files, which decides their
+        format (see Shared.get_ast_extension).
 
     returns:
         (dict) ast id-to-node id combinaition 
+        (dict) ast path (without the file name prefix and extension) to mutated ast.
     """
 
     assert n > 0, f"ERROR: {n} <= 0. n must be > 0."
 
     id_to_combination = {}
+    path_to_ast = {}
+    ast_writings = []
+    records = []
+
+    node_ids = CMutator.get_node_ids(index)
+
+    # Draws the rng seed of each mutation, so the mutation can be replayed.
+    seeder = random.Random(random.getrandbits(32))
 
     i = 0
     for nodes in identified_node_ids:
         assert nodes, f"ERROR: nodes is empty: {nodes}."
         j = 0
         while j < n:
-            ast_copy = copy.deepcopy(ast_0)
+            seed = seeder.getrandbits(32)
+            random.seed(seed)
             (
                 mutated_ast,
                 is_mutated 
-            ) = CMutator.ast_mutator(ast_copy, language_info, nodes, shared_dict, goto_labels)
+            ) = CMutator.ast_mutator(
+                    ast_0, language_info, nodes, shared_dict, goto_labels, index, metadata)
             if is_mutated:
                 try:
-                    # Write ast to disk.
-                    Shared.ast_writer(mutated_ast, f"{asts_path}/ast__{i}.json")
+                    # Write ast to disk in the background.
+                    if retain_asts:
+                        ast_writings.append(
+                                Shared.ast_writer_async(mutated_ast, f"{asts_path}/ast__{i}{ast_extension}"))
                     # Write code to disk.
-                    Shared.code_writer(f"{asts_path}/ast__{i}.json", f"{code_path}/code__{i}.c")
+                    code = Splice.emit(template, mutated_ast, nodes, index)
+                    Shared.text_writer(code, f"{code_path}/code__{i}.c")
 
                     id_to_combination[str(i)] = list(nodes)
+                    path_to_ast[f"{asts_path}/{i}"] = mutated_ast
+                    records.append(
+                            MutationLog.make_record(
+                                str(i), nodes, seed, MutationLog.get_edits(ast_0, mutated_ast, node_ids)))
 
                     i += 1
                     j += 1
                 except Exception as e:
                     print(f"ERROR (BUT CONTINUE): {e}")
 
+    for ast_writing in ast_writings:
+        ast_writing.result()
+
+    MutationLog.append(f"{asts_path}/{MutationLog.LOG_NAME}", records)
+
     # Write generated asts' mutated summary to a json file.
     with open(f"{asts_path}/id_to_combination.json", "w") as f:
         json.dump(id_to_combination, f, indent=4)
 
-    return id_to_combination
+    return id_to_combination, path_to_ast
 
-def get_nodes(Xc2ap: dict, str_ids_set: str, ids_set: set):
+def get_nodes(
+        Xc2ap: dict, str_ids_set: str, ids_set: set, path_to_ast=None, ast_0=None, index=None,
+        logs=None):
     """This function retrived all the target nodes.
+    The nodes are taken from the mutated asts kept in memory, reconstructed from the
+    mutation logs (see CMutationLog), or loaded from the ast files, in this order.
+    The asts that are not found in any of them (see "ast-retention") are skipped.
 
     args:
         Xc2ap (dict): this either is pc2ap or fc2ap.
         str_ids_set (str): string casted ids_set.
         ids_set (set): set of node ids.
+        path_to_ast (dict, optional): ast path to the mutated ast kept in memory.
+        ast_0 (dict, optional): original poc's ast, to reconstruct the nodes from the
+        mutation logs.
+        index (dict, optional): node index of ast_0.
+        logs (dict, optional): already loaded mutation logs (see MutationLog.find_record).
 
     returns:
-        (list) list of found nodes.
+        (list) list of (node id, found node).
     """
     
+    if logs == None:
+        logs = {}
+
     nodes = []
     for path in Xc2ap[str_ids_set]:
-        # Load the target ast and retrive the target node.
-        dir_path = "/".join(path.split("/")[:-1])
-        file_name = "ast__" + path.split("/")[-1] + ".json"
-        path = dir_path + "/" + file_name
-
-        ast = Shared.load_json(path)
+        if path_to_ast != None and path in path_to_ast:
+            ast_index = CMutator.build_index(path_to_ast[path])
+            id_to_node = {
+                node_id: ast_index[node_id]["node"] if node_id in ast_index else None
+                for node_id in ids_set
+            }
+        elif ast_0 != None and index != None and MutationLog.find_record(path, logs) != None:
+            record = MutationLog.find_record(path, logs)
+            id_to_node = MutationLog.reconstruct_nodes(ast_0, index, record, list(ids_set))
+        else:
+            # Load the target nodes from the ast file.
+            dir_path = "/".join(path.split("/")[:-1])
+            ast_file_path = Shared.find_ast_file(dir_path, path.split("/")[-1])
+            if ast_file_path == None:
+                continue
+            id_to_node = Shared.load_ast_nodes(ast_file_path, list(ids_set))
 
         for node_id in ids_set:
-            node = CMutator.get_node(ast, node_id)
-            nodes.append(node)
+            nodes.append((node_id, id_to_node[node_id]))
 
     return nodes
 
@@ -191,7 +264,9 @@ def update_Xc2aps(grouped_files: dict, id_to_combination: dict, asts_path: str,
                 else:
                     fc2ap[str(combination)] = [path]
 
-def get_mutated_nodes(identified_node_ids: list, pc2ap: dict, fc2ap: dict):
+def get_mutated_nodes(
+        identified_node_ids: list, pc2ap: dict, fc2ap: dict, path_to_ast=None, ast_0=None,
+        index=None):
     """This function analyzes the mutated ast nodes to identify what data value(s) flipped the
     execution behavior of the code.
 
@@ -200,12 +275,17 @@ def get_mutated_nodes(identified_node_ids: list, pc2ap: dict, fc2ap: dict):
         behavior of code if mutated.
         pc2ap (dict): passing combination to ast path.
         fc2ap (dict): failing combination to ast path.
+        path_to_ast (dict, optional): ast path to the mutated ast kept in memory.
+        ast_0 (dict, optional): original poc's ast, to reconstruct the nodes from the
+        mutation logs.
+        index (dict, optional): node index of ast_0.
 
     returns:
         (dict) node ids to actual node objects information.
     """
 
     ids_set_to_nodes = {}
+    logs = {}
 
     for ids_set in identified_node_ids:
         str_ids_set = str(sorted(list(ids_set)))
@@ -220,11 +300,11 @@ def get_mutated_nodes(identified_node_ids: list, pc2ap: dict, fc2ap: dict):
 
         if str_ids_set in pc2ap:
             # Retrieve actual node from the ast.
-            nodes = get_nodes(pc2ap, str_ids_set, ids_set)
+            nodes = get_nodes(pc2ap, str_ids_set, ids_set, path_to_ast, ast_0, index, logs)
             ids_set_to_nodes[str_ids_set]["passing_nodes"] = nodes
 
         if str_ids_set in fc2ap:
-            nodes = get_nodes(fc2ap, str_ids_set, ids_set)
+            nodes = get_nodes(fc2ap, str_ids_set, ids_set, path_to_ast, ast_0, index, logs)
             ids_set_to_nodes[str_ids_set]["failing_nodes"] = nodes
 
     return ids_set_to_nodes
@@ -269,28 +349,31 @@ def select_analyzer(node: dict, ast_0_node: dict):
 
     return None, None
 
-def analyze_mutated_nodes(ast_0: dict, ids_set_to_nodes: dict):
+def analyze_mutated_nodes(ast_0: dict, ids_set_to_nodes: dict, index=None):
     """This function analyzes the mutated ast nodes to identify what data value(s) flipped the
     execution behavior of the code.
 
     args:
         ast_0 (dict): original poc's ast.
         ids_set_to_nodes (dict): node ids to actual node objects information.
+        index (dict, optional): node index of ast_0.
 
     returns:
         (dict)
     """
 
     ast_0_id_to_node = {} 
-    CMutator.map_id_to_node(ast_0, ast_0_id_to_node)
+    if index != None:
+        ast_0_id_to_node = {node_id: entry["node"] for node_id, entry in index.items()}
+    else:
+        CMutator.map_id_to_node(ast_0, ast_0_id_to_node)
 
     ids_set_to_mutations = {}
 
     for str_ids_set, mutation_info in ids_set_to_nodes.items():
         ids_set_to_mutations[str_ids_set] = {}
 
-        for node in mutation_info["passing_nodes"]:
-            node_id = node["nodeid"]
+        for node_id, node in mutation_info["passing_nodes"]:
             try:
                 ast_0_node = ast_0_id_to_node[node_id]
             except:
@@ -312,8 +395,7 @@ def analyze_mutated_nodes(ast_0: dict, ids_set_to_nodes: dict):
             if ast_0_node_info and not ids_set_to_mutations[str_ids_set][str(node_id)]["original"]:
                 ids_set_to_mutations[str_ids_set][str(node_id)]["original"] = ast_0_node_info
 
-        for node in mutation_info["failing_nodes"]:
-            node_id = node["nodeid"]
+        for node_id, node in mutation_info["failing_nodes"]:
             ast_0_node = ast_0_id_to_node[node_id]
 
             if str(node_id) not in ids_set_to_mutations[str_ids_set]:
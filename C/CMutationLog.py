@@ -0,0 +1,303 @@
+"""
+    This program records the generated variants as mutation records, instead of
+    whole asts.
+
+    A variant differs from the seed ast by a handful of node-level edits, so it is
+    stored as one line of the append-only mutation log of its phase
+    (mutations.jsonl), i.e.,
+
+        {"ast": <ast path relative to the log directory>, "combination": [...],
+         "seed": <rng seed of the mutation>, "edits": [[node id, attribute, old, new], ...]}
+
+    The full ast (or code) of a variant is reconstructed from the seed ast on demand
+    (see reconstruct_ast and reconstruct_code).
+
+    Running this program directly prints the reconstructed ast or code of a variant.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import json
+import copy
+import argparse
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import C.CAstMutator as CMutator
+import C.CSpliceEmitter as Splice
+import C.SharedEditor as Shared
+
+# File name of the mutation log in the asts directory of a phase.
+LOG_NAME = "mutations.jsonl"
+
+def is_node_list(value):
+    """This function checks whether the value is a list holding ast nodes.
+
+    args:
+        value (depends): value to check.
+
+    returns:
+        (bool) true if the value is a list with ast nodes. Otherwise, false.
+    """
+
+    return isinstance(value, list) and any(isinstance(item, dict) for item in value)
+
+def get_edits(node: dict, mutated_node: dict, node_ids: dict, edits=None):
+    """This function collects the attribute edits that turn the node into the mutated
+    node. As the mutated ast is path-copied from the seed ast (see CMutator.ast_mutator),
+    only the nodes that are not shared with the seed ast are compared.
+
+    args:
+        node (dict): seed ast node.
+        mutated_node (dict): the node in the mutated ast.
+        node_ids (dict): seed ast node to its node id (see CMutator.get_node_ids).
+        edits (list, optional): list to add the edits to.
+
+    returns:
+        (list) list of [node id, attribute, old value, new value].
+    """
+
+    if edits == None:
+        edits = []
+
+    if node is mutated_node:
+        return edits
+
+    for key, value in mutated_node.items():
+        original = node.get(key)
+        if value is original:
+            continue
+        if isinstance(value, dict) and "_nodetype" in value:
+            get_edits(original, value, node_ids, edits)
+        elif is_node_list(value):
+            for item, mutated_item in zip(original, value):
+                get_edits(item, mutated_item, node_ids, edits)
+        elif value != original:
+            edits.append([node_ids[id(node)], key, copy.deepcopy(original), copy.deepcopy(value)])
+
+    return edits
+
+def make_record(ast_path: str, combination: list, seed: int, edits: list):
+    """This function makes the mutation record of a variant.
+
+    args:
+        ast_path (str): path of the variant's ast relative to the log directory.
+        combination (list): mutated node ids.
+        seed (int): rng seed of the mutation.
+        edits (list): edits of the mutation (see get_edits).
+
+    returns:
+        (dict) mutation record.
+    """
+
+    return {
+        "ast": ast_path,
+        "combination": sorted(combination),
+        "seed": seed,
+        "edits": edits
+    }
+
+def append(log_path: str, records: list):
+    """This function appends the mutation records to the log.
+
+    args:
+        log_path (str): path to the mutation log.
+        records (list): list of mutation records.
+
+    returns:
+        None.
+    """
+
+    with open(log_path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+def load(log_path: str):
+    """This function loads the mutation log. A later record of the same ast replaces
+    the earlier one.
+
+    args:
+        log_path (str): path to the mutation log.
+
+    returns:
+        (dict) ast path (relative to the log directory) to mutation record.
+    """
+
+    records = {}
+
+    with open(log_path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records[record["ast"]] = record
+
+    return records
+
+def find_record(ast_path: str, logs: dict):
+    """This function finds the mutation record of a variant in the log of the variant's
+    directory or its parent directory (i.e., the asts directory of the phase).
+
+    args:
+        ast_path (str): path of the variant's ast without the file name prefix and
+        extension, e.g., <phase>/asts/<r>/<ast id>.
+        logs (dict): log path to the already loaded log (see load), or None if the log
+        does not exist. It is updated with the logs loaded here.
+
+    returns:
+        (dict) mutation record, or None if not logged.
+    """
+
+    log_dir = os.path.dirname(ast_path)
+    for _ in range(2):
+        log_path = f"{log_dir}/{LOG_NAME}"
+        if log_path not in logs:
+            logs[log_path] = load(log_path) if os.path.exists(log_path) else None
+        if logs[log_path] != None:
+            record = logs[log_path].get(os.path.relpath(ast_path, log_dir))
+            if record != None:
+                return record
+        log_dir = os.path.dirname(log_dir)
+
+    return None
+
+def reconstruct_ast(ast: dict, index: dict, record: dict):
+    """This function reconstructs the variant's ast by applying the edits to the seed ast.
+    Only the edited nodes and their ancestors are copied, so the seed ast is left
+    unmodified and the reconstructed ast shares every other subtree with it.
+
+    args:
+        ast (dict): processed seed ast.
+        index (dict): node index of the seed ast.
+        record (dict): mutation record of the variant.
+
+    returns:
+        (dict) reconstructed ast.
+    """
+
+    copies = {}
+
+    def get_copy(node_id: int):
+        if node_id in copies:
+            return copies[node_id]
+
+        entry = index[node_id]
+        if entry["parent_id"] == None:
+            node = CMutator.detach(entry["node"])
+        else:
+            parent = get_copy(entry["parent_id"])
+            key, position = entry["key"], entry["position"]
+            if position == None:
+                node = CMutator.detach(parent[key])
+                parent[key] = node
+            else:
+                if parent[key] is entry["parent"][key]:
+                    parent[key] = list(parent[key])
+                node = CMutator.detach(parent[key][position])
+                parent[key][position] = node
+
+        copies[node_id] = node
+
+        return node
+
+    for node_id, attribute, _, value in record["edits"]:
+        get_copy(node_id)[attribute] = copy.deepcopy(value)
+
+    # The root is the node 0 (see CMutator.build_index).
+    if 0 not in copies:
+        return ast
+
+    return copies[0]
+
+def reconstruct_nodes(ast: dict, index: dict, record: dict, node_ids: list):
+    """This function reconstructs only the nodes of the variant's ast with the node ids.
+
+    args:
+        ast (dict): processed seed ast.
+        index (dict): node index of the seed ast.
+        record (dict): mutation record of the variant.
+        node_ids (list): node ids to reconstruct.
+
+    returns:
+        (dict) node id to reconstructed node, or None if the ast has no such node.
+    """
+
+    mutated_ast = reconstruct_ast(ast, index, record)
+
+    return {
+        node_id: Splice.find_node(mutated_ast, index, node_id) if node_id in index else None
+        for node_id in node_ids
+    }
+
+def reconstruct_code(ast: dict, index: dict, record: dict, template=None):
+    """This function reconstructs the variant's code.
+
+    args:
+        ast (dict): processed seed ast.
+        index (dict): node index of the seed ast.
+        record (dict): mutation record of the variant.
+        template (dict, optional): template of the seed ast to splice the code from
+        (see Splice.build_template).
+
+    returns:
+        (str) reconstructed code.
+    """
+
+    mutated_ast = reconstruct_ast(ast, index, record)
+
+    return Splice.emit(template, mutated_ast, record["combination"], index)
+
+def argument_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+            "-l",
+            "--log",
+            type=str,
+            required=True,
+            help="Requires the mutation log."
+    )
+    parser.add_argument(
+            "-a",
+            "--ast",
+            type=str,
+            required=True,
+            help="Requires the seed ast file (e.g., phase_2a/ast__0.json)."
+    )
+    parser.add_argument(
+            "-i",
+            "--id",
+            type=str,
+            required=True,
+            help="Requires the variant's ast path relative to the log directory (e.g., 3/17)."
+    )
+    parser.add_argument(
+            "-c",
+            "--code",
+            action="store_true",
+            help="Print the code instead of the ast."
+    )
+    args = parser.parse_args()
+
+    return args.log, args.ast, args.id, args.code
+
+def main():
+    log_path, ast_file_path, ast_path, is_code = argument_parser()
+
+    records = load(log_path)
+
+    assert ast_path in records, f"ERROR: {ast_path} is not in {log_path}."
+
+    ast = Shared.load_ast(ast_file_path)
+    index = CMutator.build_index(ast)
+
+    if is_code:
+        print (reconstruct_code(ast, index, records[ast_path]), end="")
+    else:
+        print (json.dumps(reconstruct_ast(ast, index, records[ast_path]), indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,24 @@
     Author: Terrence J. Lim
 """
 
+import re
 import json
 import os, sys
+import errno
+import math
+import struct
+import signal
+import hashlib
+import resource
+import shutil
+import selectors
 import subprocess
 import argparse
+import tempfile
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Code to import modules from other directories.
 # Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
@@ -17,6 +31,8 @@ currentdir = os.path.dirname(os.path.realpath(__file__))
 parentdir = os.path.dirname(currentdir)
 sys.path.append(parentdir)
 
+import C.COracleCache as Cache
+
 # Reference: https://www.nsnam.org/wiki/HOWTO_understand_and_find_cause_of_exited_with_code_-11_errors
 ERRORCODE = {
         "-1":"SIGHUP",
@@ -36,6 +52,62 @@ ERRORCODE = {
         "-15":"SIGTERM",
 }
 
+# Fixed execution timeout in seconds used when "run-timeout" is not given.
+DEFAULT_TIMEOUT = 3
+# Number of times each seed binary is executed to measure its runtime.
+CALIBRATION_RUNS = 3
+# Size of the chunks read from the standard output of the binaries.
+CHUNK_SIZE = 65536
+# Compilation timeout in seconds used when "compile-timeout" is not given.
+DEFAULT_COMPILE_TIMEOUT = 60
+# Fraction of the memory limit a crashed binary must have used to count as out of memory.
+OOM_THRESHOLD = 0.5
+# prlimit options of the resource limits of the binaries (but the CPU limit).
+LIMIT_OPTIONS = {
+    resource.RLIMIT_AS: "as",
+    resource.RLIMIT_FSIZE: "fsize"
+}
+# Path to prlimit (util-linux), which applies the resource limits to the binaries.
+PRLIMIT_PATH = shutil.which("prlimit")
+# ELF section flag and types needed to hash only the loaded contents of the binaries.
+SHF_ALLOC = 0x2
+SHT_NOTE = 7
+SHT_NOBITS = 8
+
+# Number of stack frames kept in the crash signatures when "crash-frames" is not given.
+DEFAULT_CRASH_FRAMES = 3
+# Compiler diagnostics that indicate a compiler crash rather than a rejected program.
+CRASH_MARKERS = [
+        "Stack dump:",
+        "PLEASE submit a bug report",
+        "internal compiler error",
+        "Assertion",
+        "unable to execute command",
+        "LLVM ERROR:",
+        "UNREACHABLE executed",
+]
+# Stack frames of the crash handling (or the driver) itself, which do not identify the bug.
+GENERIC_FRAMES = [
+        "PrintStackTrace",
+        "SignalHandler",
+        "RunSignalHandlers",
+        "CrashRecoveryContext",
+        "__assert",
+        "abort",
+        "raise",
+        "gsignal",
+        "__restore_rt",
+        "killpg",
+        "__libc_start",
+        "_start",
+]
+
+# Verdicts of the already executed binaries of this process, i.e., binary pair key to
+# the verdict and the reason of the oracle result, in the least-recently-used order.
+BINARY_RESULTS = OrderedDict()
+# Number of binary pairs whose verdicts are kept in BINARY_RESULTS.
+MAX_BINARY_RESULTS = 4096
+
 def read_json_file(file_path: str):
     """This function loads json file data into a python dictionary.
 
@@ -52,13 +124,15 @@ def read_json_file(file_path: str):
 
     return data
 
-def get_cl(arguments: dict, enable: bool, file_path: str, is_bugloc=False):
+def get_cl(arguments: dict, enable: bool, file_path: str, is_bugloc=False, workspace=".", from_stdin=False):
     """This function is for creating a command-line list to run the input test program.
 
     args:
         arguments (dict): arguments dictionary.
         enable (bool): a flag for enabling or disabling jit compilation.
         file_path (str): path to the target C file to compile.
+        workspace (str, optional): directory where the compiled binaries are written.
+        from_stdin (bool, optional): read the C source from the standard input instead of file_path.
 
     returns:
         (list) constructed command-line.
@@ -76,31 +150,34 @@ def get_cl(arguments: dict, enable: bool, file_path: str, is_bugloc=False):
     if arguments["linker"]:
         cl.extend(arguments["linker"])
 
+    inputs = ["-x", "c", "-"] if from_stdin else [file_path]
+
     if enable:
         options = arguments["options"]
         cl.extend(options)
-        cl.extend([file_path, "-o", "./enabled"])
+        cl.extend(inputs + ["-o", f"{workspace}/enabled"])
     else:
         opt_off = arguments["opt-off"]
         cl.append(opt_off)
-        cl.extend([file_path, "-o", "./disabled"])
+        cl.extend(inputs + ["-o", f"{workspace}/disabled"])
 
     return cl
 
-def is_diff(enabled_out, disabled_out):
+def is_diff(enabled_out: dict, disabled_out: dict):
     """This function checks if the two outputs are different or not.
     
     args:
-        enabled_out (subprocess.CompletedProcess):
-        disabled_out (subprocess.CompletedProcess):
+        enabled_out (dict): output of the binary compiled with optimizations enabled.
+        disabled_out (dict): output of the binary compiled with optimizations disabled.
 
     returns:
         (bool) true if the two outputs are different. Otherwise, false.
     """
 
+    # The digests cover the whole standard output, even when only its prefix was kept.
     if (
-            enabled_out.stdout == disabled_out.stdout and
-            enabled_out.returncode == disabled_out.returncode
+            enabled_out["digest"] == disabled_out["digest"] and
+            enabled_out["returncode"] == disabled_out["returncode"]
     ):
         # print ("enabled_out: ", enabled_out)
         # print ("disabled_out: ", disabled_out)
@@ -108,68 +185,791 @@ def is_diff(enabled_out, disabled_out):
 
     return True
 
-def run_binary(command: list):
+def get_binary_hash(binary_path: str):
+    """This function hashes the binary. For ELF binaries, only the sections loaded
+    at run time are hashed, so the source file name in the symbol table and the
+    build id (e.g., code__1.c vs. code__2.c) do not make identical programs differ.
+
+    args:
+        binary_path (str): path to the binary.
+
+    returns:
+        (str) hash of the binary.
+    """
+
+    with open(binary_path, "rb") as f:
+        data = f.read()
+
+    digest = hashlib.sha256()
+
+    if data[:4] != b"\x7fELF":
+        digest.update(data)
+        return digest.hexdigest()
+
+    endian = "<" if data[5] == 1 else ">"
+    if data[4] == 2:
+        # 64-bit ELF.
+        section_offset, = struct.unpack_from(f"{endian}Q", data, 0x28)
+        entry_size, entry_count = struct.unpack_from(f"{endian}HH", data, 0x3a)
+        entry_format = f"{endian}IIQQQQIIQQ"
+    else:
+        # 32-bit ELF.
+        section_offset, = struct.unpack_from(f"{endian}I", data, 0x20)
+        entry_size, entry_count = struct.unpack_from(f"{endian}HH", data, 0x2e)
+        entry_format = f"{endian}IIIIIIIIII"
+
+    for i in range(entry_count):
+        (
+            _, section_type, flags, address, offset, size, _, _, _, _
+        ) = struct.unpack_from(entry_format, data, section_offset + i * entry_size)
+        if not flags & SHF_ALLOC or section_type == SHT_NOTE:
+            continue
+        digest.update(struct.pack("<IQQ", section_type, address, size))
+        if section_type != SHT_NOBITS:
+            digest.update(data[offset:offset + size])
+
+    return digest.hexdigest()
+
+def get_binary_key(arguments: dict, disabled_hash: str, enabled_hash: str):
+    """This function computes the key of the binary pair, i.e., the hash of both binaries
+    and the execution settings that can change the oracle result.
+
+    args:
+        arguments (dict): arguments dictionary.
+        disabled_hash (str): hash of the binary compiled with optimizations disabled.
+        enabled_hash (str): hash of the binary compiled with optimizations enabled.
+
+    returns:
+        (str) binary pair key.
+    """
+
+    configuration = json.dumps([
+        "binaries",
+        disabled_hash,
+        enabled_hash,
+        arguments.get("run-timeout", DEFAULT_TIMEOUT),
+        get_capture_limits(arguments),
+        get_run_limits(arguments)
+    ])
+
+    return hashlib.sha256(configuration.encode()).hexdigest()
+
+def get_binary_result(binary_key: str):
+    """This function looks up the verdict of the already executed binary pair.
+
+    args:
+        binary_key (str): binary pair key (see get_binary_key).
+
+    returns:
+        (dict) verdict and reason of the oracle result, or None if not executed.
+    """
+
+    if binary_key not in BINARY_RESULTS:
+        return None
+
+    BINARY_RESULTS.move_to_end(binary_key)
+
+    return dict(BINARY_RESULTS[binary_key])
+
+def set_binary_result(binary_key: str, result: dict):
+    """This function keeps the verdict and the reason of the oracle result of the binary
+    pair, but not the outputs, and forgets the least-recently-used binary pairs beyond
+    MAX_BINARY_RESULTS.
+
+    args:
+        binary_key (str): binary pair key (see get_binary_key).
+        result (dict): oracle result.
+
+    returns:
+        None.
+    """
+
+    BINARY_RESULTS[binary_key] = {"verdict": result["verdict"], "reason": result.get("reason")}
+    BINARY_RESULTS.move_to_end(binary_key)
+
+    while len(BINARY_RESULTS) > MAX_BINARY_RESULTS:
+        BINARY_RESULTS.popitem(last=False)
+
+def get_frame(line: str):
+    """This function extracts the function of a stack frame line of a crash dump, e.g.,
+        "3  clang 0x0000000001b0b2f2 llvm::Foo::bar(int) + 34" -> "llvm::Foo::bar(int)",
+    with the frame index, binary, address, offset, and paths removed.
+
+    args:
+        line (str): line of the compiler's standard error.
+
+    returns:
+        (str) normalized function of the frame, or None if the line is not a stack frame.
+    """
+
+    match = re.match(r"^\s*(?:#?\d+\s+)?(?:\S+\s+)?0x[0-9a-fA-F]+\s+(.+)$", line)
+
+    if match == None:
+        return None
+
+    frame = match.group(1)
+    # Drop the trailing " (/path/to/clang+0x1234)" and " + 34".
+    frame = re.sub(r"\s*\([^()]*\+0x[0-9a-fA-F]+\)$", "", frame)
+    frame = re.sub(r"\s*\+\s*\d+$", "", frame)
+    frame = re.sub(r"0x[0-9a-fA-F]+", "", frame)
+    frame = re.sub(r"\S*/", "", frame).strip()
+
+    if not frame or any(generic in frame for generic in GENERIC_FRAMES):
+        return None
+
+    return frame
+
+def get_crash_signature(stderr: str, returncode: int, num_frames=DEFAULT_CRASH_FRAMES):
+    """This function normalizes the compiler crash into a signature that stays the same
+    for every program hitting the same bug, i.e., the assertion (or error) message and
+    the top non-generic frames of the stack dump, without addresses, paths, or line numbers.
+
+    args:
+        stderr (str): standard error of the compiler.
+        returncode (int): exit status of the compiler.
+        num_frames (int, optional): number of stack frames to keep.
+
+    returns:
+        (str) crash signature, or None if the compiler did not crash.
+    """
+
+    if returncode >= 0 and not any(marker in stderr for marker in CRASH_MARKERS):
+        return None
+
+    messages = []
+    frames = []
+    for line in stderr.splitlines():
+        match = re.search(r"Assertion `(.*)' failed", line)
+        if match:
+            messages.append(f"assertion: {match.group(1)}")
+            continue
+        match = re.search(r"internal compiler error: (.*)", line)
+        if match:
+            message = re.sub(r",?\s*at\s+\S+:\d+", "", match.group(1)).strip()
+            messages.append(f"error: {message}")
+            continue
+        match = re.search(r"(LLVM ERROR: .*|\S.*UNREACHABLE executed)", line)
+        if match:
+            messages.append(re.sub(r"\s+at\s+\S+:\d+!?$", "", match.group(1)).strip())
+            continue
+        match = re.search(r"unable to execute command: (.*)", line)
+        if match:
+            messages.append(f"signal: {match.group(1)}")
+            continue
+        frame = get_frame(line)
+        if frame and len(frames) < num_frames:
+            frames.append(frame)
+
+    if returncode < 0:
+        messages.append(f"signal: {ERRORCODE.get(str(returncode), returncode)}")
+
+    return "\n".join(messages + frames)
+
+def get_capture_limits(arguments: dict):
+    """This function returns the output capture limits of the "output-capture" mode.
+    The "full" mode (default) keeps the whole standard output of the binaries,
+    while the "digest" mode keeps only its first "output-prefix" bytes for diagnostics
+    and kills binaries writing more than "output-limit" megabytes.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        (int) maximum output size in bytes (0: unlimited).
+        (int) size of the kept output prefix in bytes (0: everything).
+    """
+
+    if arguments.get("output-capture", "full") == "digest":
+        return (
+            int(arguments.get("output-limit", 16) * 1024 * 1024),
+            arguments.get("output-prefix", 4096)
+        )
+
+    return 0, 0
+
+def get_run_limits(arguments: dict):
+    """This function returns the resource limits of the compiled binaries, i.e.,
+    "run-memory-limit" (MB), "run-cpu-limit" (s), and "run-file-size-limit" (MB).
+    A limit of 0 disables it.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        (dict) resource to limit.
+    """
+
+    limits = {
+        resource.RLIMIT_AS: int(arguments.get("run-memory-limit", 4096) * 1024 * 1024),
+        resource.RLIMIT_CPU: int(math.ceil(arguments.get("run-cpu-limit", 10))),
+        resource.RLIMIT_FSIZE: int(arguments.get("run-file-size-limit", 64) * 1024 * 1024)
+    }
+
+    return {limit: value for limit, value in limits.items() if value > 0}
+
+def kill_process_group(process: subprocess.Popen):
+    """This function kills the process together with all its descendants. The process
+    must have been started in a new session, i.e., as a process group leader.
+
+    args:
+        process (subprocess.Popen): process to kill.
+
+    returns:
+        None.
+    """
+
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+    process.wait()
+
+def wait_process(process: subprocess.Popen, deadline: float):
+    """This function waits for the process to terminate until the deadline and
+    collects its resource usage.
+
+    args:
+        process (subprocess.Popen): process to wait.
+        deadline (float): deadline in time.monotonic() seconds.
+
+    returns:
+        (resource.struct_rusage) resource usage of the process, or None if timed out.
+    """
+
+    delay = 0.001
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid != 0:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return usage
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+        delay = min(delay * 2, 0.05)
+
+def is_oom(out: dict, usage, limits: dict):
+    """This function checks whether the binary most likely died of exhausting its
+    memory limit, i.e., it terminated abnormally after using most of the limit.
+
+    args:
+        out (dict): output of the binary.
+        usage (resource.struct_rusage): resource usage of the binary.
+        limits (dict): resource limits of the binary.
+
+    returns:
+        (bool) true if the binary ran out of memory. Otherwise, false.
+    """
+
+    if resource.RLIMIT_AS not in limits or out["returncode"] == 0:
+        return False
+
+    # ru_maxrss is in kilobytes.
+    return usage.ru_maxrss * 1024 >= limits[resource.RLIMIT_AS] * OOM_THRESHOLD
+
+def get_limits_command(limits: dict):
+    """This function returns the prlimit (util-linux) command prefix that applies the
+    resource limits to the binary and then executes it. The limits are not set in a
+    preexec_fn, as it is not safe with the threads of the concurrent oracle (see
+    run_oracle), nor after the spawn, as the binary could allocate before.
+
+    args:
+        limits (dict): resource to limit.
+
+    returns:
+        (list) command prefix, which is empty without limits.
+    """
+
+    if not limits:
+        return []
+
+    assert PRLIMIT_PATH != None, "ERROR: prlimit (util-linux) is required by the run limits."
+
+    command = [PRLIMIT_PATH]
+    for limit, value in limits.items():
+        if limit == resource.RLIMIT_CPU:
+            # The soft limit raises SIGXCPU, and the hard limit one second later SIGKILL.
+            command.append(f"--cpu={value}:{value + 1}")
+        else:
+            command.append(f"--{LIMIT_OPTIONS[limit]}={value}")
+
+    return command + ["--"]
+
+def run_binary(command: list, timeout=DEFAULT_TIMEOUT, output_limit=0, prefix_size=0, limits=None):
     """This function runs the binary file using the pre-poluated command list.
+    The standard output is streamed into a hash, so only the prefix of the
+    output has to be kept in memory. The binary runs in its own process group
+    under the given resource limits, and the whole group is killed on expiry.
 
     args:
         command (list): list of commands.
+        timeout (float, optional): execution timeout in seconds.
+        output_limit (int, optional): maximum output size in bytes (0: unlimited).
+        prefix_size (int, optional): size of the kept output prefix in bytes (0: everything).
+        limits (dict, optional): resource to limit applied to the binary.
 
     returns:
-        (out) subprocess's out object or None.
+        (dict) return code, standard output (prefix), its size and digest, or None.
+        (str) reason why the run is invalid, i.e., "run-timeout", "oom", or
+        "output-too-large". None if the run is valid.
     """
 
+    deadline = time.monotonic() + timeout
+
+    if limits == None:
+        limits = {}
+
     try:
-        out = subprocess.run(command, capture_output=True, text=True, timeout=3)
-        return out
-    except subprocess.TimeoutExpired:
-        print (f"   Timed out...")
+        process = subprocess.Popen(
+                get_limits_command(limits) + command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                start_new_session=True)
+    except OSError as e:
+        # E.g., the binary cannot be forked.
+        if e.errno == errno.ENOMEM:
+            print (f"   Out of memory...")
+            return None, "oom"
+        raise
+
+    digest = hashlib.sha256()
+    prefix = bytearray()
+    size = 0
+
+    with process, selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print (f"   Timed out...")
+                kill_process_group(process)
+                return None, "run-timeout"
+            if not selector.select(remaining):
+                continue
+
+            chunk = os.read(process.stdout.fileno(), CHUNK_SIZE)
+            if not chunk:
+                break
+
+            digest.update(chunk)
+            size += len(chunk)
+            if prefix_size == 0:
+                prefix += chunk
+            elif len(prefix) < prefix_size:
+                prefix += chunk[:prefix_size - len(prefix)]
+
+            if output_limit and size > output_limit:
+                print (f"   Output limit exceeded...")
+                kill_process_group(process)
+                return None, "output-too-large"
+
+        usage = wait_process(process, deadline)
+        # Also kill any descendant left behind by the binary.
+        kill_process_group(process)
+        if usage == None:
+            print (f"   Timed out...")
+            return None, "run-timeout"
+
+    out = {
+        "returncode": process.returncode,
+        "stdout": prefix.decode(errors="replace"),
+        "size": size,
+        "digest": digest.hexdigest()
+    }
+
+    if out["returncode"] == -signal.SIGXCPU:
+        print (f"   CPU time limit exceeded...")
+        return None, "run-timeout"
+    if out["returncode"] == -signal.SIGXFSZ:
+        print (f"   File size limit exceeded...")
+        return None, "output-too-large"
+    if is_oom(out, usage, limits):
+        print (f"   Out of memory...")
+        return None, "oom"
+
+    return out, None
+
+def compile_program(command: list, timeout: float, source=None):
+    """This function runs the compiler in its own process group, and kills the whole
+    group (e.g., cc1 and the linker) if the compilation does not finish in time.
 
-    return None
-    
-def is_pass(arguments: dict, file_path: str):
-    """This function checks if the code is a fail or pass with the
-     user-specified compiler.
+    args:
+        command (list): compiler command-line.
+        timeout (float): compilation timeout in seconds (0: unlimited).
+        source (str, optional): C source piped to the compiler's standard input.
+
+    returns:
+        (subprocess.CompletedProcess) finished compilation, or None if timed out.
+    """
+
+    with subprocess.Popen(
+            command, stdin=subprocess.PIPE if source != None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            start_new_session=True) as process:
+        try:
+            stdout, stderr = process.communicate(
+                    input=source, timeout=timeout if timeout > 0 else None)
+        except subprocess.TimeoutExpired:
+            print (f"   Compilation timed out...")
+            kill_process_group(process)
+            process.communicate()
+            return None
+
+    return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+def check_frontend(arguments: dict, file_paths: list):
+    """This function runs only the compiler frontend (-fsyntax-only) on a batch of code
+    files with a single compiler invocation, which is much cheaper than building and
+    running them, to reject the invalid C code (e.g., assignment to a const variable).
+    The diagnostics are attributed to the files by their path prefix. If they cannot be,
+    the files are checked one by one. Codes crashing the frontend are not rejected here.
+
+    args:
+        arguments (dict): arguments dictionary.
+        file_paths (list): paths to the code files to check.
+
+    returns:
+        (dict) path to the frontend diagnostics of each rejected code file.
+    """
+
+    command = [arguments["compiler-path"], "-fsyntax-only"] + arguments["options"] + file_paths
+
+    compilation = compile_program(command, arguments.get("compile-timeout", DEFAULT_COMPILE_TIMEOUT))
+
+    if compilation != None and compilation.returncode == 0:
+        return {}
+
+    if compilation != None and get_crash_signature(compilation.stderr, compilation.returncode) == None:
+        rejected = {}
+        for file_path in file_paths:
+            lines = [line for line in compilation.stderr.splitlines() if line.startswith(f"{file_path}:")]
+            if any(" error:" in line for line in lines):
+                rejected[file_path] = "\n".join(lines)
+        if len(file_paths) == 1 and not rejected:
+            rejected[file_paths[0]] = compilation.stderr
+        if rejected:
+            return rejected
+
+    if len(file_paths) == 1:
+        return {}
+
+    rejected = {}
+    for file_path in file_paths:
+        rejected.update(check_frontend(arguments, [file_path]))
+
+    return rejected
+
+def calibrate_timeout(arguments: dict):
+    """This function derives the execution timeout of the test programs from the
+    runtimes of the seed (original PoC) binaries, i.e.,
+        max(timeout-floor, timeout-multiplier * max(-O0 runtime, -Ox runtime)).
+    Mutated programs that run much longer than the seed are most likely
+    non-terminating, so waiting for the fixed timeout only wastes oracle time.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        (float) execution timeout in seconds.
+    """
+
+    timeout = arguments.get("run-timeout", DEFAULT_TIMEOUT)
+    multiplier = arguments.get("timeout-multiplier", 10)
+    floor = arguments.get("timeout-floor", 0.5)
+
+    file_path = f"{arguments['root']}/{arguments['filename']}"
+
+    runtimes = []
+    with tempfile.TemporaryDirectory(dir=arguments["root"]) as workspace:
+        for enable in [False, True]:
+            binary = f"{workspace}/enabled" if enable else f"{workspace}/disabled"
+            compile_program(
+                    get_cl(arguments, enable, file_path, workspace=workspace),
+                    arguments.get("compile-timeout", DEFAULT_COMPILE_TIMEOUT))
+            if not os.path.exists(binary):
+                print (f"WARNING: Failed to compile the seed. Keep the {timeout}s timeout...")
+                return timeout
+
+            for _ in range(CALIBRATION_RUNS):
+                start_time = time.perf_counter()
+                out, reason = run_binary([binary], timeout, limits=get_run_limits(arguments))
+                if out == None:
+                    print (f"WARNING: The seed timed out. Keep the {timeout}s timeout...")
+                    return timeout
+                runtimes.append(time.perf_counter() - start_time)
+
+    return max(floor, multiplier * max(runtimes))
+
+def calibrate_crash_signature(arguments: dict):
+    """This function computes the crash signature of the seed (original PoC), which
+    failing programs must reproduce in the "crash" oracle mode.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        (str) crash signature of the seed, or None if the seed does not crash the compiler.
+    """
+
+    file_path = f"{arguments['root']}/{arguments['filename']}"
+
+    with tempfile.TemporaryDirectory(dir=arguments["root"]) as workspace:
+        compilation = compile_program(
+                get_cl(arguments, True, file_path, workspace=workspace),
+                arguments.get("compile-timeout", DEFAULT_COMPILE_TIMEOUT))
+
+    if compilation == None:
+        print (f"WARNING: The seed compilation timed out. Any crash is taken as the bug...")
+        return None
+
+    signature = get_crash_signature(
+            compilation.stderr, compilation.returncode,
+            arguments.get("crash-frames", DEFAULT_CRASH_FRAMES))
+
+    if signature == None:
+        print (f"WARNING: The seed does not crash the compiler. Any crash is taken as the bug...")
+
+    return signature
+
+def run_crash_oracle(arguments: dict, file_path: str, workspace=".", source=None):
+    """This function compiles the code with optimizations and classifies it from the
+    compiler's exit status and crash signature, without executing any binary, i.e.,
+    the code fails if the compiler crashes the same way as with the seed.
 
     args:
         arguments (dict): arguments dictionary.
         file_path (str): path to a code file to test.
+        workspace (str, optional): scratch directory for the compiled binaries.
+        source (str, optional): C source of the code, piped to the compiler instead of reading file_path.
 
-    retunrs:
-        (bool) true if it is a pass. Otherwise, false.
-        (bool) true if the code was compiled and executed. Otherwise, false.
+    returns:
+        (dict) oracle result, where "enabled" holds the compiler's exit status and
+        crash signature.
     """
-    
-    assert os.path.exists(file_path), f"ERROR: {file_path} does not exist."
 
-    print (f"TESTING: {file_path}...")
+    result = {
+        "verdict": "invalid",
+        "reason": None,
+        "disabled": None,
+        "enabled": None
+    }
+
+    compilation = compile_program(
+            get_cl(arguments, True, file_path, workspace=workspace, from_stdin=source != None),
+            arguments.get("compile-timeout", DEFAULT_COMPILE_TIMEOUT), source)
+
+    if compilation == None:
+        result["reason"] = "compile-timeout"
+        return result
+
+    signature = get_crash_signature(
+            compilation.stderr, compilation.returncode,
+            arguments.get("crash-frames", DEFAULT_CRASH_FRAMES))
+
+    result["enabled"] = {
+        "returncode": compilation.returncode,
+        "signature": signature
+    }
+
+    if signature == None:
+        if compilation.returncode != 0:
+            result["reason"] = "compile-error"
+        else:
+            result["verdict"] = "pass"
+    elif arguments.get("crash-signature") in [None, signature]:
+        result["verdict"] = "fail"
+    else:
+        print (f"   Different crash...")
+        result["reason"] = "different-crash"
 
-    # First we compile the code with optimization disabled.
-    disabled_cl = get_cl(arguments, False, file_path)
+    return result
 
-    disabled_compile = subprocess.run(disabled_cl, capture_output=True, text=True)
+def run_oracle(arguments: dict, file_path: str, workspace=".", source=None):
+    """This function compiles the code with and without optimizations, runs both
+    binaries, and compares their outputs. The binaries are not executed when they are
+    identical (a pass) or when the same pair of binaries was already executed. When
+    "oracle-concurrent" is set, both binaries are compiled, then run, at the same time.
+    In the "crash" oracle mode, the code is classified by run_crash_oracle() instead.
 
-    if os.path.exists(file_path) and not os.path.exists("./disabled"):
-        return False, False
+    args:
+        arguments (dict): arguments dictionary.
+        file_path (str): path to a code file to test.
+        workspace (str, optional): scratch directory for the compiled binaries.
+        source (str, optional): C source of the code, piped to the compiler instead of reading file_path.
 
-    disabled_out = run_binary(["./disabled"])
+    returns:
+        (dict) oracle result, i.e., the verdict ("pass", "fail", or "invalid"), the
+        reason of an invalid verdict, and the outputs of the disabled and enabled binaries
+        (None, if the binaries were not executed).
+    """
 
-    # os.remove("./disabled")
+    result = {
+        "verdict": "invalid",
+        "reason": None,
+        "disabled": None,
+        "enabled": None
+    }
+
+    compile_timeout = arguments.get("compile-timeout", DEFAULT_COMPILE_TIMEOUT)
+    timeout = arguments.get("run-timeout", DEFAULT_TIMEOUT)
+    output_limit, prefix_size = get_capture_limits(arguments)
+    limits = get_run_limits(arguments)
+
+    # Remove the binaries of the previous program, so a failed compilation
+    # cannot leave a stale binary behind.
+    for binary in ["disabled", "enabled"]:
+        if os.path.exists(f"{workspace}/{binary}"):
+            os.remove(f"{workspace}/{binary}")
+
+    if arguments.get("oracle-mode") == "crash":
+        return run_crash_oracle(arguments, file_path, workspace, source)
+
+    disabled_cl = get_cl(arguments, False, file_path, workspace=workspace, from_stdin=source != None)
+    enabled_cl = get_cl(arguments, True, file_path, workspace=workspace, from_stdin=source != None)
+
+    if arguments.get("oracle-concurrent"):
+        # Both compilations are independent, so they are done at the same time.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            disabled_future = executor.submit(compile_program, disabled_cl, compile_timeout, source)
+            enabled_future = executor.submit(compile_program, enabled_cl, compile_timeout, source)
+            disabled_compile = disabled_future.result()
+            enabled_compile = enabled_future.result()
+    else:
+        # First we compile the code with optimization disabled.
+        disabled_compile = compile_program(disabled_cl, compile_timeout, source)
+        # Then, we compile the code with optimization enabled.
+        enabled_compile = None
+        if disabled_compile != None:
+            enabled_compile = compile_program(enabled_cl, compile_timeout, source)
 
-    # Then, we compile the code with optimization enabled.
-    enabled_cl = get_cl(arguments, True, file_path)
-    
-    enabled_compile = subprocess.run(enabled_cl, capture_output=True, text=True)
+    if disabled_compile == None or enabled_compile == None:
+        result["reason"] = "compile-timeout"
+        return result
 
-    enabled_out = run_binary(["./enabled"])
+    if (
+            disabled_compile.returncode != 0 or enabled_compile.returncode != 0 or
+            not os.path.exists(f"{workspace}/disabled") or not os.path.exists(f"{workspace}/enabled")
+    ):
+        result["reason"] = "compile-error"
+        if get_crash_signature(enabled_compile.stderr, enabled_compile.returncode) != None:
+            result["reason"] = "compiler-crash"
+        return result
+
+    disabled_hash = get_binary_hash(f"{workspace}/disabled")
+    enabled_hash = get_binary_hash(f"{workspace}/enabled")
+
+    # Identical binaries behave identically, so the optimization cannot flip the output.
+    if disabled_hash == enabled_hash:
+        print (f"   Identical binaries...")
+        result["verdict"] = "pass"
+        return result
+
+    binary_key = get_binary_key(arguments, disabled_hash, enabled_hash)
+
+    known = get_binary_result(binary_key)
+    if known != None:
+        print (f"   Known binaries...")
+        result.update(known)
+        return result
+
+    if arguments.get("oracle-cache"):
+        cached = Cache.lookup(arguments, binary_key, count=False)
+        if cached:
+            print (f"   Known binaries...")
+            set_binary_result(binary_key, cached)
+            return cached
+
+    start_time = time.perf_counter()
+
+    if arguments.get("oracle-concurrent"):
+        # Both binaries are independent, so they are run at the same time.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            disabled_future = executor.submit(
+                    run_binary, [f"{workspace}/disabled"], timeout, output_limit, prefix_size, limits)
+            enabled_future = executor.submit(
+                    run_binary, [f"{workspace}/enabled"], timeout, output_limit, prefix_size, limits)
+            disabled_out, reason = disabled_future.result()
+            enabled_out, enabled_reason = enabled_future.result()
+    else:
+        disabled_out, reason = run_binary(
+                [f"{workspace}/disabled"], timeout, output_limit, prefix_size, limits)
+
+        enabled_out, enabled_reason = run_binary(
+                [f"{workspace}/enabled"], timeout, output_limit, prefix_size, limits)
 
-    # os.remove("./enabled")
-    
     # TODO: This may not work with certain bugs. Identify the specific bug, learn the behavior,
     # then fix this code accordingly.
     if disabled_out == None or enabled_out == None:
-        return False, False
+        result["reason"] = reason if reason else enabled_reason
+    else:
+        result["disabled"] = disabled_out
+        result["enabled"] = enabled_out
+
+        if is_diff(enabled_out, disabled_out):
+            result["verdict"] = "fail"
+        else:
+            result["verdict"] = "pass"
+
+    set_binary_result(binary_key, result)
+    if arguments.get("oracle-cache"):
+        Cache.store(arguments, binary_key, result, time.perf_counter() - start_time)
+
+    return result
+
+def test_program(arguments: dict, file_path: str, workspace=".", source=None):
+    """This function returns the oracle result of the code. When "oracle-cache" is set
+    in the arguments, the result is looked up from (and stored to) the persistent
+    oracle cache before compiling and running anything.
+
+    args:
+        arguments (dict): arguments dictionary.
+        file_path (str): path to a code file to test.
+        workspace (str, optional): scratch directory for the compiled binaries.
+        source (str, optional): C source of the code. If given, it is piped to the
+        compiler, and file_path does not need to exist.
+
+    returns:
+        (dict) oracle result.
+    """
+
+    assert source != None or os.path.exists(file_path), f"ERROR: {file_path} does not exist."
+
+    print (f"TESTING: {file_path}...")
+
+    key = None
+    if arguments.get("oracle-cache"):
+        key = Cache.get_key(arguments, file_path, source)
+        result = Cache.lookup(arguments, key)
+        if result:
+            print (f"   Oracle cache hit...")
+            return result
+
+    start_time = time.perf_counter()
+
+    result = run_oracle(arguments, file_path, workspace, source)
+
+    if key:
+        Cache.store(arguments, key, result, time.perf_counter() - start_time)
+
+    return result
+
+def is_pass(arguments: dict, file_path: str, workspace="."):
+    """This function checks if the code is a fail or pass with the
+     user-specified compiler.
+
+    args:
+        arguments (dict): arguments dictionary.
+        file_path (str): path to a code file to test.
+        workspace (str, optional): scratch directory for the compiled binaries. Each
+        parallel oracle worker must use its own workspace.
+
+    retunrs:
+        (bool) true if it is a pass. Otherwise, false.
+        (bool) true if the code was compiled and executed. Otherwise, false.
+    """
+    
+    result = test_program(arguments, file_path, workspace)
 
-    return not is_diff(enabled_out, disabled_out), True
+    return result["verdict"] == "pass", result["verdict"] != "invalid"
 
 def argument_parser():
     parser = argparse.ArgumentParser()
@@ -0,0 +1,276 @@
+"""
+    This program holds a persistent, content-addressed cache of the oracle results.
+
+    A result is keyed by the hash of the C source, the compiler binary, the compiler
+    options, and the oracle timeouts and limits, so byte-identical programs (e.g.,
+    retries or regenerated variants) are compiled and executed only once across runs
+    and bugs. The results of already executed binary pairs are kept in the same
+    table, keyed by the hash of the two binaries. The cache is a SQLite database
+    shared by all oracle processes, and the least-recently-used entries are evicted
+    once the cache grows beyond "oracle-cache-size" megabytes.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import json
+import time
+import hashlib
+import sqlite3
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import C.COracle as Oracle
+
+# Default cache size limit in megabytes.
+DEFAULT_SIZE = 1024
+
+# Open database connections of the current process, i.e., cache path to (pid, connection).
+# A connection must never be shared with a forked child process.
+CONNECTIONS = {}
+
+def connect(cache_path: str):
+    """This function opens (and creates, if not existing) the cache database.
+
+    args:
+        cache_path (str): path to the cache database file.
+
+    returns:
+        (sqlite3.Connection) database connection.
+    """
+
+    pid = os.getpid()
+
+    if cache_path in CONNECTIONS and CONNECTIONS[cache_path][0] == pid:
+        return CONNECTIONS[cache_path][1]
+
+    connection = sqlite3.connect(cache_path, timeout=60, isolation_level=None)
+    # Write-ahead logging lets the parallel oracle workers read while one writes.
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("BEGIN IMMEDIATE")
+    connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, result TEXT, size INTEGER, elapsed REAL, last_used REAL)")
+    connection.execute("CREATE INDEX IF NOT EXISTS lru ON results (last_used)")
+    connection.execute(
+            "CREATE TABLE IF NOT EXISTS stats ("
+            "root TEXT PRIMARY KEY, hits INTEGER, misses INTEGER, saved REAL)")
+    # The total size of the results is kept up to date by triggers, so the size limit
+    # is checked without summing the whole table (see evict).
+    connection.execute(
+            "CREATE TABLE IF NOT EXISTS total (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER)")
+    connection.execute("INSERT OR IGNORE INTO total SELECT 0, COALESCE(SUM(size), 0) FROM results")
+    connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS total_insert AFTER INSERT ON results BEGIN "
+            "UPDATE total SET size = size + NEW.size; END")
+    connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS total_update AFTER UPDATE OF size ON results BEGIN "
+            "UPDATE total SET size = size + NEW.size - OLD.size; END")
+    connection.execute(
+            "CREATE TRIGGER IF NOT EXISTS total_delete AFTER DELETE ON results BEGIN "
+            "UPDATE total SET size = size - OLD.size; END")
+    connection.execute("COMMIT")
+
+    CONNECTIONS[cache_path] = (pid, connection)
+
+    return connection
+
+def get_compiler_id(compiler: str):
+    """This function identifies the compiler binary by its path, size, and modification
+    time, so rebuilding the compiler invalidates the cached results.
+
+    args:
+        compiler (str): path to the compiler executable.
+
+    returns:
+        (str) compiler identifier.
+    """
+
+    compiler = os.path.realpath(compiler)
+    stat = os.stat(compiler)
+
+    return f"{compiler}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def get_key(arguments: dict, file_path: str, source=None):
+    """This function computes the cache key of the code file, i.e., the hash of
+    the C source, compiler binary, options, opt-off option, linker, oracle mode, and
+    the timeouts and limits of the compilation and the execution, which can change
+    the oracle result.
+
+    args:
+        arguments (dict): arguments dictionary.
+        file_path (str): path to a code file to test.
+        source (str, optional): C source of the code, used instead of reading file_path.
+
+    returns:
+        (str) cache key.
+    """
+
+    if source == None:
+        with open(file_path, "rb") as f:
+            source = f.read()
+    else:
+        source = source.encode()
+
+    configuration = json.dumps([
+        get_compiler_id(arguments["compiler-path"]),
+        arguments["options"],
+        arguments["opt-off"],
+        arguments["linker"],
+        arguments.get("oracle-mode", "output"),
+        arguments.get("crash-signature"),
+        arguments.get("compile-timeout", Oracle.DEFAULT_COMPILE_TIMEOUT),
+        arguments.get("run-timeout", Oracle.DEFAULT_TIMEOUT),
+        Oracle.get_capture_limits(arguments),
+        Oracle.get_run_limits(arguments)
+    ])
+
+    digest = hashlib.sha256(source)
+    digest.update(configuration.encode())
+
+    return digest.hexdigest()
+
+def update_stats(connection: sqlite3.Connection, root: str, hits: int, misses: int, saved: float):
+    """This function adds to the hit/miss counters of the run.
+
+    args:
+        connection (sqlite3.Connection): database connection.
+        root (str): root directory of the run.
+        hits (int): number of cache hits to add.
+        misses (int): number of cache misses to add.
+        saved (float): oracle time saved by the hits in seconds.
+
+    returns:
+        None.
+    """
+
+    connection.execute(
+            "INSERT INTO stats VALUES (?, ?, ?, ?) ON CONFLICT(root) DO UPDATE SET "
+            "hits = hits + excluded.hits, misses = misses + excluded.misses, "
+            "saved = saved + excluded.saved",
+            (root, hits, misses, saved))
+
+def lookup(arguments: dict, key: str, count=True):
+    """This function looks up the cached oracle result.
+
+    args:
+        arguments (dict): arguments dictionary.
+        key (str): cache key.
+        count (bool, optional): update the hit/miss counters of the run.
+
+    returns:
+        (dict) cached oracle result, or None if not cached.
+    """
+
+    connection = connect(arguments["oracle-cache"])
+
+    row = connection.execute("SELECT result, elapsed FROM results WHERE key = ?", (key,)).fetchone()
+
+    if row == None:
+        if count:
+            update_stats(connection, arguments["root"], 0, 1, 0.0)
+        return None
+
+    result, elapsed = row
+    connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+    if count:
+        update_stats(connection, arguments["root"], 1, 0, elapsed)
+
+    return json.loads(result)
+
+def store(arguments: dict, key: str, result: dict, elapsed: float):
+    """This function stores the oracle result, then evicts the least-recently-used
+    results if the cache exceeds its size limit.
+
+    args:
+        arguments (dict): arguments dictionary.
+        key (str): cache key.
+        result (dict): oracle result.
+        elapsed (float): time took to compute the result in seconds.
+
+    returns:
+        None.
+    """
+
+    connection = connect(arguments["oracle-cache"])
+
+    result = json.dumps(result)
+
+    # Unlike INSERT OR REPLACE, the upsert runs the update trigger of the total size.
+    connection.execute(
+            "INSERT INTO results VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+            "result = excluded.result, size = excluded.size, elapsed = excluded.elapsed, "
+            "last_used = excluded.last_used",
+            (key, result, len(result), elapsed, time.time()))
+
+    evict(connection, arguments.get("oracle-cache-size", DEFAULT_SIZE) * 1024 * 1024)
+
+def evict(connection: sqlite3.Connection, max_size: int):
+    """This function removes the least-recently-used results until the total size of
+    the cached results is within the limit.
+
+    args:
+        connection (sqlite3.Connection): database connection.
+        max_size (int): maximum total size of the cached results in bytes.
+
+    returns:
+        None.
+    """
+
+    total_size = connection.execute("SELECT size FROM total").fetchone()[0]
+
+    if total_size <= max_size:
+        return
+
+    evicted = []
+    rows = connection.execute("SELECT key, size FROM results ORDER BY last_used")
+    for key, size in rows:
+        if total_size <= max_size:
+            break
+        evicted.append((key,))
+        total_size -= size
+    rows.close()
+
+    connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+def get_stats(arguments: dict):
+    """This function reads the hit/miss counters of the run.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        (dict) number of hits and misses, and the oracle time saved in seconds.
+    """
+
+    connection = connect(arguments["oracle-cache"])
+
+    row = connection.execute(
+            "SELECT hits, misses, saved FROM stats WHERE root = ?", (arguments["root"],)).fetchone()
+
+    if row == None:
+        row = (0, 0, 0.0)
+
+    return {
+        "hits": row[0],
+        "misses": row[1],
+        "saved": row[2]
+    }
+
+def reset_stats(arguments: dict):
+    """This function resets the hit/miss counters of the run.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        None.
+    """
+
+    connection = connect(arguments["oracle-cache"])
+
+    connection.execute("DELETE FROM stats WHERE root = ?", (arguments["root"],))
@@ -0,0 +1,322 @@
+"""
+    This program emits the code of the mutated asts by splicing tokens into the
+    code of the seed ast.
+
+    Every mutation is a token-level rewrite of a single node, i.e., a constant value,
+    an operator, a goto label, the first name of an IdentifierType, or the qualifiers
+    of a Decl or Typename. The seed ast is rendered once with c_generator.CGenerator,
+    with a placeholder in place of each mutable token (see build_template). The code
+    of a mutated ast is then the rendered seed with the tokens of the mutated target
+    nodes spliced into the placeholders, which needs neither the ast copy, c_json,
+    nor the generator. Mutations that cannot be spliced fall back to the full
+    generation (see Shared.code_text).
+
+    The spliced code is checked against Shared.code_writer for random mutations of
+    the benchmark pocs by tests/test_CSpliceEmitter.py.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+
+from pycparser import c_generator
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(currentdir)
+sys.path.append(parentdir)
+
+import C.pycparser.c_json as c_json
+import C.CAstMutator as CMutator
+import C.CArrayAst as ArrayAst
+import C.SharedEditor as Shared
+
+# Delimiter of the placeholders in the rendered seed. It cannot appear in the code
+# generated by CGenerator, so the rendered seed splits into the code segments and
+# the slot numbers.
+DELIMITER = "\x00"
+
+# Unary operators that CGenerator does not emit as a prefix token.
+SPECIAL_UNARY_OPERATORS = ["sizeof", "p++", "p--"]
+
+def get_slot_fields(node: dict):
+    """This function lists the token fields of the node that the mutators rewrite.
+
+    args:
+        node (dict): abstract syntax tree node.
+
+    returns:
+        (list) list of (field, position in the field's list or None), or None if
+        the node's tokens cannot be spliced.
+    """
+
+    _nodetype = node["_nodetype"]
+
+    if _nodetype == "Constant":
+        return [("value", None)]
+    elif _nodetype in ["BinaryOp", "Assignment"]:
+        return [("op", None)]
+    elif _nodetype == "UnaryOp":
+        if node["op"] in SPECIAL_UNARY_OPERATORS:
+            return None
+        return [("op", None)]
+    elif _nodetype == "Goto":
+        return [("name", None)]
+    elif _nodetype == "IdentifierType":
+        return [("names", 0)]
+    elif _nodetype in ["Decl", "Typename"]:
+        # The qualifier mutator rewrites the quals of the node's type.type, and only
+        # the quals of a TypeDecl are emitted.
+        type_type = node["type"]["type"] if isinstance(node.get("type"), dict) else None
+        if not isinstance(type_type, dict) or type_type["_nodetype"] != "TypeDecl":
+            return None
+        return [("quals", position) for position in range(len(type_type["quals"]))]
+
+    return []
+
+def get_token(node: dict, field: str, position: int):
+    """This function reads the token of the node's field.
+
+    args:
+        node (dict): abstract syntax tree node.
+        field (str): token field (see get_slot_fields).
+        position (int): position in the field's list, or None.
+
+    returns:
+        (str) token.
+    """
+
+    if field == "quals":
+        return node["type"]["type"]["quals"][position]
+    elif position != None:
+        return node[field][position]
+
+    return node[field]
+
+def set_token(node: dict, field: str, position: int, token: str):
+    """This function overwrites the token of the node's field.
+
+    args:
+        node (dict): abstract syntax tree node.
+        field (str): token field (see get_slot_fields).
+        position (int): position in the field's list, or None.
+        token (str): new token.
+
+    returns:
+        None.
+    """
+
+    if field == "quals":
+        node["type"]["type"]["quals"][position] = token
+    elif position != None:
+        node[field][position] = token
+    else:
+        node[field] = token
+
+def placeholder_copy(node: dict, template: dict, node_ids: dict, mutable: bytearray):
+    """This function copies the ast without the post-construction key-items (see
+    CMutator.clean_ast), replacing the tokens of the mutable nodes with placeholders.
+
+    args:
+        node (dict): current node.
+        template (dict): template under construction (see build_template).
+        node_ids (dict): ast node to its node id (see CMutator.get_node_ids).
+        mutable (bytearray): mutability of each node id (see CMutator.new_metadata).
+
+    returns:
+        (dict) copied node.
+    """
+
+    if isinstance(node, list):
+        return [placeholder_copy(item, template, node_ids, mutable) for item in node]
+    elif not isinstance(node, dict):
+        return node
+
+    copied = {
+        key: placeholder_copy(value, template, node_ids, mutable) for key, value in node.items()
+        if key not in ["processed", "nodeid", "is_mutated", "is_mutable"]
+    }
+
+    if "_nodetype" not in node:
+        return copied
+
+    node_id = node_ids[id(node)]
+    if not mutable[node_id]:
+        return copied
+
+    fields = get_slot_fields(node)
+    if fields == None:
+        template["unsupported"].add(node_id)
+        return copied
+
+    for field, position in fields:
+        slot = len(template["slots"])
+        template["slots"].append((node_id, field, position))
+        template["tokens"].append(get_token(node, field, position))
+        template["node_slots"].setdefault(node_id, []).append(slot)
+        set_token(copied, field, position, f"{DELIMITER}{slot}{DELIMITER}")
+
+    return copied
+
+def build_template(ast: dict, index: dict, metadata: dict):
+    """This function renders the seed ast once, recording where each mutable token
+    of the code is.
+
+    args:
+        ast (dict): processed abstract syntax tree of the seed.
+        index (dict): node index of the seed ast.
+        metadata (dict): node metadata of the seed ast (see CMutator.new_metadata).
+
+    returns:
+        (dict) template, i.e., the code segments with the slot numbers at the odd
+        positions, the (node id, field, position) and seed token of each slot, the
+        slots of each node id, and the mutable node ids that cannot be spliced.
+    """
+
+    template = {
+        "segments": [],
+        "slots": [],
+        "tokens": [],
+        "node_slots": {},
+        "unsupported": set()
+    }
+
+    ast_copy = placeholder_copy(ast, template, CMutator.get_node_ids(index), metadata["mutable"])
+
+    generator = c_generator.CGenerator()
+    code = generator.visit(c_json.from_dict(ast_copy))
+
+    segments = code.split(DELIMITER)
+    for i in range(1, len(segments), 2):
+        segments[i] = int(segments[i])
+    template["segments"] = segments
+
+    return template
+
+def find_node(ast: dict, index: dict, node_id: int):
+    """This function finds the node in an ast that shares its node ids with the
+    indexed ast, e.g., an ast mutated from it, by following the indexed path.
+
+    args:
+        ast (dict): abstract syntax tree.
+        index (dict): node index of the seed ast.
+        node_id (int): node id to find.
+
+    returns:
+        (dict) found node.
+    """
+
+    node = ast
+    for child_id in CMutator.get_path(index, node_id)[1:]:
+        entry = index[child_id]
+        if entry["position"] == None:
+            node = node[entry["key"]]
+        else:
+            node = node[entry["key"]][entry["position"]]
+
+    return node
+
+def splice(template: dict, mutated_ast: dict, target_ids: set, index: dict, nodes=None):
+    """This function generates the code of the mutated ast by splicing the tokens of
+    its target nodes into the rendered seed.
+
+    args:
+        template (dict): template of the seed ast (see build_template).
+        mutated_ast (dict): ast mutated from the seed ast (see CMutator.ast_mutator).
+        target_ids (set): mutated target node ids.
+        index (dict): node index of the seed ast.
+        nodes (dict, optional): node id to the mutated target node, which are taken
+        instead of the nodes of mutated_ast.
+
+    returns:
+        (str) generated code, or None if the mutation cannot be spliced.
+    """
+
+    tokens = template["tokens"]
+    replacements = {}
+
+    for node_id in target_ids:
+        if node_id in template["unsupported"]:
+            return None
+        if node_id not in template["node_slots"]:
+            continue
+
+        if nodes != None:
+            node = nodes[node_id]
+        else:
+            node = find_node(mutated_ast, index, node_id)
+            if node["_nodetype"] != index[node_id]["node"]["_nodetype"]:
+                return None
+
+        fields = get_slot_fields(node)
+        slots = template["node_slots"][node_id]
+        if fields == None or len(fields) != len(slots):
+            return None
+
+        for slot, (field, position) in zip(slots, fields):
+            token = get_token(node, field, position)
+            if token != tokens[slot]:
+                replacements[slot] = token
+
+    segments = template["segments"]
+    parts = list(segments)
+    for i in range(1, len(parts), 2):
+        slot = segments[i]
+        parts[i] = replacements.get(slot, tokens[slot])
+
+    return "".join(parts)
+
+def emit(template: dict, mutated_ast: dict, target_ids: set, index: dict):
+    """This function generates the code of the mutated ast, by splicing if possible.
+    Otherwise, by the full generation.
+
+    args:
+        template (dict): template of the seed ast, or None to always use the full
+        generation.
+        mutated_ast (dict): ast mutated from the seed ast.
+        target_ids (set): mutated target node ids.
+        index (dict): node index of the seed ast, or None to always use the full
+        generation.
+
+    returns:
+        (str) generated code.
+    """
+
+    code = None
+    if template != None and index != None:
+        code = splice(template, mutated_ast, target_ids, index)
+
+    if code == None:
+        code = Shared.code_text(mutated_ast)
+
+    return code
+
+def emit_overlay(template: dict, aast: dict, overlay: dict, target_ids: set):
+    """This function generates the code of the ast mutated in the array form (see
+    CMutator.array_ast_mutator). Only the target nodes are materialized to splice the
+    code. The whole ast is materialized if the code must be fully generated.
+
+    args:
+        template (dict): template of the seed ast, or None to always use the full
+        generation.
+        aast (dict): seed ast in the array form.
+        overlay (dict): values changed by the mutation.
+        target_ids (set): mutated target node ids.
+
+    returns:
+        (str) generated code.
+    """
+
+    code = None
+    if template != None:
+        nodes = {
+            node_id: ArrayAst.to_dict(aast, node_id, overlay)
+            for node_id in target_ids if node_id in template["node_slots"]
+        }
+        code = splice(template, None, target_ids, None, nodes)
+
+    if code == None:
+        code = Shared.code_text(ArrayAst.to_dict(aast, 0, overlay))
+
+    return code
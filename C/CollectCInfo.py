@@ -125,7 +125,7 @@ def node_types_identifier(directory_path: str, language_info: dict, shared_dict:
         print (f"Collecting types from {file_path}...")
 
         ast_dict = c_json.file_to_dict(file_path)
-        id_to_type, _, _ = Mutator.tree_traverser(ast_dict)
+        id_to_type, _, _, _, _, _ = Mutator.tree_traverser(ast_dict)
         scanned_types = set()
         for node_id, node_type in id_to_type.items():
             scanned_types = scanned_types.union({node_type})
@@ -53,8 +53,6 @@ def integer_mutator(node: dict, value: int, avoid_values: set):
 
     node["value"] = str(value)
 
-    node["is_mutated"] = True
-
 def char_mutator(node: dict, value: int, avoid_values: set):
     """This function randomly mutates a node with char value.
 
@@ -87,8 +85,6 @@ def char_mutator(node: dict, value: int, avoid_values: set):
 
     node["value"] = str(value)
 
-    node["is_mutated"] = True
-
 def float_mutator(node: dict, value: float, avoid_values: set):
     """This function randomly mutates a node with float value.
 
@@ -116,8 +112,6 @@ def float_mutator(node: dict, value: float, avoid_values: set):
     # Update the node with the new value
     node["value"] = str(value)
 
-    node["is_mutated"] = True
-
 def bool_mutator(node: dict, value: int):
     """This function randomly mutates a node with float value.
 
@@ -141,8 +135,6 @@ def bool_mutator(node: dict, value: int):
 
     node["value"] = str(value)
 
-    node["is_mutated"] = True
-
 def constant_mutator(node: dict, parent: dict, avoid_values: set, value=None):
     """This function is the main function to mutate the constant node.
 
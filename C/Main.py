@@ -32,10 +32,13 @@ from pycparser import c_generator
 import C.pycparser.c_json as c_json
 import C.CAstMutator as CMutator
 import C.CInitGenerator as CInit
+import C.CGroupSearch as GroupSearch
 import C.SharedEditor as Shared
 import C.CLearning_A as Learning_A
 import C.CLearning_B as Learning_B
 import C.CDirectedGenerator as CDirected
+import C.COracle as Oracle
+import C.COracleCache as Cache
 
 def argument_parser():
     parser = argparse.ArgumentParser()
@@ -131,11 +134,13 @@ def preprocess_c_ast(file_path: str, language_info: dict, shared_dict: dict):
         (set) set of mutable node ids.
         (dict) node id to node type dictionary.
         (set) set of label names where goto can jump to.
+        (dict) node index of the ast.
+        (dict) node metadata of the ast (see CMutator.new_metadata).
     """
 
     ast_0 = c_json.file_to_dict(file_path)
 
-    id_to_type, ast_0, ast_size, goto_labels = CMutator.tree_traverser(ast_0)
+    id_to_type, ast_0, ast_size, goto_labels, index, metadata = CMutator.tree_traverser(ast_0)
 
     builtins = CMutator.get_builtins(language_info)
     
@@ -147,7 +152,7 @@ def preprocess_c_ast(file_path: str, language_info: dict, shared_dict: dict):
     is_print = [False]
     CMutator.mark_mutable_nodes(
             ast_0, ast_0, mutable_node_ids, language_info, builtins, 
-            shared_dict, is_loop, is_print, goto_labels)
+            shared_dict, is_loop, is_print, goto_labels, metadata, index)
 
     mutable_node_ids = sorted(mutable_node_ids)
 
@@ -159,7 +164,7 @@ def preprocess_c_ast(file_path: str, language_info: dict, shared_dict: dict):
     information += f"Mutable node ids: {mutable_node_ids}\n"
     information += f"Mutable node size: {len(mutable_node_ids)}\n"
 
-    return ast_0, mutable_node_ids, id_to_type, goto_labels
+    return ast_0, mutable_node_ids, id_to_type, goto_labels, index, metadata
 
 def collect_code_files(poc_path: str, code_path: str):
     """This function collects all code file information.
@@ -285,19 +290,30 @@ def nccat(arguments: dict):
         ast_0,
         mutable_node_ids,
         id_to_type,
-        goto_labels
+        goto_labels,
+        index,
+        metadata
     ) = preprocess_c_ast(file_path, language_info, shared_dict)
     
     Shared.text_writer(
             f"Mutable Node Ids: {str(mutable_node_ids)}\n",
             f"{root}/phase_2a/mutable_node_ids.out")
     Shared.ast_writer(ast_0, f"{root}/phase_2a/ast__0.json")
+    Shared.metadata_writer(metadata, f"{root}/phase_2a/metadata__0.json")
     Shared.json_writer(id_to_type, f"{root}/phase_2a/id_to_type.json")
     
     print ("Phase-1: Initial Test Programs Generation")
-    CInit.test_generator(
-            ast_0, language_info, mutable_node_ids, shared_dict, 
-            asts_path, code_path, arguments, goto_labels, [])
+    phase1_search = arguments.get("phase1-search", "exhaustive")
+    assert phase1_search in ("exhaustive", "ddmin", "hierarchical", "covering"), f"ERROR: Unknown phase1-search: {phase1_search}."
+    if phase1_search != "exhaustive":
+        GroupSearch.test_generator(
+                ast_0, language_info, mutable_node_ids, shared_dict,
+                asts_path, code_path, arguments, goto_labels, index, metadata,
+                mode=phase1_search)
+    else:
+        CInit.test_generator(
+                ast_0, language_info, mutable_node_ids, shared_dict, 
+                asts_path, code_path, arguments, goto_labels, [], index, metadata)
 
     collect_code_files(f"{root}/{poc_name}", code_path)
 
@@ -325,7 +341,7 @@ def nccat(arguments: dict):
          ids_set_to_mutations
     ) = Learning_B.learning(
              arguments, code_path2, asts_path2, identified_node_ids, id_to_type, ast_0,
-             pc2ap, fc2ap, language_info, shared_dict, goto_labels)
+             pc2ap, fc2ap, language_info, shared_dict, goto_labels, index, metadata)
 
     checkpoint_1_end_time = time.perf_counter()
     elapsed_seconds = checkpoint_1_end_time - checkpoint_1_start_time
@@ -342,7 +358,7 @@ def nccat(arguments: dict):
     print ("Phase-3: Witness Test Program Generation")
     CDirected.directed_generator(
                 arguments, code_path3, asts_path3, ast_0, goto_labels, language_info,
-                shared_dict, ids_set_to_mutations, mutable_node_ids, root)
+                shared_dict, ids_set_to_mutations, mutable_node_ids, root, metadata)
 
     witness_path = f"{root}/witnesses"
 
@@ -365,6 +381,12 @@ def nccat(arguments: dict):
     elapsed_minutes = elapsed_seconds / 60
     elapsed_time += f"Checkpoint-1: {elapsed_minutes:.2f}\n" 
 
+    if arguments.get("oracle-cache"):
+        cache_stats = Cache.get_stats(arguments)
+        elapsed_time += (
+            f"Oracle cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['saved'] / 60:.2f} minutes saved\n")
+
     Shared.text_writer(elapsed_time, f"{arguments['root']}/elapsed_time.out", "w")
 
     return
@@ -431,6 +453,16 @@ def main():
 
     create_dirs(arguments["root"])
 
+    if arguments.get("oracle-cache"):
+        Cache.reset_stats(arguments)
+
+    if arguments.get("oracle-mode") == "crash":
+        arguments["crash-signature"] = Oracle.calibrate_crash_signature(arguments)
+        print (f"Crash signature of the seed: {arguments['crash-signature']}")
+    elif arguments.get("adaptive-timeout"):
+        arguments["run-timeout"] = Oracle.calibrate_timeout(arguments)
+        print (f"Execution timeout calibrated from the seed: {arguments['run-timeout']:.3f}s")
+
     start_time = time.perf_counter()
     
     nccat(arguments)
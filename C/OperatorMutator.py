@@ -42,7 +42,6 @@ def unary_mutator(node: dict, language_info: dict):
         print ("WARNING: Unary op is empty...")
     else:
         node['op'] = op
-        node["is_mutated"] = True
     
     return
 
@@ -74,7 +73,6 @@ def binary_mutator(node: dict, language_info: dict):
         print ("WARNING: Unary op is empty...")
     else:
         node['op'] = op
-        node["is_mutated"] = True
 
 def assignment_mutator(node: dict, language_info: dict):
     """This function mutates assignment operator nodes.
@@ -96,7 +94,6 @@ def assignment_mutator(node: dict, language_info: dict):
         while op == node["op"]:
             op = random.choice(assignments)
         node["op"] = op
-        node["is_mutated"] = True
 
 def operator_mutator(node: dict, language_info: dict):
     """This function mutates binary, unary, and assignment operator nodes.
@@ -33,8 +33,6 @@ def qualifier_mutator(node: dict, parent: dict, language_info: dict):
 
     node['quals'] = copy.deepcopy(new_quals)
     node['type']['type']['quals'] = copy.deepcopy(new_quals)
-    
-    node["is_mutated"] = True
 
 def identifier_type_mutator(node: dict, language_info: dict):
     """This function mutates nodes with IdentifierType node type.
@@ -68,8 +66,6 @@ def identifier_type_mutator(node: dict, language_info: dict):
         name = random.choice(select_from)
     node["names"][0] = name
 
-    node["is_mutated"] = True
-
 def loop_cf_mutator(node: dict):
     """This function mutates nodes with Continue or Break node type.
 
@@ -114,8 +110,6 @@ def goto_mutator(node: dict, goto_labels: set):
         new_label = random.choice(list(goto_labels))
     node["name"] = new_label
 
-    node["is_mutated"]
-
 def other_mutators(node: dict, parent: dict, language_info: dict, goto_labels: set):
     """This function mutates nodes with the node types other than constant and operator.
 
@@ -7,15 +7,19 @@
 
 import json
 import copy
+import math
+import heapq
 import os, sys
 import random
 import subprocess
 import shutil
+import tempfile
 
 from itertools import combinations
 from random import seed
 from random import randint
 from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor
 
 from pycparser import c_generator
 import C.pycparser.c_json as c_json
@@ -26,9 +30,36 @@ sys.path.append(parentdir)
 
 import C.COracle as Oracle
 import C.CAstMutator as CMutator
+import C.CBinaryAst as BinaryAst
+
+# Values of "ast-format" to the extension of the ast files.
+AST_FORMATS = {
+    "json": ".json",
+    "binary": BinaryAst.EXTENSION
+}
+
+def get_ast_extension(arguments: dict):
+    """This function gets the extension of the ast files to write, which also tells
+    the ast writer and loader the format of the files.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        (str) ast file extension.
+    """
+
+    ast_format = "json"
+    if arguments != None:
+        ast_format = arguments.get("ast-format", "json")
+
+    assert ast_format in AST_FORMATS, f"ERROR: Unknown ast-format '{ast_format}'."
+
+    return AST_FORMATS[ast_format]
 
 def ast_writer(ast: dict, ast_file_path: str):
-    """This function writes ast to disk.
+    """This function writes ast to disk, in the binary format if the file has the
+    binary ast extension (see CBinaryAst). Otherwise, in json.
 
     args:
         ast (dict): ast to write.
@@ -38,11 +69,69 @@ def ast_writer(ast: dict, ast_file_path: str):
         None.
     """
 
-    with open(ast_file_path, 'w') as f:
-        json.dump(ast, f, indent=4)
+    if ast_file_path.endswith(BinaryAst.EXTENSION):
+        BinaryAst.dump(ast, ast_file_path)
+    else:
+        with open(ast_file_path, 'w') as f:
+            json.dump(ast, f, indent=4)
 
     assert ast_file_path, f"ERROR: Failed to write to {ast_file_path}."
 
+# Values of "ast-retention", i.e., which mutated asts are written to disk.
+AST_RETENTIONS = ["all", "learning", "none"]
+
+# Background threads writing the asts of the current process, i.e., pid to executor.
+# An executor must never be shared with a forked child process.
+AST_WRITERS = {}
+
+def retains_asts(arguments: dict, is_learning: bool):
+    """This function checks whether the mutated asts of a phase are written to disk.
+    With "none" (default), only the mutation log of the phase is written, from which
+    Learning-B reconstructs the mutated nodes (see CMutationLog). With "learning", the
+    asts of the phases whose asts Learning-B reads back (i.e., Phase-1, 2a, and 2b)
+    are written as well.
+
+    args:
+        arguments (dict): arguments dictionary.
+        is_learning (bool): true if the asts are of a learning phase.
+
+    returns:
+        (bool) true if the asts are written. Otherwise, false.
+    """
+
+    retention = "none"
+    if arguments != None:
+        retention = arguments.get("ast-retention", "none")
+
+    assert retention in AST_RETENTIONS, f"ERROR: Unknown ast-retention '{retention}'."
+
+    if retention == "all":
+        return True
+    elif retention == "learning":
+        return is_learning
+
+    return False
+
+def ast_writer_async(ast: dict, ast_file_path: str):
+    """This function writes ast to disk in a background thread of the current process.
+    The ast must not be modified until the write is done.
+
+    args:
+        ast (dict): ast to write.
+        ast_file_path (str): path to ast file.
+
+    returns:
+        (concurrent.futures.Future) future of the write. Its result() waits for the
+        write and raises its error, if any.
+    """
+
+    pid = os.getpid()
+
+    if pid not in AST_WRITERS:
+        AST_WRITERS[pid] = ThreadPoolExecutor(max_workers=1)
+
+    return AST_WRITERS[pid].submit(ast_writer, ast, ast_file_path)
+
 def code_writer(ast_file_path: str, code_file_path: str):
     """This function writes js code to disk from the specified ast file.
 
@@ -56,16 +145,30 @@ def code_writer(ast_file_path: str, code_file_path: str):
 
     assert ast_file_path, f"ERROR: {ast_file_path} does not exist."
 
-    ast_dict = load_json(ast_file_path)
-    CMutator.clean_ast(ast_dict)
-    ast = c_json.from_dict(ast_dict)
-    generator = c_generator.CGenerator()
+    ast_dict = load_ast(ast_file_path)
 
     with open(code_file_path, "w") as f:
-        f.write(generator.visit(ast))
+        f.write(code_text(ast_dict))
 
     assert code_file_path, f"ERROR: Failed to write to {code_file_path}."
 
+def code_text(ast_dict: dict):
+    """This function generates the c code of the ast in memory.
+    The ast is not modified (see c_json.from_dict), so it may share subtrees with
+    other asts.
+
+    args:
+        ast_dict (dict): ast to generate the code from.
+
+    returns:
+        (str) generated code.
+    """
+
+    ast = c_json.from_dict(ast_dict)
+    generator = c_generator.CGenerator()
+
+    return generator.visit(ast)
+
 def json_writer(dict_obj: dict, path: str):
     """This function writes json to disk.
 
@@ -98,6 +201,89 @@ def load_json(file_path: str):
     with open(file_path) as f:
         return json.load(f)
 
+def load_ast(ast_file_path: str):
+    """This function loads the ast file of either format.
+
+    args:
+        ast_file_path (str): path to the ast file.
+
+    returns:
+        (dict) loaded ast.
+    """
+
+    if ast_file_path.endswith(BinaryAst.EXTENSION):
+        ast = BinaryAst.load(ast_file_path)
+    else:
+        ast = load_json(ast_file_path)
+
+    # The asts written before the node metadata was moved to side tables are annotated.
+    CMutator.clean_ast(ast)
+
+    return ast
+
+def load_ast_nodes(ast_file_path: str, node_ids: list):
+    """This function loads the nodes with the node ids from the ast file of either
+    format. Only the requested nodes are decoded from a binary ast file.
+
+    args:
+        ast_file_path (str): path to the ast file.
+        node_ids (list): node ids to load.
+
+    returns:
+        (dict) node id to loaded node, or None if the ast has no such node.
+    """
+
+    if ast_file_path.endswith(BinaryAst.EXTENSION):
+        return BinaryAst.load_nodes(ast_file_path, node_ids)
+
+    index = CMutator.build_index(load_json(ast_file_path))
+
+    return {node_id: index[node_id]["node"] if node_id in index else None for node_id in node_ids}
+
+def metadata_writer(metadata: dict, path: str):
+    """This function writes the node metadata of an ast (see CMutator.new_metadata) to
+    disk as json, with each side table in hex.
+
+    args:
+        metadata (dict): node metadata.
+        path (str): path to the metadata file.
+
+    returns:
+        None.
+    """
+
+    json_writer({key: table.hex() for key, table in metadata.items()}, path)
+
+def load_metadata(path: str):
+    """This function loads the node metadata written by metadata_writer().
+
+    args:
+        path (str): path to the metadata file.
+
+    returns:
+        (dict) node metadata.
+    """
+
+    return {key: bytearray.fromhex(table) for key, table in load_json(path).items()}
+
+def find_ast_file(dir_path: str, ast_id: str):
+    """This function finds the ast file of the ast id in either format.
+
+    args:
+        dir_path (str): directory where the ast files are stored.
+        ast_id (str): ast id.
+
+    returns:
+        (str) path to the ast file, or None if the ast was not written.
+    """
+
+    for extension in AST_FORMATS.values():
+        ast_file_path = f"{dir_path}/ast__{ast_id}{extension}"
+        if os.path.exists(ast_file_path):
+            return ast_file_path
+
+    return None
+
 def text_writer(text: str, file_path: str, mode="w"):
     """This function writes provided text string to a designated file.
 
@@ -112,6 +298,52 @@ def text_writer(text: str, file_path: str, mode="w"):
     with open(file_path, mode) as f:
         f.write(text)
 
+# Scratch directory of the current oracle process. It stays the current working
+# directory unless the process is a parallel grouping worker (see init_grouping_worker).
+WORKSPACE = "."
+
+# Number of code files checked by one compiler invocation when "frontend-batch-size" is not given.
+DEFAULT_FRONTEND_BATCH_SIZE = 32
+
+# RAM-backed directory for the oracle workspaces used when "oracle-tmpfs" is not given.
+DEFAULT_TMPFS = "/dev/shm"
+
+def get_workspaces_root(arguments: dict):
+    """This function creates the directory under which the oracle workspaces are created.
+    With "oracle-stdin", the binaries are written to a RAM-backed directory
+    ("oracle-tmpfs") instead of the (possibly network-backed) root directory.
+
+    args:
+        arguments (dict): arguments dictionary.
+
+    returns:
+        (str) path to the created directory. The caller must remove it.
+    """
+
+    workspaces_dir = arguments["root"]
+
+    if arguments.get("oracle-stdin"):
+        tmpfs = arguments.get("oracle-tmpfs", DEFAULT_TMPFS)
+        # Fall back to the system temporary directory.
+        workspaces_dir = tmpfs if os.path.isdir(tmpfs) else None
+
+    return tempfile.mkdtemp(prefix="oracle_workspaces_", dir=workspaces_dir)
+
+def init_grouping_worker(workspaces_root: str):
+    """This function initializes a parallel grouping worker process by creating
+    its own scratch directory, so the binaries of concurrently tested programs
+    never overwrite each other.
+
+    args:
+        workspaces_root (str): directory under which the worker workspace is created.
+
+    returns:
+        None.
+    """
+
+    global WORKSPACE
+    WORKSPACE = tempfile.mkdtemp(prefix="worker_", dir=workspaces_root)
+
 def grouping_worker(args: list):
     """This function tests the code to determine whether it's a passing or failing code.
 
@@ -121,43 +353,76 @@ def grouping_worker(args: list):
     returns:
         (int) code id.
         (bool) true, if the code is a passing code; false, otherwise.
+        (bool) true, if the code was compiled and executed; false, otherwise.
+        (str) reason why the code is invalid, if it is.
     """
-    arguments, code_path, file_name = args
+
+    arguments, code_path, file_name, store_bin = args
     if not file_name.endswith(".c"):
         return None
     
     file_path = f"{code_path}/{file_name}"
-    is_pass, is_executed = Oracle.is_pass(arguments, file_path)
-    print (f"{file_path}:     {is_pass}, {is_executed}")
+
+    if store_bin and os.path.exists(f"{WORKSPACE}/enabled"):
+        # Cached results do not produce binaries, so do not leave an older one behind.
+        os.remove(f"{WORKSPACE}/enabled")
+
+    is_pass, is_executed, reason = test_code(arguments, file_path)
 
     file_id = int(file_name.split("__")[1].split(".")[0])
 
-    return file_id, is_pass, is_executed
+    if store_bin and is_executed and os.path.exists(f"{WORKSPACE}/enabled"):
+        prefix = "passing" if is_pass else "failing"
+        shutil.move(f"{WORKSPACE}/enabled", f"{code_path}/bins/{prefix}__{file_id}")
+
+    return file_id, is_pass, is_executed, reason
+
+def test_code(arguments: dict, file_path: str, source=None):
+    """This function tests the code in the workspace of the current process.
+
+    args:
+        arguments (dict): arguments dictionary.
+        file_path (str): path to the code file.
+        source (str, optional): code to test in memory, i.e., file_path need not exist.
+
+    returns:
+        (bool) true, if the code is a passing code; false, otherwise.
+        (bool) true, if the code was compiled and executed; false, otherwise.
+        (str) reason why the code is invalid, if it is.
+    """
+
+    result = Oracle.test_program(arguments, file_path, WORKSPACE, source)
+    is_pass = result["verdict"] == "pass"
+    is_executed = result["verdict"] != "invalid"
+
+    print (f"   Result: Did it pass? {is_pass}. Did it execute properly (e.g., no infinite loop, etc.)? {is_executed}")
+
+    return is_pass, is_executed, result.get("reason")
 
 def group_all_programs(arguments: dict, code_path: str, num_processors=None, store_bin=False):
     """This function tests the code to determine whether it's a passing or failing code.
 
+    The programs are tested by "oracle-jobs" (arguments.json) processes in parallel,
+    where 0 means one process per cpu. Each process compiles and runs the programs
+    in its own workspace under the root directory (or "oracle-tmpfs" with "oracle-stdin").
+    With "oracle-frontend-check", the programs rejected by the compiler frontend are
+    marked invalid before anything is built (see frontend_check). The reasons of the invalid
+    programs (e.g., compile-timeout or run-timeout) are written to invalid_reasons.json.
+
     args:
         arguments (dict): arguments dictionary.
         code_path (str): path to the directory where all code files are saved.
         num_processors (int, optional): number of processors to use for parallel processing.
+        store_bin (bool, optional): keep the optimized binaries under code_path/bins.
 
     returns:
-        None.
+        (dict) grouped file ids.
     """
 
-    root = arguments["root"]
-
     code_files = os.listdir(code_path)
 
     assert len(code_files) > 0, f"ERROR: {code_path} empty"
 
-    files = {
-        "passings": [],
-        "failings": [],
-        "invalids": []
-    }
-
     #if len(code_files) == 0:
     #    with open(f"{code_path}/grouped_files.json", "w") as f:
     #        json.dump(files, f, indent=4)
@@ -166,40 +431,106 @@ def group_all_programs(arguments: dict, code_path: str, num_processors=None, sto
     if store_bin:
         os.mkdir(f"{code_path}/bins")
 
-    for file_name in code_files:
-        if file_name.endswith(".c"):
-            file_path = f"{code_path}/{file_name}"
-            is_pass, is_executed = Oracle.is_pass(arguments, file_path)
+    if num_processors == None:
+        num_processors = arguments.get("oracle-jobs", 1)
+    if num_processors == 0:
+        num_processors = os.cpu_count()
+
+    tasks = [(arguments, code_path, file_name, store_bin) for file_name in code_files if file_name.endswith(".c")]
+
+    results = []
+    if arguments.get("oracle-frontend-check"):
+        tasks, results = frontend_check(arguments, code_path, tasks, num_processors)
+
+    if num_processors == 1 and not arguments.get("oracle-stdin"):
+        results += [grouping_worker(task) for task in tasks]
+    else:
+        workspaces_root = get_workspaces_root(arguments)
+        try:
+            with Pool(
+                    processes=num_processors, initializer=init_grouping_worker,
+                    initargs=(workspaces_root,)) as pool:
+                # imap keeps the results in the order of the tasks, and a chunk size of 1
+                # balances the load as the test time varies a lot from program to program.
+                results += list(pool.imap(grouping_worker, tasks, chunksize=1))
+        finally:
+            shutil.rmtree(workspaces_root, ignore_errors=True)
+
+    return group_writer(code_path, results)
+
+def frontend_check(arguments: dict, code_path: str, tasks: list, num_processors: int):
+    """This function is the first, frontend-only, stage of the oracle. It checks the code
+    files in batches of "frontend-batch-size" files in parallel, and writes the diagnostics
+    of the rejected code files to frontend_diagnostics.json.
+
+    args:
+        arguments (dict): arguments dictionary.
+        code_path (str): path to the directory where all code files are saved.
+        tasks (list): grouping_worker tasks of the code files.
+        num_processors (int): number of frontend compilations to run in parallel.
+
+    returns:
+        (list) tasks of the code files that passed the frontend.
+        (list) results of the rejected code files (see group_writer).
+    """
+
+    batch_size = arguments.get("frontend-batch-size", DEFAULT_FRONTEND_BATCH_SIZE)
 
-            print (f"   Result: Did it pass? {is_pass}. Did it execute properly (e.g., no infinite loop, etc.)? {is_executed}")
+    file_paths = [f"{code_path}/{task[2]}" for task in tasks]
+    batches = [file_paths[i:i+batch_size] for i in range(0, len(file_paths), batch_size)]
+
+    rejected = {}
+    with ThreadPoolExecutor(max_workers=num_processors) as executor:
+        for batch_rejected in executor.map(lambda batch: Oracle.check_frontend(arguments, batch), batches):
+            rejected.update(batch_rejected)
+
+    passed_tasks = []
+    results = []
+    diagnostics = {}
+    for task, file_path in zip(tasks, file_paths):
+        if file_path in rejected:
+            file_id = int(task[2].split("__")[1].split(".")[0])
+            results.append((file_id, False, False, "frontend-error"))
+            diagnostics[file_id] = rejected[file_path]
+        else:
+            passed_tasks.append(task)
+
+    json_writer(diagnostics, f"{code_path}/frontend_diagnostics.json")
+
+    return passed_tasks, results
+
+def group_writer(code_path: str, results: list):
+    """This function groups the tested programs into passing, failing, and invalid programs,
+    and writes the groups to grouped_files.json and the reasons of the invalid programs
+    to invalid_reasons.json.
+
+    args:
+        code_path (str): path to the directory where all code files are saved.
+        results (list): list of (code id, is pass, is executed, invalid reason) of the
+        tested programs, where None entries are skipped.
+
+    returns:
+        (dict) grouped file ids.
+    """
+
+    files = {
+        "passings": [],
+        "failings": [],
+        "invalids": []
+    }
 
-            file_id = int(file_name.split("__")[1].split(".")[0])
+    invalid_reasons = {}
 
+    for result in results:
+        if result is not None:
+            file_id, is_pass, is_executed, reason = result
             if is_pass:
                 files["passings"].append(file_id)
-                if store_bin:
-                    shutil.move(f"{root}/enabled", f"{code_path}/bins/passing__{file_id}")
             elif not is_pass and is_executed:
                 files["failings"].append(file_id)
-                if store_bin:
-                    shutil.move(f"{root}/enabled", f"{code_path}/bins/failing__{file_id}")
             else:
                 files["invalids"].append(file_id)
-
-    # tasks = [(arguments, code_path, file_name) for file_name in code_files]
-
-    # with Pool(processes=num_processors) as pool:
-    #    results = pool.map(grouping_worker, tasks)
-
-    # for result in results:
-    #     if result is not None:
-    #         file_id, is_pass, is_executed = result
-    #         if is_pass:
-    #             files["passings"].append(file_id)
-    #         elif not is_pass and is_executed:
-    #             files["failings"].append(file_id)
-    #         else:
-    #             files["invalids"].append(file_id)
+                invalid_reasons[file_id] = reason
 
     print(f"# of passing files: {len(files['passings'])}")
     print(f"# of failing files: {len(files['failings'])}")
@@ -208,6 +539,8 @@ def group_all_programs(arguments: dict, code_path: str, num_processors=None, sto
     with open(f"{code_path}/grouped_files.json", "w") as f:
         json.dump(files, f, indent=4)
 
+    json_writer(invalid_reasons, f"{code_path}/invalid_reasons.json")
+
     return files
 
 def generate_combinations(mutable_node_ids: set, r: int):
@@ -223,6 +556,75 @@ def generate_combinations(mutable_node_ids: set, r: int):
 
     return list(combinations(mutable_node_ids, r))
 
+def sample_combinations(mutable_node_ids: set, r: int, size: int, is_skipped=None):
+    """Sample combinations of r elements from the given set of mutable node ids, without
+    listing all of them. The combinations are drawn at random without replacement, and
+    each node is weighted down by how many more times it was drawn than the least drawn
+    nodes, so the nodes are in a similar number of combinations. A combination drawn
+    again is rejected while at most half of the combinations were drawn, i.e., while a
+    draw is new with a chance of at least a half. The rest are taken from the
+    combinations not drawn yet by the largest weighted random keys.
+
+    Parameters:
+    mutable_node_ids (set): the set of mutable node ids to construct combinations.
+    r (int): the number of elements in each combination.
+    size (int): the number of combinations to sample.
+    is_skipped (function, optional): tells whether a drawn combination is skipped, i.e.,
+    drawn but not sampled.
+
+    Returns:
+        (list) a list of sampled combinations, where each combination is a sorted tuple of r elements.
+        (list) a list of skipped combinations.
+    """
+
+    node_ids = sorted(mutable_node_ids)
+    counts = {node_id: 0 for node_id in node_ids}
+    total = math.comb(len(node_ids), r)
+
+    sampled = []
+    skipped = []
+    drawn = set()
+
+    while len(sampled) < size and len(drawn) * 2 < total:
+        least = min(counts.values())
+        if least == max(counts.values()):
+            combination = tuple(sorted(random.sample(node_ids, r)))
+        else:
+            # Weighted sampling without replacement, i.e., the r nodes with the largest
+            # u ^ (1 / weight) for a uniform u and a weight of 1 / (1 + count - least).
+            combination = tuple(sorted(heapq.nlargest(
+                    r, node_ids, key=lambda node_id: random.random() ** (1 + counts[node_id] - least))))
+        if combination in drawn:
+            continue
+        drawn.add(combination)
+
+        for node_id in combination:
+            counts[node_id] += 1
+
+        if is_skipped != None and is_skipped(combination):
+            skipped.append(combination)
+        else:
+            sampled.append(combination)
+
+    if len(sampled) < size and len(drawn) < total:
+        # At most as many combinations as drawn are left, so they are listed, and the
+        # ones with the largest u ^ (1 + the excess counts of their nodes) are taken.
+        least = min(counts.values())
+        left = []
+        for combination in combinations(node_ids, r):
+            if combination in drawn:
+                continue
+            if is_skipped != None and is_skipped(combination):
+                skipped.append(combination)
+            else:
+                left.append(combination)
+        sampled += heapq.nlargest(
+                size - len(sampled), left,
+                key=lambda combination: random.random() ** (
+                    1 + sum(counts[node_id] - least for node_id in combination)))
+
+    return sampled, skipped
+
 ################################################################
 ##                                                            ##
 ##                          ARCHIVE                           ##
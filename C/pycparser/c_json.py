@@ -33,10 +33,14 @@
 #             ]
 #         }
 #     }
+#
+# The child attributes of each Node class (and whether they are sequences) are
+# computed once at import time (see NODE_INFO), so the conversions need neither
+# regular expressions nor per-node introspection. from_dict does not modify the
+# dict it is given, so a dict can be converted any number of times.
 #------------------------------------------------------------------------------
 import json
 import sys
-import re
 
 # This is not required if you've installed pycparser into
 # your site-packages/ with setup.py
@@ -47,46 +51,73 @@ from pycparser import parse_file, c_ast
 from pycparser.plyparser import Coord
 
 
-RE_CHILD_ARRAY = re.compile(r'(.*)\[(.*)\]')
-RE_INTERNAL_ATTR = re.compile('__.*__')
-
-
 class CJsonError(Exception):
     pass
 
 
-def memodict(fn):
-    """ Fast memoization decorator for a function taking a single argument """
-    class memodict(dict):
-        def __missing__(self, key):
-            ret = self[key] = fn(key)
-            return ret
-    return memodict().__getitem__
+def _child_info_of(klass):
+    """
+    Given a Node class, get its child attrs in the order of Node.children(),
+    as (name, is_sequence) pairs. Every child attr of a probe instance is set
+    to a one-item list: a sequence attr is reported as 'name[0]' by children(),
+    while any other attr is reported as 'name'.
+
+    """
+    non_child_attrs = set(klass.attr_names) | {'coord', '__weakref__'}
+    child_attrs = [i for i in klass.__slots__ if i not in non_child_attrs]
+
+    kwargs = {attr: None for attr in klass.attr_names}
+    kwargs.update({attr: [None] for attr in child_attrs})
+    probe = klass(**kwargs)
+
+    child_info = []
+    for child_name, _ in probe.children():
+        if child_name.endswith('[0]'):
+            child_info.append((child_name[:-3], True))
+        else:
+            child_info.append((child_name, False))
+
+    if set(name for name, _ in child_info) != set(child_attrs):
+        raise CJsonError('Internal ast error. Children of {} do not match '
+            'its attributes'.format(klass.__name__))
+
+    return tuple(child_info)
 
 
-@memodict
-def child_attrs_of(klass):
+def _build_node_info():
     """
-    Given a Node class, get a set of child attrs.
-    Memoized to avoid highly repetitive string manipulation
+    Map each Node class name to the class, its local attrs, its child attrs
+    (see _child_info_of), and the set of its child attr names.
 
     """
-    non_child_attrs = set(klass.attr_names)
-    all_attrs = set([i for i in klass.__slots__ if not RE_INTERNAL_ATTR.match(i)])
-    return all_attrs - non_child_attrs
+    node_info = {}
+    for name, klass in vars(c_ast).items():
+        if (isinstance(klass, type) and issubclass(klass, c_ast.Node) and
+                klass is not c_ast.Node):
+            child_info = _child_info_of(klass)
+            node_info[name] = (
+                klass,
+                tuple(klass.attr_names),
+                child_info,
+                frozenset(name for name, _ in child_info))
+    return node_info
+
+
+NODE_INFO = _build_node_info()
 
 
 def to_dict(node):
     """ Recursively convert an ast into dict representation. """
-    klass = node.__class__
+    class_name = node.__class__.__name__
+    _, attr_names, child_info, _ = NODE_INFO[class_name]
 
     result = {}
 
     # Metadata
-    result['_nodetype'] = klass.__name__
+    result['_nodetype'] = class_name
 
     # Local node attributes
-    for attr in klass.attr_names:
+    for attr in attr_names:
         result[attr] = getattr(node, attr)
 
     # Coord object
@@ -95,27 +126,24 @@ def to_dict(node):
     else:
         result['coord'] = None
 
-    # Child attributes
-    for child_name, child in node.children():
-        # Child strings are either simple (e.g. 'value') or arrays (e.g. 'block_items[1]')
-        match = RE_CHILD_ARRAY.match(child_name)
-        if match:
-            array_name, array_index = match.groups()
-            array_index = int(array_index)
-            # arrays come in order, so we verify and append.
-            result[array_name] = result.get(array_name, [])
-            if array_index != len(result[array_name]):
-                raise CJsonError('Internal ast error. Array {} out of order. '
-                    'Expected index {}, got {}'.format(
-                    array_name, len(result[array_name]), array_index))
-            result[array_name].append(to_dict(child))
-        else:
+    # Child attributes, in the order of Node.children(). Any child attributes
+    # that are missing (or empty sequences) need "None" values in the json,
+    # after the present ones.
+    missing = []
+    for child_name, is_sequence in child_info:
+        child = getattr(node, child_name)
+        if is_sequence:
+            if child:
+                result[child_name] = [to_dict(item) for item in child]
+            else:
+                missing.append(child_name)
+        elif child is not None:
             result[child_name] = to_dict(child)
+        else:
+            missing.append(child_name)
 
-    # Any child attributes that were missing need "None" values in the json.
-    for child_attr in child_attrs_of(klass):
-        if child_attr not in result:
-            result[child_attr] = None
+    for child_name in missing:
+        result[child_name] = None
 
     return result
 
@@ -143,41 +171,34 @@ def _parse_coord(coord_str):
         return None
 
     vals = coord_str.split(':')
+    if len(vals) >= 3:
+        return Coord(vals[0], vals[1], vals[2])
     vals.extend([None] * 3)
     filename, line, column = vals[:3]
     return Coord(filename, line, column)
 
 
-def _convert_to_obj(value):
-    """
-    Convert an object in the dict representation into an object.
-    Note: Mutually recursive with from_dict.
-
-    """
-    value_type = type(value)
-    if value_type == dict:
-        return from_dict(value)
-    elif value_type == list:
-        return [_convert_to_obj(item) for item in value]
-    else:
-        # String
-        return value
-
-
 def from_dict(node_dict):
-    """ Recursively build an ast from dict representation """
-    class_name = node_dict.pop('_nodetype')
-
-    klass = getattr(c_ast, class_name)
+    """ Recursively build an ast from dict representation. The dict is left
+    unmodified. """
+    klass, _, _, child_names = NODE_INFO[node_dict['_nodetype']]
 
     # Create a new dict containing the key-value pairs which we can pass
     # to node constructors.
     objs = {}
     for key, value in node_dict.items():
-        if key == 'coord':
+        if key in child_names:
+            if value is None:
+                objs[key] = None
+            elif type(value) == list:
+                objs[key] = [from_dict(item) for item in value]
+            else:
+                objs[key] = from_dict(value)
+        elif key == 'coord':
             objs[key] = _parse_coord(value)
-        else:
-            objs[key] = _convert_to_obj(value)
+        elif key != '_nodetype':
+            # Local attributes are strings or lists of strings.
+            objs[key] = value
 
     # Use keyword parameters, which works thanks to beautifully consistent
     # ast Node initializers.
@@ -0,0 +1,76 @@
+"""
+    Tests of the array form of the asts (see CArrayAst).
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import glob
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.pycparser.c_json as c_json
+import C.CAstMutator as CMutator
+import C.CArrayAst as ArrayAst
+
+POC_PATHS = sorted(glob.glob(f"{parentdir}/Benchmark/*/poc.c"))
+
+@pytest.fixture(scope="module", params=POC_PATHS, ids=lambda path: os.path.basename(os.path.dirname(path)))
+def ast(request):
+    return c_json.file_to_dict(request.param)
+
+def test_round_trip(ast):
+    aast = ArrayAst.from_dict(ast)
+
+    assert ArrayAst.to_dict(aast) == ast
+
+def test_node_ids_are_preorder(ast):
+    aast = ArrayAst.from_dict(ast)
+    index = CMutator.build_index(ast)
+
+    assert ArrayAst.get_size(aast) == len(index)
+    for node_id in range(ArrayAst.get_size(aast)):
+        assert ArrayAst.to_dict(aast, node_id) == index[node_id]["node"]
+        assert ArrayAst.get_type(aast, node_id) == index[node_id]["node"]["_nodetype"]
+        parent_id = index[node_id]["parent_id"]
+        assert aast["parents"][node_id] == (parent_id if parent_id != None else -1)
+
+def get_child_id(aast: dict, node_id: int, key: str):
+    # The node id of the node's child under the key.
+    for entry in range(aast["entries"][node_id], aast["entries"][node_id + 1]):
+        if aast["pool"][aast["entry_keys"][entry]] == key:
+            return aast["entry_refs"][entry]
+
+def test_shallow_dict(ast):
+    aast = ArrayAst.from_dict(ast)
+
+    for node_id in range(ArrayAst.get_size(aast)):
+        node = ArrayAst.to_dict(aast, node_id)
+        shallow = ArrayAst.to_shallow_dict(aast, node_id, 1)
+        for key, value in node.items():
+            if ArrayAst.is_node_list(value):
+                assert key not in shallow
+            elif ArrayAst.is_node(value):
+                child = ArrayAst.to_shallow_dict(aast, get_child_id(aast, node_id, key), 0)
+                assert shallow[key] == child
+                assert all(not ArrayAst.is_node(item) for item in child.values())
+            else:
+                assert shallow[key] == value
+
+def test_overlay_and_edits(ast):
+    aast = ArrayAst.from_dict(ast)
+
+    node_id = ArrayAst.get_size(aast) - 1
+    node = ArrayAst.to_dict(aast, node_id)
+    key = next(key for key, value in node.items() if key != "_nodetype" and not ArrayAst.is_node(value))
+    overlay = {node_id: {key: "mutated"}}
+
+    assert ArrayAst.to_dict(aast, node_id, overlay)[key] == "mutated"
+    assert ArrayAst.to_dict(aast, node_id)[key] == node[key]
+    assert ArrayAst.get_edits(aast, overlay) == [[node_id, key, node[key], "mutated"]]
@@ -0,0 +1,74 @@
+"""
+    Tests of the binary ast format (see CBinaryAst).
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import glob
+import json
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.pycparser.c_json as c_json
+import C.CAstMutator as CMutator
+import C.CBinaryAst as BinaryAst
+
+POC_PATHS = sorted(glob.glob(f"{parentdir}/Benchmark/*/poc.c"))
+
+@pytest.fixture(scope="module", params=POC_PATHS, ids=lambda path: os.path.basename(os.path.dirname(path)))
+def ast(request):
+    return c_json.file_to_dict(request.param)
+
+@pytest.fixture
+def ast_path(ast, tmp_path):
+    file_path = str(tmp_path / f"ast__0{BinaryAst.EXTENSION}")
+    BinaryAst.dump(ast, file_path)
+    return file_path
+
+def test_round_trip(ast, ast_path):
+    assert BinaryAst.is_binary_ast(ast_path)
+    assert BinaryAst.load(ast_path) == ast
+
+    with open(ast_path, "rb") as f:
+        assert f.read() == BinaryAst.dumps(ast)
+
+def test_load_nodes(ast, ast_path):
+    index = CMutator.build_index(ast)
+    nodes = BinaryAst.load_nodes(ast_path, list(index))
+
+    assert nodes[0] == BinaryAst.load(ast_path)
+    for node_id, entry in index.items():
+        assert nodes[node_id] == entry["node"]
+
+def test_load_missing_node(ast, ast_path):
+    node_id = len(CMutator.build_index(ast))
+
+    assert BinaryAst.load_node(ast_path, node_id) == None
+    assert BinaryAst.load_node(ast_path, -1) == None
+    assert BinaryAst.load_nodes(ast_path, [0, node_id])[node_id] == None
+
+def test_json_is_not_binary(ast, tmp_path):
+    file_path = tmp_path / "ast__0.json"
+    file_path.write_text(json.dumps(ast))
+
+    assert not BinaryAst.is_binary_ast(str(file_path))
+
+def test_values(tmp_path):
+    ast = {
+        "_nodetype": "FileAST",
+        "coord": None,
+        "ext": [{"_nodetype": "Constant", "value": "-1", "flags": [True, False], "size": -2 ** 40, "ratio": 0.5}],
+        "attributes": {"name": "x", "nested": {"_nodetype": "ID", "name": "y"}},
+    }
+    file_path = str(tmp_path / f"ast__0{BinaryAst.EXTENSION}")
+    BinaryAst.dump(ast, file_path)
+
+    assert BinaryAst.load(file_path) == ast
+    assert BinaryAst.load_node(file_path, 1) == ast["ext"][0]
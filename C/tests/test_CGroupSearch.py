@@ -0,0 +1,113 @@
+"""
+    Tests of the Phase-1 group searches (see CGroupSearch), run against a fake oracle
+    instead of generating and compiling the programs.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import itertools
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.CGroupSearch as Search
+
+def run_search(monkeypatch, tasks: list, oracle):
+    """This function runs the search tasks with the fake oracle.
+
+    args:
+        monkeypatch (MonkeyPatch): pytest monkeypatch fixture.
+        tasks (list): search tasks.
+        oracle (function): node set to its outcome.
+
+    returns:
+        (list) found flip-inducing node sets.
+        (dict) tested node set to its outcome and its (round, ast id).
+    """
+
+    def test_round(generation, node_sets, r):
+        return {
+            node_set: (oracle(node_set), (r, ast_id)) for ast_id, node_set in enumerate(node_sets, start=1)
+        }
+
+    monkeypatch.setattr(Search, "test_round", test_round)
+
+    return Search.search({}, tasks)
+
+def masked_oracle(node_set: frozenset):
+    # Mutating 3 or 6 flips the output, but mutating 1 masks the flip of 6.
+    if 3 in node_set or (6 in node_set and 1 not in node_set):
+        return Search.PASSING
+    return Search.FAILING
+
+def test_ddmin_finds_every_passing_singleton(monkeypatch):
+    found, _ = run_search(monkeypatch, [Search.explore(frozenset(range(1, 9)))], masked_oracle)
+
+    assert sorted(sorted(node_set) for node_set in found) == [[3], [6]]
+
+def test_ddmin_finds_passing_singletons_of_the_same_round(monkeypatch):
+    def oracle(node_set):
+        return Search.PASSING if node_set & {39, 41} else Search.FAILING
+
+    found, _ = run_search(monkeypatch, [Search.explore(frozenset(range(30, 50)))], oracle)
+
+    assert sorted(sorted(node_set) for node_set in found) == [[39], [41]]
+
+def test_ddmin_finds_the_minimal_pair(monkeypatch):
+    def oracle(node_set):
+        return Search.PASSING if {2, 7} <= node_set else Search.FAILING
+
+    found, _ = run_search(monkeypatch, [Search.explore(frozenset(range(1, 11)))], oracle)
+
+    assert found == [frozenset({2, 7})]
+
+def test_explore_drops_failing_set(monkeypatch):
+    found, tested = run_search(
+            monkeypatch, [Search.explore(frozenset(range(1, 9)))], lambda node_set: Search.FAILING)
+
+    assert found == []
+    assert len(tested) == 1
+
+def test_explore_splits_invalid_set(monkeypatch):
+    def oracle(node_set):
+        if 1 in node_set and 8 in node_set:
+            return Search.INVALID
+        return Search.PASSING if 5 in node_set else Search.FAILING
+
+    found, _ = run_search(monkeypatch, [Search.explore(frozenset(range(1, 9)))], oracle)
+
+    assert found == [frozenset({5})]
+
+def test_drop_subsumed_sets():
+    found = [frozenset(s) for s in [{17}, {38, 41}, {39}, {17}, {17, 39}, {5, 6}]]
+
+    refined = Search.drop_subsumed_sets(found, [frozenset({1, 5, 6, 38})], [1, 5, 6, 17, 38, 39, 41])
+
+    # 41 is in none of the failing sets, so it is identified on its own.
+    assert refined == [{17}, {39}, {5, 6}]
+
+def test_drop_subsumed_sets_without_failing_sets():
+    found = [frozenset(s) for s in [{38, 41}, {2}, {2, 3}]]
+
+    assert Search.drop_subsumed_sets(found, [], [2, 3, 38, 41]) == [{38, 41}, {2}]
+
+@pytest.mark.parametrize("t", [2, 3])
+@pytest.mark.parametrize("n", [3, 5, 12, 40])
+def test_covering_array_covers_every_tuple(t, n):
+    node_ids = list(range(10, 10 + n))
+    rows = Search.build_covering_array(node_ids, t)
+
+    for nodes in itertools.combinations(node_ids, t):
+        covered = {tuple(node_id in row for node_id in nodes) for row in rows}
+        # Every mutated or not pattern of the t nodes, but the seed, is in a row.
+        for pattern in itertools.product([False, True], repeat=t):
+            assert not any(pattern) or pattern in covered, (nodes, pattern)
+
+def test_covering_array_of_strength_one():
+    assert Search.build_covering_array([3, 1, 2], 1) == [frozenset({1, 2, 3})]
@@ -0,0 +1,99 @@
+"""
+    Tests of the exhaustive Phase-1 generation (see CInitGenerator.test_generator), i.e.,
+    of its r levels, superset pruning, and oracle budget, with a fake generation and oracle.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import random
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.pycparser.c_json as c_json
+import C.CInitGenerator as CInit
+import C.CLearning_A as Learning_A
+import C.SharedEditor as Shared
+
+MUTABLE_NODE_IDS = [1, 2, 3, 4, 5]
+
+def is_flipped(combination):
+    # Mutating 2, or both 4 and 5, flips the output.
+    return 2 in combination or {4, 5} <= set(combination)
+
+def fake_generator(ast, language_info, all_combinations, shared_dict, asts_path, code_path, goto_labels, **kwargs):
+    Shared.json_writer(
+            {ast_id: list(combination) for ast_id, combination in enumerate(all_combinations, start=1)},
+            f"{asts_path}/id_to_combination.json")
+    Shared.group_writer(code_path, [
+        (ast_id, is_flipped(combination), True, None)
+        for ast_id, combination in enumerate(all_combinations, start=1)
+    ])
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setattr(CInit, "test_generator_parallelized", fake_generator)
+    ast = c_json.file_to_dict(f"{parentdir}/Benchmark/bug15920/poc.c")
+
+    def run(**arguments):
+        root = tmp_path / str(len(os.listdir(tmp_path)))
+        asts_path = root / "asts"
+        code_path = root / "code"
+        os.makedirs(asts_path)
+        os.makedirs(code_path)
+
+        arguments["splice-emission"] = False
+        CInit.test_generator(
+                ast, {}, MUTABLE_NODE_IDS, {}, str(asts_path), str(code_path), arguments, set(), [])
+
+        levels = {}
+        for r in sorted(os.listdir(asts_path), key=int):
+            levels[int(r)] = len(Shared.load_json(f"{asts_path}/{r}/id_to_combination.json"))
+
+        passings, _, _, _ = Learning_A.collect_combinations(str(code_path), str(asts_path))
+        identified_nodes, _ = Learning_A.identify_from_larger_r(passings, Learning_A.get_r1(passings))
+
+        return levels, identified_nodes, asts_path
+
+    return run
+
+def test_levels_until_every_program_passes(run):
+    levels, identified_nodes, _ = run()
+
+    assert levels == {1: 5, 2: 10, 3: 10, 4: 5}
+    assert identified_nodes == [{2}, {4, 5}]
+
+def test_superset_pruning_is_off_by_default(run):
+    _, _, asts_path = run()
+
+    assert not any(os.path.exists(f"{asts_path}/{r}/pruned.json") for r in os.listdir(asts_path))
+
+def test_superset_pruning(run):
+    levels, identified_nodes, asts_path = run(**{"superset-pruning": True})
+
+    assert levels == {1: 5, 2: 6, 3: 2, 4: 0}
+    assert sorted(map(sorted, Shared.load_json(f"{asts_path}/3/pruned.json"))) == [
+        [1, 2, 3], [1, 2, 4], [1, 2, 5], [1, 4, 5], [2, 3, 4], [2, 3, 5], [2, 4, 5], [3, 4, 5]
+    ]
+    # The identified nodes are the same as without the pruning.
+    assert identified_nodes == [{2}, {4, 5}]
+
+@pytest.mark.parametrize("budget", [1, 8, 20])
+def test_oracle_budget(run, budget):
+    random.seed(budget)
+
+    levels, _, _ = run(**{"oracle-budget": budget})
+
+    assert 0 < sum(levels.values()) <= budget
+    # Each level but the last takes at most half of the budget left (rounded up).
+    spent = 0
+    for r, size in levels.items():
+        if r < len(MUTABLE_NODE_IDS):
+            assert size <= -(-(budget - spent) // 2)
+        spent += size
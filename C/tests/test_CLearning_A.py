@@ -0,0 +1,45 @@
+"""
+    Tests of the node identification of the learning phase (see CLearning_A).
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.CLearning_A as Learning_A
+import C.SharedEditor as Shared
+
+def test_identify_from_larger_r():
+    passings = [{2}, {3}, {4}, {3, 7}, {5, 8}, {5, 9}]
+
+    combinations, for_retries = Learning_A.identify_from_larger_r(passings, Learning_A.get_r1(passings))
+
+    assert combinations == [{2}, {3}, {4}, {5, 8}]
+    assert for_retries == [{7}, {9}]
+
+def test_collect_combinations_with_pruned(tmp_path):
+    asts_path = tmp_path / "asts"
+    code_path = tmp_path / "code"
+    for r, id_to_combination, passings, failings in [
+            (1, {"1": [1], "2": [2], "3": [3]}, [1], [2, 3]),
+            (2, {"1": [2, 3]}, [], [1])]:
+        os.makedirs(asts_path / str(r))
+        os.makedirs(code_path / str(r))
+        Shared.json_writer(id_to_combination, f"{asts_path}/{r}/id_to_combination.json")
+        Shared.json_writer(
+                {"passings": passings, "failings": failings, "invalids": []},
+                f"{code_path}/{r}/grouped_files.json")
+    Shared.json_writer([[1, 2], [1, 3]], f"{asts_path}/2/pruned.json")
+
+    passings, failings, pc2ap, fc2ap = Learning_A.collect_combinations(str(code_path), str(asts_path))
+
+    assert passings == [{1}, {1, 2}, {1, 3}]
+    assert failings == [{2}, {3}, {2, 3}]
+    assert list(pc2ap) == ["[1]"]
+    assert list(fc2ap) == ["[2]", "[3]", "[2, 3]"]
@@ -0,0 +1,98 @@
+"""
+    Tests of the mutation log (see CMutationLog). The variants reconstructed from
+    their mutation records must be the mutated asts, so the asts need not be written.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import copy
+import glob
+import random
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.Main as Main
+import C.CAstMutator as CMutator
+import C.CArrayAst as ArrayAst
+import C.CMutationLog as MutationLog
+import C.SharedEditor as Shared
+
+# Number of random mutations checked per poc.
+MUTATIONS = 10
+
+POC_PATHS = sorted(glob.glob(f"{parentdir}/Benchmark/*/poc.c"))[:10]
+
+LANGUAGE_INFO = Shared.load_json(f"{parentdir}/C/CLanguage.json")
+SHARED_DICT = Shared.load_json(f"{parentdir}/C/SharedDictionary.json")
+
+@pytest.mark.parametrize("poc_path", POC_PATHS, ids=lambda path: os.path.basename(os.path.dirname(path)))
+def test_reconstruct_from_log(poc_path, tmp_path):
+    (
+        ast,
+        mutable_node_ids,
+        _,
+        goto_labels,
+        index,
+        metadata
+    ) = Main.preprocess_c_ast(poc_path, LANGUAGE_INFO, SHARED_DICT)
+
+    if len(mutable_node_ids) == 0:
+        pytest.skip("no mutable nodes")
+
+    seed_ast = copy.deepcopy(ast)
+    aast = ArrayAst.from_dict(ast)
+    node_ids = CMutator.get_node_ids(index)
+    log_path = f"{tmp_path}/{MutationLog.LOG_NAME}"
+
+    rng = random.Random(poc_path)
+    mutated_asts = {}
+    records = []
+    for i in range(MUTATIONS):
+        combination = rng.sample(mutable_node_ids, rng.randint(1, len(mutable_node_ids)))
+        seed = rng.getrandbits(32)
+
+        random.seed(seed)
+        mutated_ast, _ = CMutator.ast_mutator(
+                ast, LANGUAGE_INFO, set(combination), SHARED_DICT, goto_labels, index, metadata)
+        edits = MutationLog.get_edits(ast, mutated_ast, node_ids)
+
+        # Both mutation paths log the same edits.
+        random.seed(seed)
+        overlay = CMutator.array_ast_mutator(
+                aast, LANGUAGE_INFO, set(combination), SHARED_DICT, goto_labels, metadata)
+        assert sorted(map(str, ArrayAst.get_edits(aast, overlay))) == sorted(map(str, edits))
+
+        mutated_asts[f"1/{i}"] = mutated_ast
+        records.append(MutationLog.make_record(f"1/{i}", combination, seed, edits))
+
+    MutationLog.append(log_path, records)
+
+    logs = {}
+    for ast_path, mutated_ast in mutated_asts.items():
+        record = MutationLog.find_record(f"{tmp_path}/{ast_path}", logs)
+        assert MutationLog.reconstruct_ast(ast, index, record) == mutated_ast
+
+        nodes = MutationLog.reconstruct_nodes(ast, index, record, record["combination"])
+        mutated_index = CMutator.build_index(mutated_ast)
+        for node_id in record["combination"]:
+            assert nodes[node_id] == mutated_index[node_id]["node"]
+
+    # The seed ast is never modified.
+    assert ast == seed_ast
+
+def test_later_record_replaces_earlier(tmp_path):
+    log_path = f"{tmp_path}/{MutationLog.LOG_NAME}"
+
+    MutationLog.append(log_path, [MutationLog.make_record("1/1", [3], 1, [])])
+    MutationLog.append(log_path, [MutationLog.make_record("1/1", [4], 2, [])])
+
+    assert MutationLog.load(log_path)["1/1"]["combination"] == [4]
+    assert MutationLog.find_record(f"{tmp_path}/1/1", {})["seed"] == 2
+    assert MutationLog.find_record(f"{tmp_path}/1/2", {}) == None
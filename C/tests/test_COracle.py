@@ -0,0 +1,180 @@
+"""
+    Tests of the oracle (see COracle), with a fake buggy compiler, i.e., gcc, whose
+    optimized binaries of the programs holding BUG print a wrong output.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import shutil
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.COracle as Oracle
+import C.SharedEditor as Shared
+
+pytestmark = pytest.mark.skipif(
+        shutil.which("gcc") == None or shutil.which("prlimit") == None, reason="gcc or prlimit is not installed")
+
+FAKE_COMPILER = '''#!/usr/bin/env python3
+import os, sys, subprocess
+args = sys.argv[1:]
+if "-fsyntax-only" in args:
+    sys.exit(subprocess.call(["gcc", "-w"] + args))
+out = args[args.index("-o") + 1]
+source = sys.stdin.read() if "-" in args else open([a for a in args if a.endswith(".c")][0]).read()
+if "CRASH" in source and "-O2" in args:
+    sys.stderr.write("internal compiler error: Segmentation fault\\n0 cc1 0x1234 crash_here(int)\\n")
+    sys.exit(1)
+level = "-O2" if "-O2" in args else "-O0"
+returncode = subprocess.run(["gcc", "-w", level, "-x", "c", "-", "-o", out], input=source, text=True).returncode
+if returncode == 0 and "BUG" in source and "-O2" in args:
+    os.rename(out, out + ".real")
+    with open(out, "w") as f:
+        f.write(f"#!/bin/sh\\n'{out}.real' | sed 's/^/X/'\\n")
+    os.chmod(out, 0o755)
+sys.exit(returncode)
+'''
+
+PASSING = '#include <stdio.h>\nint main() { printf("%d\\n", 1); return 0; }\n'
+FAILING = '#include <stdio.h>\n#define BUG\nint main() { printf("%d\\n", 1); return 0; }\n'
+INVALID = 'int main() { return undefined; }\n'
+LOOPING = 'int main() { volatile int i = 1; while (i) {} return 0; }\n'
+CRASHING = 'int main() { int CRASH = 0; return CRASH; }\n'
+ALLOCATING = (
+    '#include <stdlib.h>\n#include <string.h>\n'
+    'int main() { char *p = malloc(256 << 20); if (!p) abort(); memset(p, 1, 256 << 20); return p[7] - 1; }\n')
+SPINNING = 'int main() { volatile unsigned i = 0; for (;;) i++; return 0; }\n'
+
+@pytest.fixture
+def arguments(tmp_path):
+    compiler = tmp_path / "cc"
+    compiler.write_text(FAKE_COMPILER)
+    compiler.chmod(0o755)
+
+    Oracle.BINARY_RESULTS.clear()
+
+    return {
+        "root": str(tmp_path),
+        "filename": "poc.c",
+        "compiler-path": str(compiler),
+        "options": ["-O2"],
+        "opt-off": "-O0",
+        "linker": [],
+        "run-timeout": 1,
+    }
+
+def run_program(arguments: dict, source: str):
+    # The verdict and the reason of the code, both from a file and from the standard input.
+    file_path = f"{arguments['root']}/code.c"
+    with open(file_path, "w") as f:
+        f.write(source)
+
+    result = Oracle.test_program(arguments, file_path, arguments["root"])
+    piped = Oracle.test_program(arguments, f"{arguments['root']}/piped.c", arguments["root"], source)
+
+    assert (piped["verdict"], piped["reason"]) == (result["verdict"], result["reason"])
+
+    return result["verdict"], result["reason"]
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_output_mode(arguments, concurrent):
+    arguments["oracle-concurrent"] = concurrent
+
+    assert run_program(arguments, PASSING) == ("pass", None)
+    assert run_program(arguments, FAILING) == ("fail", None)
+    assert run_program(arguments, INVALID) == ("invalid", "compile-error")
+    assert run_program(arguments, LOOPING) == ("invalid", "run-timeout")
+
+def test_concurrent_mode_with_limits(arguments):
+    arguments["oracle-concurrent"] = True
+    arguments["run-memory-limit"] = 64
+    arguments["run-cpu-limit"] = 1
+    arguments["run-timeout"] = 10
+
+    assert run_program(arguments, PASSING) == ("pass", None)
+    assert run_program(arguments, FAILING) == ("fail", None)
+    assert run_program(arguments, ALLOCATING) == ("invalid", "oom")
+    assert run_program(arguments, SPINNING) == ("invalid", "run-timeout")
+
+def test_digest_capture(arguments):
+    arguments["output-capture"] = "digest"
+
+    assert run_program(arguments, PASSING) == ("pass", None)
+    assert run_program(arguments, FAILING) == ("fail", None)
+
+def test_crash_mode(arguments, tmp_path):
+    arguments["oracle-mode"] = "crash"
+    (tmp_path / "poc.c").write_text(CRASHING)
+    arguments["crash-signature"] = Oracle.calibrate_crash_signature(arguments)
+
+    assert arguments["crash-signature"] != None
+    assert run_program(arguments, CRASHING) == ("fail", None)
+    assert run_program(arguments, PASSING)[0] == "pass"
+
+def test_known_binaries_keep_verdicts_only(arguments, monkeypatch):
+    monkeypatch.setattr(Oracle, "MAX_BINARY_RESULTS", 2)
+
+    run_program(arguments, FAILING)
+    assert len(Oracle.BINARY_RESULTS) == 1
+    assert list(Oracle.BINARY_RESULTS.values()) == [{"verdict": "fail", "reason": None}]
+
+    # The known binaries give the same verdict without a new entry.
+    assert run_program(arguments, FAILING) == ("fail", None)
+    assert len(Oracle.BINARY_RESULTS) == 1
+
+    for i in range(3):
+        run_program(arguments, FAILING.replace("1);", f"{i + 2});"))
+    assert len(Oracle.BINARY_RESULTS) == 2
+
+def test_binary_results_are_least_recently_used():
+    Oracle.BINARY_RESULTS.clear()
+    limit = Oracle.MAX_BINARY_RESULTS
+
+    for i in range(limit + 1):
+        if i == limit:
+            # The first key is used again, so the second is the least recently used.
+            assert Oracle.get_binary_result("0") == {"verdict": "pass", "reason": None}
+        Oracle.set_binary_result(str(i), {"verdict": "pass", "reason": None, "enabled": "x" * 100})
+
+    assert len(Oracle.BINARY_RESULTS) == limit
+    assert Oracle.get_binary_result("0") != None
+    assert Oracle.get_binary_result("1") == None
+    assert "enabled" not in Oracle.get_binary_result("0")
+
+def test_frontend_check(arguments, tmp_path):
+    file_paths = []
+    for i, source in enumerate([PASSING, INVALID, FAILING, INVALID]):
+        file_path = tmp_path / f"code__{i}.c"
+        file_path.write_text(source)
+        file_paths.append(str(file_path))
+
+    rejected = Oracle.check_frontend(arguments, file_paths)
+
+    assert sorted(rejected) == [file_paths[1], file_paths[3]]
+    for file_path in rejected:
+        assert "undefined" in rejected[file_path]
+        assert all(line.startswith(f"{file_path}:") for line in rejected[file_path].splitlines())
+    assert Oracle.check_frontend(arguments, file_paths[:1]) == {}
+    assert "undefined" in Oracle.check_frontend(arguments, file_paths[1:2])[file_paths[1]]
+
+def test_frontend_diagnostics_are_kept(arguments, tmp_path):
+    code_path = tmp_path / "code"
+    code_path.mkdir()
+    tasks = []
+    for i, source in enumerate([PASSING, INVALID], start=1):
+        (code_path / f"code__{i}.c").write_text(source)
+        tasks.append((arguments, str(code_path), f"code__{i}.c", False))
+
+    passed_tasks, results = Shared.frontend_check(arguments, str(code_path), tasks, 2)
+
+    assert passed_tasks == tasks[:1]
+    assert results == [(2, False, False, "frontend-error")]
+    diagnostics = Shared.load_json(f"{code_path}/frontend_diagnostics.json")
+    assert list(diagnostics) == ["2"] and "undefined" in diagnostics["2"]
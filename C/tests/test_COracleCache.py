@@ -0,0 +1,114 @@
+"""
+    Tests of the persistent oracle result cache (see COracleCache).
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import sqlite3
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.COracleCache as Cache
+
+SOURCE = "int main() { return 0; }\n"
+
+@pytest.fixture
+def arguments(tmp_path):
+    # Any existing file stands for the compiler binary.
+    compiler = tmp_path / "cc"
+    compiler.write_text("")
+
+    return {
+        "root": str(tmp_path),
+        "compiler-path": str(compiler),
+        "options": ["-O2"],
+        "opt-off": "-O0",
+        "linker": [],
+        "oracle-cache": str(tmp_path / "cache.db"),
+        "oracle-cache-size": 1024,
+    }
+
+@pytest.mark.parametrize("name, value", [
+    ("run-timeout", 0.5),
+    ("compile-timeout", 5),
+    ("output-capture", "digest"),
+    ("run-memory-limit", 512),
+    ("run-cpu-limit", 2),
+    ("run-file-size-limit", 1),
+])
+def test_key_changes_with_timeouts_and_limits(arguments, name, value):
+    key = Cache.get_key(arguments, None, SOURCE)
+
+    assert Cache.get_key(dict(arguments, **{name: value}), None, SOURCE) != key
+
+def test_key_changes_with_output_limit_in_digest_mode(arguments):
+    arguments["output-capture"] = "digest"
+    key = Cache.get_key(arguments, None, SOURCE)
+
+    assert Cache.get_key(dict(arguments, **{"output-limit": 1}), None, SOURCE) != key
+    assert Cache.get_key(dict(arguments, **{"output-prefix": 16}), None, SOURCE) != key
+
+def test_key_is_stable(arguments, tmp_path):
+    code_file_path = tmp_path / "code.c"
+    code_file_path.write_text(SOURCE)
+
+    assert Cache.get_key(arguments, str(code_file_path)) == Cache.get_key(arguments, None, SOURCE)
+    assert Cache.get_key(arguments, None, SOURCE) != Cache.get_key(arguments, None, SOURCE + "\n")
+
+def test_store_and_lookup(arguments):
+    key = Cache.get_key(arguments, None, SOURCE)
+
+    assert Cache.lookup(arguments, key) == None
+
+    Cache.store(arguments, key, {"is_pass": True, "reason": None}, 1.0)
+
+    assert Cache.lookup(arguments, key) == {"is_pass": True, "reason": None}
+    assert Cache.get_stats(arguments) == {"hits": 1, "misses": 1, "saved": 1.0}
+
+def test_evicts_least_recently_used(arguments):
+    connection = Cache.connect(arguments["oracle-cache"])
+
+    for i in range(3):
+        Cache.store(arguments, f"key{i}", {"output": "x" * 100}, 0.0)
+    Cache.lookup(arguments, "key0")
+
+    Cache.evict(connection, 250)
+
+    assert Cache.lookup(arguments, "key1") == None
+    assert Cache.lookup(arguments, "key0") != None
+    assert Cache.lookup(arguments, "key2") != None
+
+def get_total_size(connection):
+    return connection.execute("SELECT size FROM total").fetchone()[0]
+
+def test_total_size_is_kept(arguments):
+    connection = Cache.connect(arguments["oracle-cache"])
+    sum_sizes = lambda: connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    for i in range(3):
+        Cache.store(arguments, f"key{i}", {"output": "x" * 100}, 0.0)
+    assert get_total_size(connection) == sum_sizes() > 0
+
+    # A result stored again replaces the old one.
+    Cache.store(arguments, "key1", {"output": "x" * 10}, 0.0)
+    assert get_total_size(connection) == sum_sizes()
+
+    Cache.evict(connection, 150)
+    assert get_total_size(connection) == sum_sizes() <= 150
+
+def test_total_size_of_an_existing_cache(arguments):
+    connection = sqlite3.connect(arguments["oracle-cache"])
+    connection.execute(
+            "CREATE TABLE results (key TEXT PRIMARY KEY, result TEXT, size INTEGER, elapsed REAL, last_used REAL)")
+    connection.execute("INSERT INTO results VALUES ('key', '{}', 42, 0.0, 0.0)")
+    connection.commit()
+    connection.close()
+
+    assert get_total_size(Cache.connect(arguments["oracle-cache"])) == 42
@@ -0,0 +1,87 @@
+"""
+    Tests of the spliced code emission (see CSpliceEmitter). For random mutations of
+    the benchmark pocs, the code spliced on both mutation paths, i.e., the dict ast
+    (CMutator.ast_mutator and splice) and the array ast (CMutator.array_ast_mutator
+    and emit_overlay), must be the code Shared.code_writer generates from the mutated
+    ast.
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import glob
+import random
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.Main as Main
+import C.CAstMutator as CMutator
+import C.CArrayAst as ArrayAst
+import C.CSpliceEmitter as Splice
+import C.SharedEditor as Shared
+
+# Number of random mutations checked per poc.
+MUTATIONS = 20
+
+POC_PATHS = sorted(glob.glob(f"{parentdir}/Benchmark/*/poc.c"))
+
+LANGUAGE_INFO = Shared.load_json(f"{parentdir}/C/CLanguage.json")
+SHARED_DICT = Shared.load_json(f"{parentdir}/C/SharedDictionary.json")
+
+def generate_code(ast: dict, tmp_path):
+    # The code generated through the ast file, as the phases did before the splicing.
+    ast_file_path = f"{tmp_path}/ast.json"
+    code_file_path = f"{tmp_path}/code.c"
+
+    Shared.ast_writer(ast, ast_file_path)
+    Shared.code_writer(ast_file_path, code_file_path)
+
+    with open(code_file_path) as f:
+        return f.read()
+
+@pytest.mark.parametrize("poc_path", POC_PATHS, ids=lambda path: os.path.basename(os.path.dirname(path)))
+def test_spliced_code_matches_code_writer(poc_path, tmp_path):
+    (
+        ast,
+        mutable_node_ids,
+        _,
+        goto_labels,
+        index,
+        metadata
+    ) = Main.preprocess_c_ast(poc_path, LANGUAGE_INFO, SHARED_DICT)
+
+    if len(mutable_node_ids) == 0:
+        pytest.skip("no mutable nodes")
+
+    template = Splice.build_template(ast, index, metadata)
+    aast = ArrayAst.from_dict(ast)
+
+    rng = random.Random(poc_path)
+    for _ in range(MUTATIONS):
+        combination = set(rng.sample(mutable_node_ids, rng.randint(1, len(mutable_node_ids))))
+        seed = rng.getrandbits(32)
+
+        random.seed(seed)
+        mutated_ast, _ = CMutator.ast_mutator(
+                ast, LANGUAGE_INFO, combination, SHARED_DICT, goto_labels, index, metadata)
+
+        random.seed(seed)
+        overlay = CMutator.array_ast_mutator(
+                aast, LANGUAGE_INFO, combination, SHARED_DICT, goto_labels, metadata)
+
+        try:
+            expected = generate_code(mutated_ast, tmp_path)
+        except Exception:
+            # The mutation cannot be generated, so it must not be spliced either.
+            assert Splice.splice(template, mutated_ast, combination, index) == None
+            continue
+
+        assert Splice.emit(template, mutated_ast, combination, index) == expected
+        assert generate_code(ArrayAst.to_dict(aast, 0, overlay), tmp_path) == expected
+        assert Splice.emit_overlay(template, aast, overlay, combination) == expected
@@ -0,0 +1,68 @@
+"""
+    Tests of the combination sampling of the budgeted Phase-1 (see
+    SharedEditor.sample_combinations).
+
+    Author: Terrence J. Lim
+"""
+
+import os, sys
+import math
+import random
+from collections import Counter
+
+import pytest
+
+# Code to import modules from other directories.
+# Soruce: https://codeolives.com/2020/01/10/python-reference-module-in-parent-directory/
+currentdir = os.path.dirname(os.path.realpath(__file__))
+parentdir = os.path.dirname(os.path.dirname(currentdir))
+sys.path.append(parentdir)
+
+import C.SharedEditor as Shared
+
+@pytest.mark.parametrize("n, r, size", [(30, 15, 1000), (10, 2, 40), (40, 3, 500), (10, 9, 10)])
+def test_sample_without_replacement(n, r, size):
+    random.seed(n * r)
+
+    sampled, skipped = Shared.sample_combinations(set(range(n)), r, size)
+
+    assert len(sampled) == size and skipped == []
+    assert len(set(sampled)) == size
+    assert all(len(combination) == r and list(combination) == sorted(set(combination)) for combination in sampled)
+
+    # Every node is in about size * r / n combinations.
+    counts = Counter(node_id for combination in sampled for node_id in combination)
+    assert len(counts) == n
+    assert max(counts.values()) - min(counts.values()) <= max(2, size * r / n * 0.2)
+
+def test_sample_is_not_deterministic():
+    draws = set()
+    for seed in range(5):
+        random.seed(seed)
+        draws.add(tuple(Shared.sample_combinations(set(range(20)), 3, 5)[0]))
+
+    assert len(draws) > 1
+
+def test_sample_skips():
+    sampled, skipped = Shared.sample_combinations(set(range(6)), 2, 100, lambda combination: 0 in combination)
+
+    # Every combination is drawn once, even if fewer than the size can be sampled.
+    assert len(sampled) == math.comb(5, 2)
+    assert sorted(skipped) == [(0, node_id) for node_id in range(1, 6)]
+
+@pytest.mark.parametrize("size", [1139, 1140])
+def test_sample_almost_every_combination(monkeypatch, size):
+    random.seed(size)
+    calls = []
+    for module, name in [(Shared.random, "sample"), (Shared.heapq, "nlargest")]:
+        def counted(*args, function=getattr(module, name), **kwargs):
+            calls.append(name)
+            return function(*args, **kwargs)
+        monkeypatch.setattr(module, name, counted)
+
+    sampled, skipped = Shared.sample_combinations(set(range(20)), 3, size)
+
+    assert len(sampled) == len(set(sampled)) == size and skipped == []
+    # About half of the combinations are drawn (and redrawn) at random, and the rest are
+    # listed, instead of redrawing about C(20, 3) * ln(C(20, 3)) times.
+    assert len(calls) <= math.comb(20, 3)